@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -50,12 +51,15 @@ INSTALLED_APPS = [
 AUTH_USER_MODEL = 'accounts.CustomUser'
 
 MIDDLEWARE = [
+    'football.middleware.ReplicaPinMiddleware',
+    'football.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'football.middleware.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -84,6 +88,11 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# Connections are persistent: each worker thread reuses its connection
+# for DB_CONN_MAX_AGE seconds instead of reconnecting per request, and
+# checks it is still alive before reusing it (CONN_HEALTH_CHECKS). Set
+# DB_CONN_MAX_AGE=0 for the ASGI deployment and put PgBouncer in front
+# instead. /api/health/connections/ reports connection usage.
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -92,9 +101,33 @@ DATABASES = {
         'PASSWORD': '190130',
         'HOST': 'localhost',
         'PORT': '5432',
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Seconds to wait for a new connection before failing the request
+            'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', 5)),
+        },
     }
 }
 
+# Optional read replica (streaming replication of 'default'). Quiz,
+# club and season reads go to the aliases in DATABASE_REPLICAS; writes,
+# and reads right after a write or data change, stay on the primary (see
+# football.routers.ReplicaRouter). Tests mirror it onto 'default'.
+if os.environ.get('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.environ['DB_REPLICA_HOST'],
+        'PORT': os.environ.get('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['football.routers.ReplicaRouter']
+# Seconds reads stay on the primary after a write; should exceed the
+# replica lag you are willing to tolerate
+DATABASE_REPLICA_STICKY_SECONDS = 5
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -137,6 +170,94 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Quiz engine
+# Read goals/assists/appearances quizzes from the precomputed
+# LeaderboardEntry table (rebuilt at the end of import_stats).
+QUIZ_USE_LEADERBOARDS = True
+# Answer overall-mode quizzes from the CareerTotal table (kept up to date
+# incrementally by import_stats) instead of summing every season. Takes
+# precedence over the leaderboards for overall quizzes.
+QUIZ_USE_CAREER_TOTALS = True
+
+# Quiz results are cached per (config, data version) in the "quizzes"
+# cache. The data version is stored in the default cache, so it must be
+# shared by every process (web workers and manage.py import_stats) for
+# invalidation to reach them. The two are kept apart so that filling the
+# quiz cache can never cull the data version: a cache that reaches
+# MAX_ENTRIES deletes a share of its entries at random. warm_quizzes
+# stores (clubs + seasons) x 4 + 3 quizzes per limit and warns when
+# they don't fit.
+QUIZ_CACHE_MAX_ENTRIES = 20000
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.django_cache',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+    'quizzes': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.django_cache' / 'quizzes',
+        'OPTIONS': {'MAX_ENTRIES': QUIZ_CACHE_MAX_ENTRIES},
+    },
+}
+QUIZ_CACHE_ALIAS = 'quizzes'
+QUIZ_CACHE_TIMEOUT = 60 * 60
+QUIZ_CACHE_LRU_SIZE = 256
+# Run warm_quizzes at the end of every import_stats (override with
+# --warm / --no-warm), so the first players after an import hit the cache.
+QUIZ_WARM_AFTER_IMPORT = False
+QUIZ_WARM_WORKERS = 4
+# Cache-Control for the public quizzes/<mode>/<category>/ URLs: browsers
+# reuse a quiz for QUIZ_HTTP_MAX_AGE seconds, shared caches (CDN, proxy)
+# for QUIZ_HTTP_SHARED_MAX_AGE, then revalidate against the data version.
+QUIZ_HTTP_MAX_AGE = 60
+QUIZ_HTTP_SHARED_MAX_AGE = 5 * 60
+# Server-side quiz sessions (the QuizSession table) used by
+# quizzes/<id>/guess/ and /reveal/. Each guess extends the session; run
+# `manage.py clear_quiz_sessions` periodically to delete expired ones.
+QUIZ_SESSION_TIMEOUT = 2 * 60 * 60
+# GET quizzes/generate/ streams quizzes with at least this many answers
+# (or any with stream=1) from a server-side cursor, this many at a time.
+QUIZ_STREAM_MIN_LIMIT = 1000
+QUIZ_STREAM_CHUNK_SIZE = 500
+
+# "orm" queries PostgreSQL per quiz. "snapshot" answers quizzes in memory
+# from the columnar files written by `manage.py export_quiz_snapshot`
+# (requires numpy); the ORM path is used if the snapshot can't be loaded.
+# Re-export and restart workers after each import_stats.
+QUIZ_ENGINE = 'orm'
+QUIZ_SNAPSHOT_PATH = BASE_DIR / 'quiz_snapshot'
+
+# Serve the read endpoints from football.async_views instead of the DRF
+# views. backend/asgi.py turns this on, so the ASGI deployment is async
+# end to end while WSGI keeps the sync views.
+API_ASYNC_VIEWS = os.environ.get('API_ASYNC_VIEWS') == '1'
+
+# API responses are encoded by football.renderers.FastJSONRenderer (orjson
+# if installed, else the standard library). Clients can ask the quiz and
+# club/season endpoints for ?shape=columns: lists of objects come back as
+# one object of parallel arrays, which is smaller to send and parse.
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'football.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
+# /api/metrics/ (per-endpoint latency and SQL counts) is served to staff
+# users and to scrapers connecting from these addresses only.
+METRICS_ALLOWED_IPS = [
+    ip.strip()
+    for ip in os.environ.get('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',')
+    if ip.strip()
+]
+
+# Staff users can profile one football API request with "X-Profile: 1" or
+# "?profile=1"; the report id comes back in the X-Profile-Id header and the
+# report is served at /api/profiles/<id>/. Meant for staging.
+API_PROFILING_ENABLED = DEBUG
+API_PROFILING_REPORT_TIMEOUT = 24 * 60 * 60
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
     "http://127.0.0.1:5173",
@@ -1,24 +1,102 @@
 from django.contrib import admin
+from django.db import DEFAULT_DB_ALIAS
 from .models import (
+    CareerTotal,
     Club,
     Season,
     Person,
     PersonClubSeason,
     StatsPersonClubSeason,
+    LeaderboardEntry,
 )
+from .services.career_totals import rebuild_career_totals
+from .services.leaderboards import rebuild_leaderboards
+from .services.quiz_cache import bump_data_version
+
+
+class DataVersionAdminMixin:
+    """
+    Refresh derived data whenever football data is edited in the admin:
+    rebuild the career totals and leaderboards the edit can reach and bump
+    the quiz data version, so cached quizzes built from the old data are
+    never served. save_related runs after save_model on every add/change
+    form.
+
+    The reach is read from PersonClubSeason through data_lookup, both
+    before the change (a row may move to another club or be deleted) and
+    after it, so an edit costs the affected people's totals and the
+    affected club, season and overall boards rather than a full rebuild.
+
+    Admin pages read from the primary, so an edit shows up straight
+    away rather than after replica lag.
+    """
+
+    # PersonClubSeason lookup matching the rows an object of this admin covers
+    data_lookup = "pk"
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).using(DEFAULT_DB_ALIAS)
+
+    def affected_scope(self, pks):
+        """
+        (person_ids, club_ids, season_ids) of the rows behind pks.
+        """
+        scope = (set(), set(), set())
+        rows = (
+            PersonClubSeason.objects.using(DEFAULT_DB_ALIAS)
+            .filter(**{f"{self.data_lookup}__in": list(pks)})
+            .values_list("person_id", "club_id", "season_id")
+        )
+        for row in rows:
+            for ids, value in zip(scope, row):
+                ids.add(value)
+        return scope
+
+    def data_changed(self, *scopes):
+        person_ids, club_ids, season_ids = (set().union(*ids) for ids in zip(*scopes))
+        if person_ids:
+            # Admin edits can move stats between people and clubs, so the
+            # career totals are recomputed rather than adjusted
+            rebuild_career_totals(person_ids)
+        if club_ids or season_ids:
+            rebuild_leaderboards(club_ids, season_ids)
+        bump_data_version()
+
+    def save_model(self, request, obj, form, change):
+        request.data_scope_before = self.affected_scope([obj.pk]) if change else (set(), set(), set())
+        super().save_model(request, obj, form, change)
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        before = getattr(request, "data_scope_before", (set(), set(), set()))
+        self.data_changed(before, self.affected_scope([form.instance.pk]))
+
+    def delete_model(self, request, obj):
+        scope = self.affected_scope([obj.pk])
+        super().delete_model(request, obj)
+        self.data_changed(scope)
+
+    def delete_queryset(self, request, queryset):
+        scope = self.affected_scope(queryset.values_list("pk", flat=True))
+        super().delete_queryset(request, queryset)
+        self.data_changed(scope)
+
 
 @admin.register(Club)
-class ClubAdmin(admin.ModelAdmin):
+class ClubAdmin(DataVersionAdminMixin, admin.ModelAdmin):
+    data_lookup = "club"
     list_display = ("name",)
     search_fields = ("name",)
 
 @admin.register(Season)
-class SeasonAdmin(admin.ModelAdmin):
+class SeasonAdmin(DataVersionAdminMixin, admin.ModelAdmin):
+    data_lookup = "season"
     list_display = ("label",)
     search_fields = ("label",)
 
 @admin.register(Person)
-class PersonAdmin(admin.ModelAdmin):
+class PersonAdmin(DataVersionAdminMixin, admin.ModelAdmin):
+    data_lookup = "person"
     list_display = ("id", "first_name", "last_name", "full_name")
     search_fields = ("first_name", "last_name")
 
@@ -27,7 +105,7 @@ class StatsPersonClubSeasonInline(admin.StackedInline):
     extra = 0
 
 @admin.register(PersonClubSeason)
-class PersonClubSeasonAdmin(admin.ModelAdmin):
+class PersonClubSeasonAdmin(DataVersionAdminMixin, admin.ModelAdmin):
     list_display = ("person", "club", "season", "role")
     list_filter = ("club", "season", "role")
     search_fields = (
@@ -38,10 +116,22 @@ class PersonClubSeasonAdmin(admin.ModelAdmin):
     inlines = [StatsPersonClubSeasonInline]
 
 @admin.register(StatsPersonClubSeason)
-class StatsPersonClubSeasonAdmin(admin.ModelAdmin):
+class StatsPersonClubSeasonAdmin(DataVersionAdminMixin, admin.ModelAdmin):
+    data_lookup = "stats"
     list_display = ("person_club_season", "appearances", "goals")
     search_fields = (
         "person_club_season__person__first_name",
         "person_club_season__person__last_name",
         "person_club_season__club__name",
-    )
\ No newline at end of file
+    )
+
+@admin.register(LeaderboardEntry)
+class LeaderboardEntryAdmin(admin.ModelAdmin):
+    list_display = ("scope", "scope_id", "category", "position", "first_name", "last_name", "total")
+    list_filter = ("scope", "category")
+
+@admin.register(CareerTotal)
+class CareerTotalAdmin(admin.ModelAdmin):
+    list_display = ("person", "club", "appearances", "goals", "assists")
+    list_select_related = ("person", "club")
+    search_fields = ("person__first_name", "person__last_name")
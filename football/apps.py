@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class FootballConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'football'
+
+    def ready(self):
+        from django.conf import settings
+
+        # Registers the connection_created receiver behind health/connections/
+        from .services import db_health  # noqa: F401
+
+        # Load the quiz snapshot once per worker, at startup
+        if getattr(settings, 'QUIZ_ENGINE', 'orm') == 'snapshot':
+            from .services import snapshot
+            snapshot.get_engine()
@@ -0,0 +1,235 @@
+"""
+Async versions of the read endpoints in views.py, served instead of them
+when settings.API_ASYNC_VIEWS is on (the ASGI deployment, see
+backend/asgi.py). Responses are the same JSON as the DRF views.
+
+Note that Django 4.2 runs every async ORM and cache call on one shared
+sync thread, so awaiting them in parallel overlaps the waiting rather
+than the queries themselves; the point is that no worker thread is held
+per request.
+"""
+
+import asyncio
+import json
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import (
+    HttpResponse,
+    HttpResponseNotAllowed,
+    HttpResponsePermanentRedirect,
+    StreamingHttpResponse,
+)
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from .services.quiz_cache import (
+    aget_data_last_modified,
+    aget_data_version,
+    aget_quiz,
+    get_quizzes,
+)
+from .services.quiz_engine import ANSWER_CATEGORIES
+from .services.quiz_stream import QuizStream
+from .services.quiz_sessions import acreate_session, playable_quiz
+from .models import Club, Season
+from .renderers import dumps, to_columns, wants_columns
+from .views import (
+    MAX_BATCH_SIZE,
+    QUIZ_MODES,
+    canonical_query_string,
+    canonical_quiz_query,
+    public_quiz_cache,
+    quiz_body_config,
+    quiz_query_config,
+    revalidate,
+    wants_stream,
+)
+
+
+def json_response(data, status=200, request=None):
+    """
+    The same JSON as the DRF views' FastJSONRenderer, in the columnar
+    shape if `request` asked for it and the response is a success.
+    """
+    if request is not None and status < 400 and wants_columns(request):
+        data = to_columns(data)
+    return HttpResponse(dumps(data), status=status, content_type="application/json")
+
+
+def aconditional_on_data(view=None, cache_control=revalidate):
+    """
+    Async counterpart of views.conditional_on_data: the data version and
+    last-modified time are fetched concurrently, and a matching
+    If-None-Match/If-Modified-Since gets a 304 without running the view.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def wrapped(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return await view(request, *args, **kwargs)
+
+            version, modified = await asyncio.gather(aget_data_version(), aget_data_last_modified())
+            etag = f'"{request.resolver_match.url_name}-{version}"'
+            last_modified = int(modified)
+
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = await view(request, *args, **kwargs)
+
+            if not response.has_header("Last-Modified"):
+                response.headers["Last-Modified"] = http_date(last_modified)
+            response.headers.setdefault("ETag", etag)
+            if response.status_code in (200, 304):
+                patch_cache_control(response, **cache_control(request))
+            return response
+
+        return wrapped
+
+    return decorator(view) if view is not None else decorator
+
+
+def require_methods(*methods):
+    """
+    require_http_methods for async views (Django 4.2's decorator only
+    wraps sync views).
+    """
+    def decorator(view):
+        @wraps(view)
+        async def wrapped(request, *args, **kwargs):
+            if request.method not in methods:
+                return HttpResponseNotAllowed(methods)
+            return await view(request, *args, **kwargs)
+
+        return wrapped
+
+    return decorator
+
+
+def csrf_exempt(view):
+    """
+    django.views.decorators.csrf.csrf_exempt for async views. The DRF
+    views are exempt too (APIView only enforces CSRF for session users).
+    """
+    view.csrf_exempt = True
+    return view
+
+
+def read_json(request):
+    """
+    The parsed JSON body, {} for an empty one; ValueError if malformed.
+    """
+    if not request.body:
+        return {}
+    return json.loads(request.body)
+
+
+@aconditional_on_data
+@require_methods("GET", "HEAD")
+async def list_clubs(request):
+    clubs = [club async for club in Club.objects.order_by("name").values("id", "name")]
+    return json_response(clubs, request=request)
+
+
+@aconditional_on_data
+@require_methods("GET", "HEAD")
+async def list_seasons(request):
+    seasons = [season async for season in Season.objects.order_by("label").values("id", "label")]
+    return json_response(seasons, request=request)
+
+
+@require_methods("GET", "HEAD")
+async def health_check(request):
+    return json_response({"status": "ok"})
+
+
+@csrf_exempt
+@aconditional_on_data
+@require_methods("GET", "HEAD", "POST")
+async def generate_quiz_view(request):
+    """
+    Async views.generate_quiz_view: GET query parameters or a POSTed JSON
+    config; POST also opens a guess session.
+    """
+    if request.method != "POST":
+        try:
+            config = quiz_query_config(request.GET)
+        except ValueError:
+            return json_response({"error": "Ids and limit must be integers."}, status=400)
+        if wants_stream(request.GET, config):
+            try:
+                stream = QuizStream(config)
+            except ValueError:
+                return json_response({"error": "Ids and limit must be integers."}, status=400)
+            # An async iterator, so the ASGI handler streams it as it goes
+            return StreamingHttpResponse(aiter(stream), content_type="application/json")
+        return json_response(await aget_quiz(config), request=request)
+
+    try:
+        config = read_json(request)
+    except ValueError:
+        return json_response({"error": "Invalid JSON body."}, status=400)
+    if not isinstance(config, dict):
+        return json_response({"error": "Quiz config must be an object."}, status=400)
+    try:
+        config = quiz_body_config(config)
+    except (TypeError, ValueError):
+        return json_response({"error": "Ids and limit must be integers."}, status=400)
+
+    quiz = await aget_quiz(config)
+    if "error" not in quiz:
+        quiz = playable_quiz(quiz, await acreate_session(quiz))
+    return json_response(quiz, request=request)
+
+
+@aconditional_on_data(cache_control=public_quiz_cache)
+@require_methods("GET", "HEAD")
+async def quiz_view(request, mode, category):
+    """
+    Async views.quiz_view (canonical, publicly cacheable quiz URLs).
+    """
+    if mode not in QUIZ_MODES or category not in ANSWER_CATEGORIES:
+        return json_response({"error": "Unknown quiz mode or category."}, status=404)
+    if mode == "overall" and category == "managers":
+        return json_response(
+            {"error": "Managers category is not available in overall mode."}, status=400
+        )
+
+    try:
+        query = canonical_quiz_query(mode, request.GET)
+    except KeyError as exc:
+        return json_response({"error": f"{exc.args[0]} is required."}, status=400)
+    except ValueError:
+        return json_response({"error": "Ids and limit must be integers."}, status=400)
+
+    canonical = canonical_query_string(request, query)
+    if request.GET.urlencode() != canonical:
+        return HttpResponsePermanentRedirect(f"{request.path}?{canonical}")
+
+    return json_response(await aget_quiz({"mode": mode, "category": category, **query}), request=request)
+
+
+@csrf_exempt
+@require_methods("POST")
+async def generate_quiz_batch_view(request):
+    """
+    Async views.generate_quiz_batch_view. The quizzes still come from the
+    sync get_quizzes, which answers every cache miss of one scope with a
+    single shared aggregation; the guess sessions are stored concurrently.
+    """
+    try:
+        data = read_json(request)
+    except ValueError:
+        return json_response({"error": "Invalid JSON body."}, status=400)
+    configs = data.get("quizzes") if isinstance(data, dict) else data
+
+    if not isinstance(configs, list):
+        return json_response({"error": 'Expected a list of quiz configs under "quizzes".'}, status=400)
+    if len(configs) > MAX_BATCH_SIZE:
+        return json_response({"error": f"At most {MAX_BATCH_SIZE} quizzes per batch."}, status=400)
+
+    results = await sync_to_async(get_quizzes)(configs)
+    playable = [index for index, quiz in enumerate(results) if "error" not in quiz]
+    quiz_ids = await asyncio.gather(*(acreate_session(results[index]) for index in playable))
+    for index, quiz_id in zip(playable, quiz_ids):
+        results[index] = playable_quiz(results[index], quiz_id)
+    return json_response({"results": results}, request=request)
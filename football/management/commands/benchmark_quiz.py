@@ -0,0 +1,264 @@
+import json
+import os
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from rest_framework.renderers import JSONRenderer
+
+from football import renderers
+from football.models import Club, QuizSession, Season
+from football.serializers import ClubSerializer, SeasonSerializer
+from football.services.benchmarks import compare, measure
+from football.services.quiz_engine import generate_quiz
+
+MODES = ("club", "season", "overall")
+CATEGORIES = ("goals", "assists", "appearances", "managers")
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark import_stats, generate_quiz and the API endpoints and write "
+        "a JSON report. Imports into the configured database: use a scratch one."
+    )
+
+    def add_arguments(self, parser):
+        """
+        Usage:
+            python manage.py benchmark_quiz --seasons 10 --output bench.json
+            python manage.py benchmark_quiz --skip-import --compare bench.json
+        """
+        parser.add_argument("--csv", type=str, help="Import this CSV instead of a generated one")
+        parser.add_argument("--skip-import", action="store_true", help="Benchmark the data already loaded")
+        parser.add_argument("--seasons", type=int, default=5)
+        parser.add_argument("--clubs", type=int, default=20)
+        parser.add_argument("--squad-size", type=int, default=25)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--output", type=str, help="Write the JSON report here")
+        parser.add_argument("--compare", type=str, help="Previous JSON report to compare against")
+
+    def handle(self, *args, **options):
+        report = {"meta": self.meta(options)}
+
+        if not options["skip_import"]:
+            report["import"] = self.benchmark_import(options)
+
+        club = Club.objects.order_by("id").first()
+        season = Season.objects.order_by("id").first()
+        if club is None or season is None:
+            raise CommandError("No data to benchmark: import a dataset first.")
+
+        iterations = options["iterations"]
+        report["quizzes"] = self.benchmark_quizzes(club.id, season.id, iterations)
+        report["endpoints"] = self.benchmark_endpoints(club.id, iterations)
+        report["rendering"] = self.benchmark_rendering(iterations)
+        report["metrics_overhead"] = self.benchmark_metrics_overhead(iterations)
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                f.write(output)
+            self.stdout.write(self.style.SUCCESS(f"Wrote report to {options['output']}."))
+        else:
+            self.stdout.write(output)
+
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as f:
+                previous = json.load(f)
+            for line in compare(previous, report):
+                self.stdout.write(line)
+
+    def meta(self, options):
+        try:
+            commit = subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                capture_output=True, text=True, cwd=settings.BASE_DIR, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+
+        return {
+            "commit": commit,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "database": connection.vendor,
+            "quiz_engine": getattr(settings, "QUIZ_ENGINE", "orm"),
+            "leaderboards": getattr(settings, "QUIZ_USE_LEADERBOARDS", False),
+            "json_encoder": "orjson" if renderers.orjson is not None else "json",
+            "dataset": {
+                "csv": options["csv"],
+                "seasons": options["seasons"],
+                "clubs": options["clubs"],
+                "squad_size": options["squad_size"],
+                "seed": options["seed"],
+            },
+        }
+
+    def benchmark_import(self, options):
+        """
+        Time a single bulk import_stats run (one run: imports aren't idempotent).
+        """
+        csv_path = options["csv"]
+        tmp = None
+        if not csv_path:
+            tmp = tempfile.NamedTemporaryFile(suffix=".csv", delete=False)
+            tmp.close()
+            csv_path = tmp.name
+            call_command(
+                "generate_dataset", csv_path,
+                seasons=options["seasons"],
+                clubs=options["clubs"],
+                squad_size=options["squad_size"],
+                seed=options["seed"],
+                stdout=StringIO(),
+            )
+
+        try:
+            with open(csv_path, encoding="utf-8") as f:
+                rows = sum(1 for _ in f) - 1
+
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                call_command("import_stats", csv_path, bulk=True, stdout=StringIO())
+                elapsed = time.perf_counter() - started
+        finally:
+            if tmp is not None:
+                os.unlink(tmp.name)
+
+        return {
+            "bulk": {
+                "rows": rows,
+                "seconds": round(elapsed, 3),
+                "rows_per_second": round(rows / elapsed) if elapsed else None,
+                "queries": len(captured),
+            }
+        }
+
+    def benchmark_quizzes(self, club_id, season_id, iterations):
+        """
+        generate_quiz for every mode/category, bypassing the quiz cache.
+        """
+        results = {}
+        for mode in MODES:
+            for category in CATEGORIES:
+                if mode == "overall" and category == "managers":
+                    continue
+                config = {
+                    "mode": mode,
+                    "category": category,
+                    "club_id": club_id,
+                    "season_id": season_id,
+                    "limit": 10,
+                }
+                results[f"{mode}/{category}"] = measure(
+                    lambda config=config: generate_quiz(config), iterations
+                )
+                self.stdout.write(f"{mode}/{category}: {results[f'{mode}/{category}']}")
+        return results
+
+    def benchmark_endpoints(self, club_id, iterations):
+        """
+        Full request/response cycle through the URLconf and middleware.
+        GET quizzes/generate/ is measured warm, i.e. served from the quiz
+        cache. POSTing it also writes a QuizSession, so that is measured on
+        its own and the sessions it opened are deleted afterwards.
+        """
+        client = Client(SERVER_NAME="localhost")
+        config = {"mode": "club", "club_id": club_id, "category": "goals", "limit": 10}
+        body = json.dumps(config)
+        posted = []
+
+        endpoints = {
+            "clubs/": lambda: client.get("/api/clubs/"),
+            "seasons/": lambda: client.get("/api/seasons/"),
+            "quizzes/generate/": lambda: client.get("/api/quizzes/generate/", config),
+            "quizzes/generate/ (session)": lambda: posted.append(client.post(
+                "/api/quizzes/generate/", body, content_type="application/json"
+            )),
+        }
+
+        results = {}
+        try:
+            for name, request in endpoints.items():
+                results[name] = measure(request, iterations)
+                self.stdout.write(f"{name}: {results[name]}")
+        finally:
+            quiz_ids = [json.loads(response.content)["quiz_id"] for response in posted]
+            QuizSession.objects.filter(id__in=quiz_ids).delete()
+        return results
+
+    def benchmark_rendering(self, iterations):
+        """
+        Cost and size of building and encoding the clubs, seasons and a
+        100-answer quiz response: the old serializer + JSONRenderer path,
+        values() + FastJSONRenderer's encoder, and the columnar shape.
+        """
+        quiz = generate_quiz({"mode": "overall", "category": "goals", "limit": 100})
+        legacy = JSONRenderer()
+
+        cases = {
+            "clubs/serializer": lambda: legacy.render(
+                ClubSerializer(Club.objects.order_by("name"), many=True).data
+            ),
+            "clubs/fast": lambda: renderers.dumps(
+                list(Club.objects.order_by("name").values("id", "name"))
+            ),
+            "clubs/columns": lambda: renderers.dumps(renderers.to_columns(
+                list(Club.objects.order_by("name").values("id", "name"))
+            )),
+            "seasons/serializer": lambda: legacy.render(
+                SeasonSerializer(Season.objects.order_by("label"), many=True).data
+            ),
+            "seasons/fast": lambda: renderers.dumps(
+                list(Season.objects.order_by("label").values("id", "label"))
+            ),
+            "seasons/columns": lambda: renderers.dumps(renderers.to_columns(
+                list(Season.objects.order_by("label").values("id", "label"))
+            )),
+            # The quiz is already built: this is encoding alone
+            "quiz/json": lambda: legacy.render(quiz),
+            "quiz/fast": lambda: renderers.dumps(quiz),
+            "quiz/columns": lambda: renderers.dumps(renderers.to_columns(quiz)),
+        }
+
+        results = {}
+        for name, render in cases.items():
+            results[name] = {**measure(render, iterations), "bytes": len(render())}
+            self.stdout.write(f"rendering {name}: {results[name]}")
+        return results
+
+    def benchmark_metrics_overhead(self, iterations):
+        """
+        Same cheap requests with and without MetricsMiddleware, so the
+        per-request cost of the instrumentation is visible on its own.
+        """
+        middleware = "football.middleware.MetricsMiddleware"
+        without = [m for m in settings.MIDDLEWARE if m != middleware]
+        iterations = max(iterations, 200)
+
+        results = {}
+        for path in ("/api/health/", "/api/clubs/"):
+            # A fresh Client loads the middleware chain from the active settings
+            with_metrics = measure(
+                lambda client=Client(SERVER_NAME="localhost"): client.get(path), iterations
+            )
+            with override_settings(MIDDLEWARE=without):
+                client = Client(SERVER_NAME="localhost")
+                without_metrics = measure(lambda: client.get(path), iterations)
+
+            results[path] = {
+                "with_metrics": with_metrics,
+                "without_metrics": without_metrics,
+                "overhead_p50_ms": round(with_metrics["p50_ms"] - without_metrics["p50_ms"], 3),
+            }
+            self.stdout.write(f"metrics overhead {path}: {results[path]['overhead_p50_ms']} ms (p50)")
+        return results
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from football.services.quiz_sessions import clear_expired_sessions
+
+
+class Command(BaseCommand):
+    help = "Delete quiz sessions older than QUIZ_SESSION_TIMEOUT."
+
+    def handle(self, *args, **options):
+        """
+        Usage (e.g. hourly from cron):
+            python manage.py clear_quiz_sessions
+        """
+        deleted = clear_expired_sessions()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired quiz sessions."))
@@ -0,0 +1,31 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from football.services.snapshot import export_snapshot
+
+
+class Command(BaseCommand):
+    help = "Export a columnar quiz snapshot for the in-memory quiz engine."
+
+    def add_arguments(self, parser):
+        """
+        Usage:
+            python manage.py export_quiz_snapshot [path/to/snapshot_dir]
+        """
+        parser.add_argument(
+            "path",
+            nargs="?",
+            default=None,
+            help="Output directory (default: settings.QUIZ_SNAPSHOT_PATH)",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"] or settings.QUIZ_SNAPSHOT_PATH
+
+        started = time.perf_counter()
+        rows = export_snapshot(path)
+        self.stdout.write(self.style.SUCCESS(
+            f"Exported {rows} rows to {path} in {time.perf_counter() - started:.2f}s."
+        ))
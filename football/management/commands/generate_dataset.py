@@ -0,0 +1,109 @@
+import csv
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+
+from football.services.stats_import import COLUMNS, PERSON_REF_PREFIX
+
+FIRST_NAMES = [
+    "Aaron", "Ben", "Callum", "Dan", "Eddie", "Fabio", "Gabriel", "Harry",
+    "Ivan", "Jack", "Kai", "Luis", "Marcus", "Nico", "Ollie", "Pedro",
+    "Reece", "Sam", "Tom", "Virgil", "Will", "Yves", "Zak",
+]
+LAST_NAMES = [
+    "Adams", "Barnes", "Clarke", "Dawson", "Evans", "Fernandes", "Grant",
+    "Hughes", "Iwobi", "James", "Kane", "Lewis", "Mason", "Nunez", "Owen",
+    "Palmer", "Rice", "Silva", "Taylor", "Walker", "Young", "Zouma",
+]
+
+
+class Command(BaseCommand):
+    help = "Generate a reproducible synthetic stats CSV that import_stats accepts."
+
+    def add_arguments(self, parser):
+        """
+        Usage:
+            python manage.py generate_dataset out.csv --seasons 30 --clubs 20 --squad-size 25
+        """
+        parser.add_argument("csv_path", type=str, help="Where to write the CSV")
+        parser.add_argument("--seasons", type=int, default=10)
+        parser.add_argument("--clubs", type=int, default=20)
+        parser.add_argument("--squad-size", type=int, default=25)
+        parser.add_argument("--first-season", type=int, default=1992, help="Start year of the first season")
+        parser.add_argument("--turnover", type=float, default=0.2, help="Share of each squad replaced every season")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        for name in ("seasons", "clubs", "squad_size"):
+            if options[name] < 1:
+                raise CommandError(f"--{name.replace('_', '-')} must be at least 1.")
+
+        rows = self.generate_rows(
+            rng=random.Random(options["seed"]),
+            seasons=options["seasons"],
+            clubs=options["clubs"],
+            squad_size=options["squad_size"],
+            first_season=options["first_season"],
+            turnover=options["turnover"],
+        )
+
+        with open(options["csv_path"], "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(COLUMNS)
+            count = 0
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {count} rows to {options['csv_path']}."
+        ))
+
+    def generate_rows(self, rng, seasons, clubs, squad_size, first_season, turnover):
+        """
+        Yield CSV rows season by season. Every row of a person carries the
+        same file-local ref (ref:1, ref:2, ...): import_stats creates the
+        person on their first row and reuses them on later ones.
+        """
+        next_ref = 1
+        club_names = [f"Club {i + 1:03d}" for i in range(clubs)]
+        squads = {club: [] for club in club_names}
+        managers = {}
+
+        def new_person():
+            return {
+                "id": None,
+                "first_name": rng.choice(FIRST_NAMES),
+                "last_name": rng.choice(LAST_NAMES),
+                "quality": rng.random(),
+            }
+
+        def person_columns(person):
+            # Refs are numbered in order of first appearance in the file
+            nonlocal next_ref
+            if person["id"] is None:
+                person["id"] = next_ref
+                next_ref += 1
+            return [f"{PERSON_REF_PREFIX}{person['id']}", person["first_name"], person["last_name"]]
+
+        for offset in range(seasons):
+            year = first_season + offset
+            label = f"{year}/{(year + 1) % 100:02d}"
+
+            for club in club_names:
+                # Squad turnover: drop some players, top up with new ones
+                squad = [p for p in squads[club] if rng.random() > turnover]
+                while len(squad) < squad_size:
+                    squad.append(new_person())
+                squads[club] = squad
+
+                if club not in managers or rng.random() < 0.15:
+                    managers[club] = new_person()
+
+                yield person_columns(managers[club]) + [label, club, "manager", 0, 0, 0]
+
+                for player in squad:
+                    appearances = rng.randint(0, 38)
+                    goals = int(appearances * player["quality"] ** 3 * rng.uniform(0, 0.9))
+                    assists = int(appearances * player["quality"] ** 2 * rng.uniform(0, 0.4))
+                    yield person_columns(player) + [label, club, "player", appearances, goals, assists]
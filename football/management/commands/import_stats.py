@@ -1,35 +1,350 @@
+import argparse
 import csv
+import gzip
+import hashlib
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
+from django.conf import settings
+from django.core.management import call_command
 from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
 
 from football.models import (
     Club,
+    ImportCheckpoint,
+    ImportedRow,
     Season,
     Person,
     PersonClubSeason,
     StatsPersonClubSeason,
 )
+from football.routers import use_primary
+from football.services.career_totals import apply_deltas, stats_delta
+from football.services.leaderboards import rebuild_leaderboards
+from football.services.quiz_cache import bump_data_version
+from football.services.stats_import import (
+    PERSON_REF_PREFIX,
+    STAT_COLUMNS,
+    import_season_shard,
+    setup_worker,
+    write_stats,
+)
 
 
 class Command(BaseCommand):
-    help = "Import season/club/person stats from a CSV file."
+    help = "Import season/club/person stats from CSV files."
 
     def add_arguments(self, parser):
         """
         Usage:
             python manage.py import_stats path/to/file.csv
+            python manage.py import_stats path/to/seasons/ --workers 4
         """
-        parser.add_argument("csv_path", type=str, help="Path to the CSV file")
+        parser.add_argument(
+            "csv_paths",
+            nargs="+",
+            type=str,
+            help=(
+                "CSV files (optionally .csv.gz), or directories of them, "
+                "imported in the order given"
+            ),
+        )
+        parser.add_argument(
+            "--bulk",
+            action="store_true",
+            help="Import in set-based chunks (one transaction per chunk).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=5000,
+            help="Rows per chunk when --bulk is used (default: 5000).",
+        )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help=(
+                "Bulk import that skips rows unchanged since they were last "
+                "imported and checkpoints every chunk, so an interrupted import "
+                "of the same file resumes where it stopped."
+            ),
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="With --incremental: ignore any checkpoint and read the whole file.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=0,
+            help=(
+                "Resolve clubs, seasons and people in one pass, then write the "
+                "stats of each season in a pool of this many processes "
+                "(1 writes them in this process). Default: a serial import."
+            ),
+        )
+        parser.add_argument(
+            "--warm",
+            action=argparse.BooleanOptionalAction,
+            default=getattr(settings, "QUIZ_WARM_AFTER_IMPORT", False),
+            help="Fill the quiz cache with warm_quizzes afterwards (default: settings.QUIZ_WARM_AFTER_IMPORT).",
+        )
 
     def handle(self, *args, **options):
-        csv_path = options["csv_path"]
+        chunk_size = options["chunk_size"]
+        workers = options["workers"]
 
-        try:
-            with open(csv_path, newline="", encoding="utf-8") as f:
-                reader = csv.DictReader(f)
-                self.import_rows(reader)
-        except FileNotFoundError:
-            raise CommandError(f"File not found: {csv_path}")
+        if chunk_size < 1:
+            raise CommandError("--chunk-size must be at least 1.")
+        if workers < 0:
+            raise CommandError("--workers must not be negative.")
+        if workers and options["incremental"]:
+            raise CommandError("--incremental cannot be combined with --workers.")
+
+        csv_paths = self.expand_paths(options["csv_paths"])
+        started = time.perf_counter()
+
+        self.incremental = options["incremental"]
+        self.checkpoints = []
+
+        # Lookups that stay valid across chunks and files
+        self.season_ids = {}
+        self.club_ids = {}
+        # Person ref key -> Person.id, for the file being imported
+        self.person_refs = {}
+
+        # Id lookups must see rows written earlier in the same import
+        with use_primary():
+            if workers:
+                row_count = self.import_parallel(csv_paths, workers, chunk_size)
+            else:
+                row_count = 0
+                for csv_path in csv_paths:
+                    if len(csv_paths) > 1:
+                        self.stdout.write(f"Importing {csv_path}.")
+                    row_count += self.import_file(
+                        csv_path,
+                        bulk=options["bulk"] or self.incremental,
+                        chunk_size=chunk_size,
+                        restart=options["restart"],
+                    )
+
+            self.stdout.write(self.style.SUCCESS("Import complete."))
+            self.report_throughput(row_count, time.perf_counter() - started)
+
+            started = time.perf_counter()
+            entries = rebuild_leaderboards()
+            self.stdout.write(
+                f"Rebuilt leaderboards: {entries} entries in {time.perf_counter() - started:.2f}s."
+            )
+
+        version = bump_data_version()
+        self.stdout.write(f"Quiz cache invalidated (data version {version}).")
+
+        # Finished: the next run of these files starts from the top
+        for checkpoint in self.checkpoints:
+            checkpoint.delete()
+
+        if options["warm"]:
+            call_command(
+                "warm_quizzes",
+                workers=getattr(settings, "QUIZ_WARM_WORKERS", 4),
+                stdout=self.stdout,
+                stderr=self.stderr,
+            )
+
+    def expand_paths(self, paths):
+        """
+        The CSV files to import: each path as given, or the *.csv files
+        of a directory in name order.
+        """
+        csv_paths = []
+        for path in paths:
+            if os.path.isdir(path):
+                found = sorted(
+                    os.path.join(path, name)
+                    for name in os.listdir(path)
+                    if name.lower().endswith((".csv", ".csv.gz"))
+                )
+                if not found:
+                    raise CommandError(f"No CSV files in directory: {path}")
+                csv_paths.extend(found)
+            elif os.path.isfile(path):
+                csv_paths.append(path)
+            else:
+                raise CommandError(f"File not found: {path}")
+        return csv_paths
+
+    def open_csv(self, csv_path):
+        """
+        Open a CSV file for reading; .gz files are decompressed on the fly.
+        """
+        if csv_path.endswith(".gz"):
+            return gzip.open(csv_path, "rt", newline="", encoding="utf-8")
+        return open(csv_path, newline="", encoding="utf-8")
+
+    def import_file(self, csv_path, bulk=False, chunk_size=5000, restart=False):
+        """
+        Import one CSV file serially. Returns the number of rows read.
+        """
+        self.checkpoint = None
+        self.person_refs = {}
+        self.source = os.path.abspath(csv_path)
+        if self.incremental:
+            self.checkpoint = self.load_checkpoint(csv_path, restart=restart)
+            self.checkpoints.append(self.checkpoint)
+
+        with self.open_csv(csv_path) as f:
+            reader = csv.DictReader(f)
+            if bulk:
+                return self.import_rows_bulk(reader, chunk_size=chunk_size)
+            return self.import_rows(reader)
+
+    def import_parallel(self, csv_paths, workers, chunk_size=5000):
+        """
+        Import many files with the stats writes sharded per season.
+
+        1. One pass over every file, in order and in chunks, resolves and
+           creates the Season, Club, Person and PersonClubSeason rows
+           exactly as a serial bulk import would, and collects the stats
+           of player rows per season (a later row overwrites an earlier
+           one, as it would in the database).
+        2. Each season's stats are written in its own transaction by a
+           pool of worker processes. Every PersonClubSeason belongs to one
+           season, so no two workers ever touch the same row.
+        3. The career-total changes the workers report are applied once.
+
+        Returns the number of rows read.
+        """
+        started = time.perf_counter()
+        self.checkpoint = None
+        shards = defaultdict(dict)
+        person_clubs = {}
+        row_count = 0
+
+        for csv_path in csv_paths:
+            self.person_refs = {}
+            with self.open_csv(csv_path) as f:
+                chunk = []
+                for row_num, row in enumerate(csv.DictReader(f), start=2):
+                    chunk.append((row_num, row))
+                    if len(chunk) >= chunk_size:
+                        self.collect_chunk(chunk, shards, person_clubs)
+                        chunk = []
+                    row_count += 1
+                if chunk:
+                    self.collect_chunk(chunk, shards, person_clubs)
+
+        self.stdout.write(
+            f"Resolved {row_count} rows from {len(csv_paths)} files into "
+            f"{len(shards)} season shards in {time.perf_counter() - started:.2f}s."
+        )
+
+        if workers > 1 and connections[DEFAULT_DB_ALIAS].vendor == "sqlite":
+            self.stdout.write("SQLite allows one writer at a time: writing the shards in this process.")
+            workers = 1
+
+        started = time.perf_counter()
+        results = []
+        if workers == 1:
+            for season_id, stats_values in shards.items():
+                results.append(import_season_shard(season_id, stats_values))
+        else:
+            # Forked workers must not share this process's connections
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers, initializer=setup_worker) as pool:
+                futures = [
+                    pool.submit(import_season_shard, season_id, stats_values)
+                    for season_id, stats_values in shards.items()
+                ]
+                for future in as_completed(futures):
+                    results.append(future.result())
+        elapsed = time.perf_counter() - started
+
+        career_deltas = {}
+        for result in results:
+            for pcs_id, delta in result["deltas"].items():
+                key = person_clubs[pcs_id]
+                previous = career_deltas.get(key, (0, 0, 0))
+                career_deltas[key] = tuple(a + b for a, b in zip(previous, delta))
+        apply_deltas(career_deltas)
+
+        self.report_workers(results, elapsed)
+        return row_count
+
+    def collect_chunk(self, chunk, shards, person_clubs):
+        """
+        Resolve one chunk for import_parallel and add its player stats to
+        shards ({season_id: {pcs_id: stats}}).
+        """
+        cleaned_rows = []
+        for row_num, row in chunk:
+            cleaned = self.clean_row(row_num, row)
+            if cleaned is not None:
+                cleaned_rows.append((row_num, cleaned))
+        if not cleaned_rows:
+            return
+
+        with transaction.atomic():
+            resolved, _, pcs_ids = self.resolve_chunk(cleaned_rows)
+
+        for key, c in resolved.items():
+            if key[3] != "player" or not c["has_stats"]:
+                continue
+            pcs_id = pcs_ids[key]
+            shards[key[2]][pcs_id] = (c["appearances"], c["goals"], c["assists"])
+            person_clubs[pcs_id] = (key[0], key[1])
+
+    def report_workers(self, results, elapsed):
+        """
+        Print the stats-writing throughput overall and per worker process.
+        """
+        per_worker = defaultdict(lambda: {"shards": 0, "rows": 0, "elapsed": 0.0})
+        for result in results:
+            totals = per_worker[result["worker"]]
+            totals["shards"] += 1
+            totals["rows"] += result["rows"]
+            totals["elapsed"] += result["elapsed"]
+
+        rows = sum(result["rows"] for result in results)
+        rate = rows / elapsed if elapsed > 0 else 0.0
+        self.stdout.write(
+            f"Wrote {rows} stats rows in {len(results)} shards with "
+            f"{len(per_worker)} workers in {elapsed:.2f}s ({rate:,.0f} rows/s): "
+            f"created {sum(r['created'] for r in results)}, "
+            f"updated {sum(r['updated'] for r in results)}."
+        )
+        for worker, totals in sorted(per_worker.items()):
+            rate = totals["rows"] / totals["elapsed"] if totals["elapsed"] > 0 else 0.0
+            self.stdout.write(
+                f"  worker {worker}: {totals['shards']} shards, {totals['rows']} rows "
+                f"in {totals['elapsed']:.2f}s ({rate:,.0f} rows/s)."
+            )
+
+    def load_checkpoint(self, csv_path, restart=False):
+        """
+        The checkpoint of an unfinished incremental import of this file,
+        or a fresh one. A checkpoint for a file that has since changed
+        (size or modification time) is discarded.
+        """
+        stat = os.stat(csv_path)
+        source = os.path.abspath(csv_path)
+        fingerprint = f"{stat.st_size}:{stat.st_mtime_ns}"
+
+        checkpoint, created = ImportCheckpoint.objects.get_or_create(
+            source=source, defaults={"fingerprint": fingerprint}
+        )
+        if not created and (restart or checkpoint.fingerprint != fingerprint):
+            checkpoint.fingerprint = fingerprint
+            checkpoint.last_row = 1
+            checkpoint.save()
+        elif not created and checkpoint.last_row > 1:
+            self.stdout.write(f"Resuming after row {checkpoint.last_row}.")
+        return checkpoint
 
     def import_rows(self, reader):
         """
@@ -38,35 +353,28 @@ class Command(BaseCommand):
         - Never auto-match people by name.
         - If person_id is given, it must match an existing Person.id.
         - If person_id is empty, we always create a new Person.
+        - If person_id is "ref:<key>", the key's first row in the file
+          creates a new Person and later rows reuse it.
         """
         row_num = 1  # header line
 
         for row in reader:
             row_num += 1
 
-            # 1. Read and clean values from CSV
-            person_id_raw = (row.get("person_id") or "").strip()
-            first_name = (row.get("first_name") or "").strip()
-            last_name = (row.get("last_name") or "").strip()
-            season_label = (row.get("season_label") or "").strip()
-            club_name = (row.get("club_name") or "").strip()
-            role = (row.get("role") or "").strip().lower()
-            appearances = self.to_int(row.get("appearances"))
-            goals = self.to_int(row.get("goals"))
-            assists = self.to_int(row.get("assists"))
-
-            # 2. Basic validation for required fields
-            if not season_label or not club_name or not role:
-                self.stdout.write(
-                    f"Row {row_num}: missing season_label/club_name/role, skipping."
-                )
+            # 1 + 2. Read, clean and validate values from CSV
+            cleaned = self.clean_row(row_num, row)
+            if cleaned is None:
                 continue
 
-            if not person_id_raw and not (first_name or last_name):
-                self.stdout.write(
-                    f"Row {row_num}: no person_id and no name, skipping."
-                )
-                continue
+            person_id_raw = cleaned["person_id_raw"]
+            first_name = cleaned["first_name"]
+            last_name = cleaned["last_name"]
+            season_label = cleaned["season_label"]
+            club_name = cleaned["club_name"]
+            role = cleaned["role"]
+            appearances = cleaned["appearances"]
+            goals = cleaned["goals"]
+            assists = cleaned["assists"]
 
             # 3. Season: get or create by label
             season, _ = Season.objects.get_or_create(label=season_label)
@@ -94,8 +402,8 @@ class Command(BaseCommand):
                 role=role,
             )
 
-            # 7. If it's a player, update stats
-            if role == "player":
+            # 7. If it's a player with stats in the file, update stats
+            if role == "player" and cleaned["has_stats"]:
                 self.update_stats(
                     row_num=row_num,
                     pcs=pcs,
@@ -104,7 +412,443 @@ class Command(BaseCommand):
                     assists=assists,
                 )
 
-        self.stdout.write(self.style.SUCCESS("Import complete."))
+        return row_num - 1
+
+    def clean_row(self, row_num, row, report=True):
+        """
+        Read and clean a single CSV row.
+        Returns a dict of cleaned values, or None if the row must be skipped
+        (said on stdout unless report is False).
+        """
+        cleaned = {
+            "person_id_raw": (row.get("person_id") or "").strip(),
+            "first_name": (row.get("first_name") or "").strip(),
+            "last_name": (row.get("last_name") or "").strip(),
+            "season_label": (row.get("season_label") or "").strip(),
+            "club_name": (row.get("club_name") or "").strip(),
+            "role": (row.get("role") or "").strip().lower(),
+            "appearances": self.to_int(row.get("appearances")),
+            "goals": self.to_int(row.get("goals")),
+            "assists": self.to_int(row.get("assists")),
+            # All three blank: the row has no stats row to write
+            "has_stats": any((row.get(column) or "").strip() for column in STAT_COLUMNS),
+        }
+
+        # Basic validation for required fields
+        if not cleaned["season_label"] or not cleaned["club_name"] or not cleaned["role"]:
+            if report:
+                self.stdout.write(
+                    f"Row {row_num}: missing season_label/club_name/role, skipping."
+                )
+            return None
+
+        if not cleaned["person_id_raw"] and not (cleaned["first_name"] or cleaned["last_name"]):
+            if report:
+                self.stdout.write(
+                    f"Row {row_num}: no person_id and no name, skipping."
+                )
+            return None
+
+        return cleaned
+
+    def report_throughput(self, row_count, elapsed):
+        """
+        Print how many CSV rows were processed and the rows/second rate.
+        """
+        rate = row_count / elapsed if elapsed > 0 else 0.0
+        self.stdout.write(
+            f"Processed {row_count} rows in {elapsed:.2f}s ({rate:,.0f} rows/s)."
+        )
+
+    def import_rows_bulk(self, reader, chunk_size=5000):
+        """
+        Set-based variant of import_rows with the same strict person rules.
+
+        Rows are read in chunks. For each chunk the Season/Club/Person
+        lookups are preloaded into dicts, everything is resolved in memory
+        and the writes go out with bulk_create/bulk_update inside a single
+        transaction, so the number of queries depends on the number of
+        chunks rather than the number of rows.
+        """
+        row_num = 1  # header line
+        chunk = []
+        resume_after = self.checkpoint.last_row if self.checkpoint is not None else 1
+        # First row of each person ref before the checkpoint
+        earlier_refs = {}
+
+        for row in reader:
+            row_num += 1
+            if row_num <= resume_after:
+                ref = self.person_ref((row.get("person_id") or "").strip())
+                if ref is not None and ref not in earlier_refs:
+                    cleaned = self.clean_row(row_num, row, report=False)
+                    if cleaned is not None:
+                        earlier_refs[ref] = (row_num, cleaned)
+                continue
+            if earlier_refs:
+                # Refs created before the interruption keep their Person
+                self.recall_refs(earlier_refs.values())
+                earlier_refs = {}
+            chunk.append((row_num, row))
+
+            if len(chunk) >= chunk_size:
+                self.import_chunk(chunk)
+                chunk = []
+
+        if chunk:
+            self.import_chunk(chunk)
+
+        return row_num - 1
+
+    def import_chunk(self, chunk):
+        """
+        Import one chunk of (row_num, row) pairs in a single transaction.
+        """
+        cleaned_rows = []
+        for row_num, row in chunk:
+            cleaned = self.clean_row(row_num, row)
+            if cleaned is not None:
+                cleaned_rows.append((row_num, cleaned))
+
+        with transaction.atomic():
+            created = updated = skipped = 0
+            if cleaned_rows:
+                created, updated, skipped = self.write_chunk(cleaned_rows)
+
+            if self.checkpoint is not None:
+                # Committed together with the chunk it records
+                self.checkpoint.last_row = chunk[-1][0]
+                self.checkpoint.save(update_fields=["last_row", "updated_at"])
+
+        message = (
+            f"Chunk rows {chunk[0][0]}-{chunk[-1][0]}: "
+            f"created {created} and updated {updated} stats rows"
+        )
+        if self.incremental:
+            message += f", skipped {skipped} unchanged rows"
+        self.stdout.write(message + ".")
+
+    def write_chunk(self, cleaned_rows):
+        """
+        Write one chunk of cleaned rows; the caller holds the transaction.
+        Returns (created, updated, skipped) counts.
+        """
+        skipped = 0
+        row_hashes = {}
+        known_pcs = {}
+        if self.incremental:
+            cleaned_rows, row_hashes, known_pcs = self.drop_unchanged(cleaned_rows)
+            skipped = len(row_hashes) - len(cleaned_rows)
+            if not cleaned_rows:
+                return 0, 0, skipped
+
+        resolved, row_keys, pcs_ids = self.resolve_chunk(cleaned_rows, known_pcs)
+
+        # 4. Stats for player rows
+        stats_values = {
+            pcs_ids[key]: (c["appearances"], c["goals"], c["assists"])
+            for key, c in resolved.items()
+            if key[3] == "player" and c["has_stats"]
+        }
+        created, updated, deltas = write_stats(stats_values)
+
+        # 5. Career totals: adjust only the people whose stats changed
+        person_clubs = {pcs_ids[key]: (key[0], key[1]) for key in resolved}
+        career_deltas = {}
+        for pcs_id, delta in deltas.items():
+            key = person_clubs[pcs_id]
+            previous = career_deltas.get(key, (0, 0, 0))
+            career_deltas[key] = tuple(a + b for a, b in zip(previous, delta))
+        apply_deltas(career_deltas)
+
+        # 6. Remember what each row imported as, for the next run
+        if self.incremental:
+            self.record_rows(
+                {row_num: pcs_ids[key] for row_num, key in row_keys.items()},
+                row_hashes,
+            )
+
+        return created, updated, skipped
+
+    def resolve_chunk(self, cleaned_rows, known_pcs=None):
+        """
+        Resolve (and create where missing) the Season, Club, Person and
+        PersonClubSeason rows of a chunk. known_pcs maps row_num to the
+        PersonClubSeason an incremental import resolved that row to before.
+        Returns (resolved, row_keys, pcs_ids): the cleaned row per
+        (person_id, club_id, season_id, role) key, last row winning; the
+        key of each row_num; and the PersonClubSeason id of each key.
+        """
+        known_pcs = known_pcs or {}
+
+        # 1. Seasons and clubs: load what exists, create the rest
+        self.preload_lookup(
+            Season, "label", self.season_ids,
+            {c["season_label"] for _, c in cleaned_rows},
+        )
+        self.preload_lookup(
+            Club, "name", self.club_ids,
+            {c["club_name"] for _, c in cleaned_rows},
+        )
+
+        # 2. People: resolve every row with the strict person_id rules.
+        # Rows imported before keep the PersonClubSeason they got then.
+        person_ids = self.resolve_people_bulk(
+            [(row_num, c) for row_num, c in cleaned_rows if row_num not in known_pcs]
+        )
+        known_keys = {
+            pk: tuple(key)
+            for pk, *key in PersonClubSeason.objects.filter(
+                id__in=set(known_pcs.values())
+            ).values_list("id", "person_id", "club_id", "season_id", "role")
+        } if known_pcs else {}
+
+        # 3. PersonClubSeason keys, last row wins for duplicates
+        resolved = {}
+        row_keys = {}
+        for row_num, c in cleaned_rows:
+            if row_num in known_pcs:
+                key = known_keys[known_pcs[row_num]]
+            else:
+                person_id = person_ids.get(row_num)
+                if person_id is None:
+                    continue
+                key = (
+                    person_id,
+                    self.club_ids[c["club_name"]],
+                    self.season_ids[c["season_label"]],
+                    c["role"],
+                )
+            resolved[key] = c
+            row_keys[row_num] = key
+
+        pcs_ids = self.resolve_pcs_bulk(resolved.keys())
+        return resolved, row_keys, pcs_ids
+
+    def row_hashes(self, c):
+        """
+        (source_key, content_hash) of a cleaned row: a hash of the file and
+        columns that identify it and a hash of its stats. The same row in two
+        files is tracked once per file, so the files don't overwrite each
+        other's hashes.
+        """
+        identity = "\x1f".join((
+            self.source, c["person_id_raw"], c["first_name"], c["last_name"],
+            c["club_name"], c["season_label"], c["role"],
+        ))
+        content = f"{c['appearances']}:{c['goals']}:{c['assists']}" if c["has_stats"] else ""
+        return (
+            hashlib.sha1(identity.encode("utf-8")).hexdigest(),
+            hashlib.sha1(content.encode("utf-8")).hexdigest(),
+        )
+
+    def drop_unchanged(self, cleaned_rows):
+        """
+        Split off rows imported before with the same content.
+        Returns (rows still to import, {row_num: hashes} for every row,
+        {row_num: person_club_season_id} for changed rows imported before).
+        """
+        self.recall_refs(cleaned_rows)
+        row_hashes = {row_num: self.row_hashes(c) for row_num, c in cleaned_rows}
+        previous = {
+            source_key: (content_hash, pcs_id)
+            for source_key, content_hash, pcs_id in ImportedRow.objects.filter(
+                source_key__in={source_key for source_key, _ in row_hashes.values()}
+            ).values_list("source_key", "content_hash", "person_club_season_id")
+        }
+
+        remaining = []
+        known_pcs = {}
+        for row_num, c in cleaned_rows:
+            source_key, content_hash = row_hashes[row_num]
+            if source_key in previous:
+                previous_hash, pcs_id = previous[source_key]
+                if previous_hash == content_hash:
+                    continue
+                known_pcs[row_num] = pcs_id
+            remaining.append((row_num, c))
+        return remaining, row_hashes, known_pcs
+
+    def recall_refs(self, cleaned_rows):
+        """
+        Map the person refs of rows imported by an earlier run of this file
+        to the Person those rows created, so a changed or resumed import
+        doesn't create them again.
+        """
+        wanted = {}
+        for _, c in cleaned_rows:
+            ref = self.person_ref(c["person_id_raw"])
+            if ref is not None and ref not in self.person_refs:
+                wanted[self.row_hashes(c)[0]] = ref
+        if not wanted:
+            return
+
+        for source_key, person_id in ImportedRow.objects.filter(
+            source_key__in=wanted.keys()
+        ).values_list("source_key", "person_club_season__person_id"):
+            self.person_refs.setdefault(wanted[source_key], person_id)
+
+    def record_rows(self, row_pcs, row_hashes):
+        """
+        Upsert ImportedRow for every imported row ({row_num: pcs_id}).
+        """
+        rows = {}
+        for row_num, pcs_id in row_pcs.items():
+            source_key, content_hash = row_hashes[row_num]
+            rows[source_key] = ImportedRow(
+                source_key=source_key,
+                content_hash=content_hash,
+                person_club_season_id=pcs_id,
+            )
+        ImportedRow.objects.bulk_create(
+            rows.values(),
+            update_conflicts=True,
+            unique_fields=["source_key"],
+            update_fields=["content_hash", "person_club_season", "imported_at"],
+            batch_size=1000,
+        )
+
+    def preload_lookup(self, model, field, lookup, values):
+        """
+        Fill lookup (value -> id) for the given values of a unique field,
+        creating any rows that don't exist yet.
+        """
+        missing = set(values) - lookup.keys()
+        if not missing:
+            return
+
+        for pk, value in model.objects.filter(
+            **{f"{field}__in": missing}
+        ).values_list("id", field):
+            lookup[value] = pk
+
+        to_create = missing - lookup.keys()
+        if to_create:
+            model.objects.bulk_create(
+                [model(**{field: value}) for value in to_create],
+                ignore_conflicts=True,
+            )
+            for pk, value in model.objects.filter(
+                **{f"{field}__in": to_create}
+            ).values_list("id", field):
+                lookup[value] = pk
+
+    def resolve_people_bulk(self, cleaned_rows):
+        """
+        Bulk version of resolve_person.
+        Returns {row_num: person_id} for every row that resolved.
+        """
+        person_ids = {}
+        requested = {}
+        new_people = []
+        # Person ref key -> the Person its first row in this chunk creates
+        new_refs = {}
+        ref_rows = []
+
+        for row_num, c in cleaned_rows:
+            person_id_raw = c["person_id_raw"]
+            ref = self.person_ref(person_id_raw)
+
+            if ref is not None:
+                if ref in self.person_refs:
+                    person_ids[row_num] = self.person_refs[ref]
+                    continue
+                if ref in new_refs:
+                    ref_rows.append((row_num, new_refs[ref]))
+                    continue
+                new_refs[ref] = Person(
+                    first_name=c["first_name"] or "",
+                    last_name=c["last_name"] or "",
+                )
+                new_people.append((row_num, new_refs[ref]))
+                continue
+
+            if person_id_raw:
+                try:
+                    requested[row_num] = int(person_id_raw)
+                except ValueError:
+                    self.stdout.write(
+                        f"Row {row_num}: invalid person_id '{person_id_raw}', skipping."
+                    )
+                continue
+
+            person = Person(
+                first_name=c["first_name"] or "",
+                last_name=c["last_name"] or "",
+            )
+            new_people.append((row_num, person))
+
+        existing = set(
+            Person.objects.filter(id__in=set(requested.values()))
+            .values_list("id", flat=True)
+        )
+
+        # Case 2: no person_id -> create new Person
+        created_at = {}
+        if new_people:
+            Person.objects.bulk_create([person for _, person in new_people])
+            for row_num, person in new_people:
+                person_ids[row_num] = person.id
+                created_at[person.id] = row_num
+            for row_num, person in ref_rows:
+                person_ids[row_num] = person.id
+            for ref, person in new_refs.items():
+                self.person_refs[ref] = person.id
+            self.stdout.write(f"Created {len(new_people)} new Person rows.")
+
+        # Case 1: person_id provided -> must exist (a Person created by an
+        # earlier row of this chunk counts, exactly as in a row-by-row import)
+        for row_num, person_id in requested.items():
+            if person_id in existing or created_at.get(person_id, row_num) < row_num:
+                person_ids[row_num] = person_id
+            else:
+                self.stdout.write(
+                    f"Row {row_num}: no Person with id={person_id}, skipping."
+                )
+
+        return person_ids
+
+    def resolve_pcs_bulk(self, keys):
+        """
+        Return {(person_id, club_id, season_id, role): pcs_id},
+        creating any PersonClubSeason rows that don't exist yet.
+        """
+        keys = set(keys)
+        if not keys:
+            return {}
+
+        def fetch(wanted):
+            found = {}
+            rows = PersonClubSeason.objects.filter(
+                person_id__in={k[0] for k in wanted},
+                club_id__in={k[1] for k in wanted},
+                season_id__in={k[2] for k in wanted},
+            ).values_list("id", "person_id", "club_id", "season_id", "role")
+            for pk, *key in rows:
+                key = tuple(key)
+                if key in wanted:
+                    found[key] = pk
+            return found
+
+        pcs_ids = fetch(keys)
+
+        missing = keys - pcs_ids.keys()
+        if missing:
+            PersonClubSeason.objects.bulk_create(
+                [
+                    PersonClubSeason(
+                        person_id=person_id,
+                        club_id=club_id,
+                        season_id=season_id,
+                        role=role,
+                    )
+                    for person_id, club_id, season_id, role in missing
+                ],
+                ignore_conflicts=True,
+            )
+            pcs_ids.update(fetch(missing))
+
+        return pcs_ids
 
     def to_int(self, value):
         """
@@ -116,6 +860,14 @@ class Command(BaseCommand):
         except (TypeError, ValueError):
             return 0
 
+    def person_ref(self, person_id_raw):
+        """
+        The key of a "ref:<key>" person_id cell, or None for any other value.
+        """
+        if person_id_raw.startswith(PERSON_REF_PREFIX):
+            return person_id_raw[len(PERSON_REF_PREFIX):].strip() or None
+        return None
+
     def resolve_person(self, row_num, person_id_raw, first_name, last_name):
         """
         Strict person resolution rules:
@@ -123,11 +875,29 @@ class Command(BaseCommand):
         - If person_id is provided:
             -> Must match an existing Person.id.
             -> If not found: skip row.
+        - If person_id is a ref ("ref:<key>"):
+            -> The first row with the key in this file creates a new Person,
+               later rows with it get that Person.
         - If person_id is empty:
             -> Always create a new Person with given name.
             -> Never auto-match by name.
         """
 
+        # Case 0: file-local ref -> created by its first row
+        ref = self.person_ref(person_id_raw)
+        if ref is not None:
+            if ref in self.person_refs:
+                return Person.objects.get(id=self.person_refs[ref])
+            person = Person.objects.create(
+                first_name=first_name or "",
+                last_name=last_name or "",
+            )
+            self.person_refs[ref] = person.id
+            self.stdout.write(
+                f"Row {row_num}: created new Person id={person.id} for '{first_name} {last_name}' (ref {ref})."
+            )
+            return person
+
         # Case 1: person_id provided -> must exist
         if person_id_raw:
             try:
@@ -178,10 +948,15 @@ class Command(BaseCommand):
         )
 
         if created:
+            delta = stats_delta(None, (appearances, goals, assists))
             self.stdout.write(
                 f"Row {row_num}: created stats for {pcs.person} at {pcs.club} in {pcs.season}."
             )
         else:
+            delta = stats_delta(
+                (stats.appearances, stats.goals, stats.assists),
+                (appearances, goals, assists),
+            )
             stats.appearances = appearances
             stats.goals = goals
             stats.assists = assists
@@ -189,3 +964,5 @@ class Command(BaseCommand):
             self.stdout.write(
                 f"Row {row_num}: updated stats for {pcs.person} at {pcs.club} in {pcs.season}."
             )
+
+        apply_deltas({(pcs.person_id, pcs.club_id): delta})
@@ -0,0 +1,76 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from football.services.benchmarks import load_test
+
+DEFAULT_PATHS = (
+    "/api/clubs/",
+    "/api/seasons/",
+    "/api/quizzes/overall/goals/?limit=10",
+    "/api/quizzes/generate/?mode=overall&category=assists&limit=10",
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test running API deployments over HTTP and compare requests/sec "
+        "and tail latency, e.g. the WSGI (gunicorn) and ASGI (uvicorn) servers."
+    )
+
+    def add_arguments(self, parser):
+        """
+        Usage:
+            gunicorn backend.wsgi -w 4 -b :8001
+            uvicorn backend.asgi:application --workers 4 --port 8002
+            python manage.py load_test_api --target wsgi=http://localhost:8001 \\
+                --target asgi=http://localhost:8002 --concurrency 64
+        """
+        parser.add_argument(
+            "--target", action="append", required=True, metavar="NAME=URL",
+            help="Deployment to test; repeat to compare several",
+        )
+        parser.add_argument(
+            "--path", action="append", dest="paths",
+            help="Path to request (repeatable); defaults to a mix of read endpoints",
+        )
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--concurrency", type=int, default=32)
+        parser.add_argument("--warmup", type=int, default=50)
+        parser.add_argument("--output", type=str, help="Write the JSON report here")
+
+    def handle(self, *args, **options):
+        targets = []
+        for target in options["target"]:
+            name, sep, url = target.partition("=")
+            if not sep or not url:
+                raise CommandError(f"--target must look like NAME=URL, got {target!r}.")
+            targets.append((name, url))
+        paths = options["paths"] or list(DEFAULT_PATHS)
+
+        report = {"paths": paths, "results": {}}
+        for name, url in targets:
+            # Fill the quiz caches and open connections before measuring
+            load_test(url, paths, options["warmup"], min(options["concurrency"], options["warmup"]) or 1)
+            result = load_test(url, paths, options["requests"], options["concurrency"])
+            report["results"][name] = result
+            self.stdout.write(
+                f"{name}: {result['requests_per_second']} req/s, "
+                f"p50 {result['p50_ms']} ms, p95 {result['p95_ms']} ms, "
+                f"p99 {result['p99_ms']} ms, {result['errors']} errors"
+            )
+
+        baseline_name, _ = targets[0]
+        baseline = report["results"][baseline_name]
+        for name, _ in targets[1:]:
+            result = report["results"][name]
+            for metric in ("requests_per_second", "p99_ms"):
+                before, after = baseline[metric], result[metric]
+                if before:
+                    change = (after - before) / before * 100
+                    self.stdout.write(f"{name} vs {baseline_name} {metric}: {before} -> {after} ({change:+.1f}%)")
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Wrote report to {options['output']}."))
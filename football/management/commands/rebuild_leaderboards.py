@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from football.services.leaderboards import rebuild_leaderboards
+from football.services.quiz_cache import bump_data_version
+
+
+class Command(BaseCommand):
+    help = "Rebuild the precomputed quiz leaderboards from the stats tables."
+
+    def handle(self, *args, **options):
+        """
+        Usage:
+            python manage.py rebuild_leaderboards
+        """
+        started = time.perf_counter()
+        entries = rebuild_leaderboards()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt leaderboards: {entries} entries in {time.perf_counter() - started:.2f}s."
+        ))
+
+        version = bump_data_version()
+        self.stdout.write(f"Quiz cache invalidated (data version {version}).")
@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from football.services.career_totals import diff_career_totals, rebuild_career_totals
+from football.services.quiz_cache import bump_data_version
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the career totals from the stats tables and compare them "
+        "with the incrementally maintained CareerTotal rows."
+    )
+
+    def add_arguments(self, parser):
+        """
+        Usage:
+            python manage.py verify_career_totals
+            python manage.py verify_career_totals --fix
+        """
+        parser.add_argument("--fix", action="store_true", help="Rebuild the table if it differs")
+        parser.add_argument("--show", type=int, default=20, help="Print at most this many differences")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        differences = diff_career_totals()
+        elapsed = time.perf_counter() - started
+
+        if not differences:
+            self.stdout.write(self.style.SUCCESS(f"Career totals are in sync (checked in {elapsed:.2f}s)."))
+            return
+
+        for difference in differences[:options["show"]]:
+            self.stdout.write(
+                f"person {difference['person_id']} club {difference['club_id'] or 'all'}: "
+                f"stored {difference['stored']}, expected {difference['expected']} "
+                "(appearances, goals, assists)"
+            )
+
+        if options["fix"]:
+            rows = rebuild_career_totals()
+            self.stdout.write(self.style.SUCCESS(
+                f"{len(differences)} differences; rebuilt career totals ({rows} rows)."
+            ))
+            version = bump_data_version()
+            self.stdout.write(f"Quiz cache invalidated (data version {version}).")
+            return
+
+        raise CommandError(f"{len(differences)} career totals differ; rerun with --fix to rebuild.")
@@ -0,0 +1,166 @@
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from football.models import Club, Season
+from football.services.quiz_cache import (
+    get_data_version,
+    quiz_cache_key,
+    shared_cache,
+    shared_cache_key,
+    warm_quizzes,
+)
+from football.services.quiz_engine import ANSWER_CATEGORIES, STAT_CATEGORIES
+from football.services.stats_import import setup_worker
+
+
+def warm_in_thread(configs, version):
+    """
+    warm_quizzes for a pool thread, which must close the connections it
+    opened itself.
+    """
+    try:
+        return warm_quizzes(configs, version)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Generate every club, season and overall quiz into the quiz cache."
+
+    def add_arguments(self, parser):
+        """
+        Usage:
+            python manage.py warm_quizzes --workers 8
+            python manage.py warm_quizzes --limit 10 --limit 25 --processes
+        """
+        parser.add_argument(
+            "--limit",
+            type=int,
+            action="append",
+            default=[],
+            help="Answer limit to warm (repeatable; default: 10, the quiz default)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Pool size (default: 4). 1 warms everything in this process.",
+        )
+        parser.add_argument(
+            "--processes",
+            action="store_true",
+            help="Use a process pool instead of threads.",
+        )
+
+    def handle(self, *args, **options):
+        limits = options["limit"] or [10]
+        workers = options["workers"]
+        if workers < 1:
+            raise CommandError("--workers must be at least 1.")
+        if min(limits) < 1:
+            raise CommandError("--limit must be at least 1.")
+
+        started = time.perf_counter()
+        # Everything is stored under the version the warm started with
+        version = get_data_version()
+        tasks = self.quiz_combinations(limits)
+        total = sum(len(configs) for configs in tasks)
+
+        max_entries = getattr(settings, "QUIZ_CACHE_MAX_ENTRIES", None)
+        if max_entries is not None and total > max_entries:
+            self.stderr.write(self.style.WARNING(
+                f"{total} quizzes don't fit in QUIZ_CACHE_MAX_ENTRIES={max_entries}: "
+                f"the cache will cull some of them. Raise it to at least {total}."
+            ))
+
+        totals = {"cached": 0, "generated": 0, "failed": 0}
+        for configs, result in self.run(tasks, version, workers, options["processes"]):
+            if isinstance(result, Exception):
+                totals["failed"] += len(configs)
+                self.stderr.write(f"Failed to warm {configs[0]}...: {result}")
+                continue
+            totals["cached"] += result["cached"]
+            totals["generated"] += result["generated"]
+
+        # A cache that reaches MAX_ENTRIES culls entries to make room, so
+        # count what is still there now that everything has been stored
+        covered = self.count_cached(tasks, version)
+        lost = max(totals["cached"] + totals["generated"] - covered, 0)
+
+        elapsed = time.perf_counter() - started
+        coverage = covered / total * 100 if total else 100.0
+        self.stdout.write(self.style.SUCCESS(
+            f"Warmed {covered} of {total} quizzes ({coverage:.1f}%) for data version "
+            f"{version}: {totals['generated']} generated, {totals['cached']} already "
+            f"cached, {lost} lost to culling, {totals['failed']} failed, "
+            f"in {elapsed:.2f}s."
+        ))
+
+    def quiz_combinations(self, limits):
+        """
+        Every valid quiz config, grouped into one task per scope (a club,
+        a season, or overall) so each task's stat categories can share one
+        aggregation. overall + managers is not a valid quiz and is left out.
+        """
+        scopes = [
+            ("club", {"club_id": pk}, ANSWER_CATEGORIES)
+            for pk in Club.objects.order_by("id").values_list("id", flat=True)
+        ]
+        scopes += [
+            ("season", {"season_id": pk}, ANSWER_CATEGORIES)
+            for pk in Season.objects.order_by("id").values_list("id", flat=True)
+        ]
+        scopes.append(("overall", {}, STAT_CATEGORIES))
+
+        return [
+            [
+                {"mode": mode, "category": category, "limit": limit, **ids}
+                for category in categories
+                for limit in limits
+            ]
+            for mode, ids, categories in scopes
+        ]
+
+    def count_cached(self, tasks, version):
+        """
+        How many of the tasks' quizzes are in the shared cache for version.
+        """
+        keys = [
+            shared_cache_key(quiz_cache_key(config, version))
+            for configs in tasks
+            for config in configs
+        ]
+        return len(shared_cache().get_many(keys))
+
+    def run(self, tasks, version, workers, processes):
+        """
+        Yield (configs, result or exception) for every task.
+        """
+        if workers == 1:
+            for configs in tasks:
+                try:
+                    yield configs, warm_quizzes(configs, version)
+                except Exception as exc:
+                    yield configs, exc
+            return
+
+        if processes:
+            # Forked workers must not share this process's connections
+            connections.close_all()
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=setup_worker)
+            function = warm_quizzes
+        else:
+            pool = ThreadPoolExecutor(max_workers=workers)
+            function = warm_in_thread
+
+        with pool:
+            futures = {pool.submit(function, configs, version): configs for configs in tasks}
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result()
+                except Exception as exc:
+                    yield futures[future], exc
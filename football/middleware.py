@@ -0,0 +1,232 @@
+import cProfile
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.urls import Resolver404, resolve
+
+from .routers import request_pin_scope
+from .services.metrics import registry
+from .services.profiling import QueryRecorder, build_report, store_report
+
+
+class QueryStats:
+    """
+    Database execute wrapper counting statements and the time spent in them.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+
+# QueryStats of the async request being handled. Async views run their
+# queries on another thread, so the per-request execute_wrapper used for
+# sync requests can't be installed; instead every connection gets a
+# wrapper that reports to whichever request's context it runs in.
+current_query_stats: ContextVar = ContextVar("current_query_stats", default=None)
+
+
+# QueryRecorder of the async request being profiled, the same way
+current_query_recorder: ContextVar = ContextVar("current_query_recorder", default=None)
+
+
+def count_in_context(execute, sql, params, many, context):
+    stats = current_query_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    return stats(execute, sql, params, many, context)
+
+
+def record_in_context(execute, sql, params, many, context):
+    recorder = current_query_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+@receiver(connection_created)
+def install_context_counter(sender, connection, **kwargs):
+    for wrapper in (count_in_context, record_in_context):
+        if wrapper not in connection.execute_wrappers:
+            connection.execute_wrappers.append(wrapper)
+
+
+class ReplicaPinMiddleware:
+    """
+    Keep ReplicaRouter's read-after-write pin to the request that wrote.
+    Under WSGI the pin's context variable lives on the worker thread, so
+    without this a write would send later, unrelated requests served by
+    that thread to the primary.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with request_pin_scope():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with request_pin_scope():
+            return await self.get_response(request)
+
+
+class MetricsMiddleware:
+    """
+    Record request count, latency and DB query count/time per URL name.
+    Exposed by the metrics view in Prometheus text format.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        stats = QueryStats()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            started = time.perf_counter()
+            response = self.get_response(request)
+            elapsed = time.perf_counter() - started
+
+        self.record(request, response, stats, elapsed)
+        return response
+
+    async def __acall__(self, request):
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+        try:
+            started = time.perf_counter()
+            response = await self.get_response(request)
+            elapsed = time.perf_counter() - started
+        finally:
+            current_query_stats.reset(token)
+
+        self.record(request, response, stats, elapsed)
+        return response
+
+    def record(self, request, response, stats, elapsed):
+        match = request.resolver_match
+        view = match.url_name if match is not None and match.url_name else "unmatched"
+
+        registry.inc(
+            "http_requests_total",
+            view=view,
+            method=request.method,
+            status=response.status_code,
+        )
+        registry.observe("http_request_duration_seconds", elapsed, view=view)
+        registry.inc("db_queries_total", stats.count, view=view)
+        registry.inc("db_query_duration_seconds_total", stats.seconds, view=view)
+
+
+class ProfilingMiddleware:
+    """
+    Opt-in profiling of a single request to a football API view.
+
+    Staff users send "X-Profile: 1" or "?profile=1"; the request then runs
+    under cProfile with every SQL statement recorded, and the report (top
+    functions, every statement with its plan) is stored. Its id is
+    returned in the X-Profile-Id header, for the profile report view.
+    Must come after AuthenticationMiddleware.
+
+    Under the async stack (see async_views) the statements are recorded
+    through a context variable, like MetricsMiddleware's counts, but there
+    is no function profile: cProfile only sees the thread it runs on,
+    while an async view's queries run on a worker thread and other
+    requests share the event loop.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.wants_profile(request):
+            return self.get_response(request)
+
+        recorders = []
+        profiler = cProfile.Profile()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                recorder = QueryRecorder(connection.alias)
+                recorders.append(recorder)
+                stack.enter_context(connection.execute_wrapper(recorder))
+            started = time.perf_counter()
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+            elapsed = time.perf_counter() - started
+
+        report = build_report(request, response, profiler, recorders, elapsed)
+        response["X-Profile-Id"] = store_report(report)
+        return response
+
+    async def __acall__(self, request):
+        # request.user is loaded lazily, with a sync query
+        if not await sync_to_async(self.wants_profile)(request):
+            return await self.get_response(request)
+
+        recorder = QueryRecorder()
+        token = current_query_recorder.set(recorder)
+        try:
+            started = time.perf_counter()
+            response = await self.get_response(request)
+            elapsed = time.perf_counter() - started
+        finally:
+            current_query_recorder.reset(token)
+
+        report = await sync_to_async(build_report)(request, response, None, [recorder], elapsed)
+        response["X-Profile-Id"] = await sync_to_async(store_report)(report)
+        return response
+
+    def wants_profile(self, request):
+        if not getattr(settings, "API_PROFILING_ENABLED", False):
+            return False
+        if request.headers.get("X-Profile") != "1" and request.GET.get("profile") != "1":
+            return False
+        user = getattr(request, "user", None)
+        if user is None or not user.is_staff:
+            return False
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return False
+        return getattr(match.func, "__module__", "") in ("football.views", "football.async_views")
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:29
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('football', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('club', 'Club'), ('season', 'Season'), ('overall', 'Overall')], max_length=10)),
+                ('scope_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('category', models.CharField(choices=[('goals', 'Goals'), ('assists', 'Assists'), ('appearances', 'Appearances')], max_length=20)),
+                ('position', models.PositiveIntegerField()),
+                ('rank', models.PositiveIntegerField(default=1)),
+                ('first_name', models.CharField(max_length=100)),
+                ('last_name', models.CharField(max_length=100)),
+                ('club_name', models.CharField(max_length=100)),
+                ('total', models.PositiveIntegerField()),
+                ('answer_count', models.PositiveIntegerField()),
+                ('person', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='football.person')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['scope', 'scope_id', 'category', 'position'], name='leaderboard_lookup_idx')],
+            },
+        ),
+    ]
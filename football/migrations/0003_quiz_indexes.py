@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('football', '0002_leaderboardentry'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='personclubseason',
+            index=models.Index(fields=['club', 'role'], name='pcs_club_role_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='personclubseason',
+            index=models.Index(fields=['season', 'role'], name='pcs_season_role_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='statspersonclubseason',
+            index=models.Index(condition=models.Q(('goals__gt', 0)), fields=['person_club_season'], include=('goals',), name='stats_goals_pos_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='statspersonclubseason',
+            index=models.Index(condition=models.Q(('assists__gt', 0)), fields=['person_club_season'], include=('assists',), name='stats_assists_pos_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='statspersonclubseason',
+            index=models.Index(condition=models.Q(('appearances__gt', 0)), fields=['person_club_season'], include=('appearances',), name='stats_appearances_pos_idx'),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_career_totals(apps, schema_editor):
+    StatsPersonClubSeason = apps.get_model('football', 'StatsPersonClubSeason')
+    CareerTotal = apps.get_model('football', 'CareerTotal')
+    stats = ('appearances', 'goals', 'assists')
+
+    totals = {}
+    rows = (
+        StatsPersonClubSeason.objects.values(
+            'person_club_season__person_id', 'person_club_season__club_id'
+        )
+        .annotate(**{stat: models.Sum(stat) for stat in stats})
+        .order_by()
+    )
+    for row in rows.iterator(chunk_size=5000):
+        person_id = row['person_club_season__person_id']
+        for key in ((person_id, row['person_club_season__club_id']), (person_id, None)):
+            values = totals.setdefault(key, [0, 0, 0])
+            for i, stat in enumerate(stats):
+                values[i] += row[stat] or 0
+
+    CareerTotal.objects.bulk_create(
+        [
+            CareerTotal(person_id=person_id, club_id=club_id, **dict(zip(stats, values)))
+            for (person_id, club_id), values in totals.items()
+            if any(values)
+        ],
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('football', '0003_quiz_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CareerTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('appearances', models.PositiveIntegerField(default=0)),
+                ('goals', models.PositiveIntegerField(default=0)),
+                ('assists', models.PositiveIntegerField(default=0)),
+                ('club', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='football.club')),
+                ('person', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='career_totals', to='football.person')),
+            ],
+            options={
+                'indexes': [models.Index(models.OrderBy(models.F('goals'), descending=True), condition=models.Q(('club__isnull', False), ('goals__gt', 0)), name='career_goals_idx'), models.Index(models.OrderBy(models.F('assists'), descending=True), condition=models.Q(('assists__gt', 0), ('club__isnull', False)), name='career_assists_idx'), models.Index(models.OrderBy(models.F('appearances'), descending=True), condition=models.Q(('appearances__gt', 0), ('club__isnull', False)), name='career_appearances_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='careertotal',
+            constraint=models.UniqueConstraint(condition=models.Q(('club__isnull', False)), fields=('person', 'club'), name='career_person_club_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='careertotal',
+            constraint=models.UniqueConstraint(condition=models.Q(('club__isnull', True)), fields=('person',), name='career_person_uniq'),
+        ),
+        migrations.RunPython(fill_career_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.30 on 2026-10-18 19:52
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('football', '0004_career_totals'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=500, unique=True)),
+                ('fingerprint', models.CharField(max_length=100)),
+                ('last_row', models.PositiveIntegerField(default=1)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ImportedRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_key', models.CharField(max_length=40, unique=True)),
+                ('content_hash', models.CharField(max_length=40)),
+                ('imported_at', models.DateTimeField(auto_now=True)),
+                ('person_club_season', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='football.personclubseason')),
+            ],
+        ),
+    ]
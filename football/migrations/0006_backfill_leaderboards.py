@@ -0,0 +1,82 @@
+from django.db import migrations, models
+from django.db.models.functions import Rank, RowNumber
+
+
+def fill_leaderboards(apps, schema_editor):
+    """
+    Build the leaderboards for data imported before they existed:
+    QUIZ_USE_LEADERBOARDS is on by default, and an empty table would
+    serve empty quizzes until the next import_stats. A frozen copy of
+    services.leaderboards.ranked_boards: positions and ranks come from
+    window functions, in the database's collation.
+    """
+    StatsPersonClubSeason = apps.get_model('football', 'StatsPersonClubSeason')
+    LeaderboardEntry = apps.get_model('football', 'LeaderboardEntry')
+    if LeaderboardEntry.objects.exists():
+        return
+
+    scope_fields = {
+        'club': 'person_club_season__club_id',
+        'season': 'person_club_season__season_id',
+        'overall': None,
+    }
+    group_fields = [
+        'person_club_season__person_id',
+        'person_club_season__person__first_name',
+        'person_club_season__person__last_name',
+        'person_club_season__club__name',
+    ]
+
+    for category in ('goals', 'assists', 'appearances'):
+        for scope, scope_field in scope_fields.items():
+            partition = [models.F(scope_field)] if scope_field else None
+            rows = (
+                StatsPersonClubSeason.objects.filter(**{f'{category}__gt': 0})
+                .values(*([scope_field] if scope_field else []), *group_fields)
+                .annotate(total=models.Sum(category))
+                .annotate(
+                    position=models.Window(
+                        RowNumber(),
+                        partition_by=partition,
+                        order_by=[
+                            models.F('total').desc(),
+                            models.F('person_club_season__person__last_name').asc(),
+                            models.F('person_club_season__person_id').asc(),
+                            models.F('person_club_season__club__name').asc(),
+                        ],
+                    ),
+                    rank=models.Window(Rank(), partition_by=partition, order_by=models.F('total').desc()),
+                    answer_count=models.Window(models.Count('*'), partition_by=partition),
+                )
+                .order_by()
+            )
+            LeaderboardEntry.objects.bulk_create(
+                (
+                    LeaderboardEntry(
+                        scope=scope,
+                        scope_id=row[scope_field] if scope_field else None,
+                        category=category,
+                        position=row['position'],
+                        rank=row['rank'],
+                        person_id=row['person_club_season__person_id'],
+                        first_name=row['person_club_season__person__first_name'],
+                        last_name=row['person_club_season__person__last_name'],
+                        club_name=row['person_club_season__club__name'],
+                        total=row['total'],
+                        answer_count=row['answer_count'],
+                    )
+                    for row in rows.iterator(chunk_size=5000)
+                ),
+                batch_size=2000,
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('football', '0005_import_tracking'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_leaderboards, migrations.RunPython.noop),
+    ]
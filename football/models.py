@@ -1,3 +1,5 @@
+import uuid
+
 from django.db import models
 
 class Club(models.Model):
@@ -39,6 +41,11 @@ class PersonClubSeason(models.Model):
 
     class Meta:
         unique_together = ('person', 'club', 'season', 'role')
+        indexes = [
+            # Quiz filters: club/season quizzes always filter by role too
+            models.Index(fields=['club', 'role'], name='pcs_club_role_idx'),
+            models.Index(fields=['season', 'role'], name='pcs_season_role_idx'),
+        ]
 
     def __str__(self):
         return f"{self.person.full_name} - {self.club.name} - {self.season.label} ({self.role})"
@@ -53,5 +60,146 @@ class StatsPersonClubSeason(models.Model):
     goals = models.PositiveIntegerField(default=0)
     assists = models.PositiveIntegerField(default=0)
 
+    class Meta:
+        # Covering partial indexes for the quiz "<stat> > 0" aggregations
+        indexes = [
+            models.Index(
+                fields=['person_club_season'],
+                include=[stat],
+                condition=models.Q(**{f'{stat}__gt': 0}),
+                name=f'stats_{stat}_pos_idx',
+            )
+            for stat in ('goals', 'assists', 'appearances')
+        ]
+
+    def __str__(self):
+        return f"Stats for {self.person_club_season}"
+
+class LeaderboardEntry(models.Model):
+    """
+    Pre-ranked quiz answers, rebuilt by import_stats.
+    One row per (scope, scope_id, category, position).
+    """
+    SCOPE_CLUB = 'club'
+    SCOPE_SEASON = 'season'
+    SCOPE_OVERALL = 'overall'
+
+    SCOPE_CHOICES = [
+        (SCOPE_CLUB, 'Club'),
+        (SCOPE_SEASON, 'Season'),
+        (SCOPE_OVERALL, 'Overall'),
+    ]
+
+    CATEGORY_CHOICES = [
+        ('goals', 'Goals'),
+        ('assists', 'Assists'),
+        ('appearances', 'Appearances'),
+    ]
+
+    scope = models.CharField(max_length=10, choices=SCOPE_CHOICES)
+    scope_id = models.PositiveIntegerField(null=True, blank=True)
+    category = models.CharField(max_length=20, choices=CATEGORY_CHOICES)
+    position = models.PositiveIntegerField()
+    rank = models.PositiveIntegerField(default=1)
+    person = models.ForeignKey(Person, on_delete=models.CASCADE)
+    first_name = models.CharField(max_length=100)
+    last_name = models.CharField(max_length=100)
+    club_name = models.CharField(max_length=100)
+    total = models.PositiveIntegerField()
+    answer_count = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['scope', 'scope_id', 'category', 'position'],
+                name='leaderboard_lookup_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.scope}:{self.scope_id} {self.category} #{self.position} {self.first_name} {self.last_name}"
+
+class CareerTotal(models.Model):
+    """
+    Career stat totals, kept up to date incrementally by import_stats.
+    One row per (person, club), plus one per person with club=None for
+    their totals across every club.
+    """
+    person = models.ForeignKey(Person, on_delete=models.CASCADE, related_name='career_totals')
+    club = models.ForeignKey(Club, on_delete=models.CASCADE, null=True, blank=True)
+    appearances = models.PositiveIntegerField(default=0)
+    goals = models.PositiveIntegerField(default=0)
+    assists = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['person', 'club'],
+                condition=models.Q(club__isnull=False),
+                name='career_person_club_uniq',
+            ),
+            models.UniqueConstraint(
+                fields=['person'],
+                condition=models.Q(club__isnull=True),
+                name='career_person_uniq',
+            ),
+        ]
+        # Overall quizzes rank the per-club rows by one stat
+        indexes = [
+            models.Index(
+                models.F(stat).desc(),
+                condition=models.Q(club__isnull=False, **{f'{stat}__gt': 0}),
+                name=f'career_{stat}_idx',
+            )
+            for stat in ('goals', 'assists', 'appearances')
+        ]
+
+    def __str__(self):
+        return f"Career totals for {self.person} at {self.club or 'all clubs'}"
+
+class ImportedRow(models.Model):
+    """
+    Last imported content of a CSV row, for `import_stats --incremental`.
+    source_key hashes the file and the row's identifying columns (person,
+    club, season, role) and content_hash its stats, so an unchanged row can be skipped.
+    """
+    source_key = models.CharField(max_length=40, unique=True)
+    content_hash = models.CharField(max_length=40)
+    person_club_season = models.ForeignKey(PersonClubSeason, on_delete=models.CASCADE)
+    imported_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Imported row {self.source_key} -> {self.person_club_season_id}"
+
+class ImportCheckpoint(models.Model):
+    """
+    Progress of an incremental import, saved with every committed chunk
+    so a crashed import of the same file resumes after `last_row`.
+    """
+    source = models.CharField(max_length=500, unique=True)
+    fingerprint = models.CharField(max_length=100)
+    last_row = models.PositiveIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.source} at row {self.last_row}"
+
+class QuizSession(models.Model):
+    """
+    A quiz being played through quizzes/<id>/guess/. The answers stay on
+    the server: a player learns each one by guessing it, or all of them
+    from quizzes/<id>/reveal/, which ends the session.
+
+    found is a hex bitset (bit n = answer n found). found_count only ever
+    grows, so it doubles as the bitset's version: guesses update the row
+    with a compare-and-set on it. Expired sessions are deleted by
+    `manage.py clear_quiz_sessions`.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    answers = models.JSONField()
+    found = models.TextField(default='0')
+    found_count = models.PositiveIntegerField(default=0)
+    expires_at = models.DateTimeField(db_index=True)
+
     def __str__(self):
-        return f"Stats for {self.person_club_season}"
\ No newline at end of file
+        return f"Quiz session {self.id} ({self.found_count}/{len(self.answers)} found)"
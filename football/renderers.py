@@ -0,0 +1,91 @@
+import json
+from typing import Any
+
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # orjson is optional: the standard library encoder is the fallback
+    orjson = None
+
+
+# URL names of the endpoints that offer ?shape=columns: quizzes and the
+# club/season reference lists
+COLUMN_VIEWS = frozenset({
+    "quiz", "quiz-generate", "quiz-generate-batch", "list_clubs", "list_seasons",
+})
+
+
+def wants_columns(request) -> bool:
+    """
+    True when the client asked one of the COLUMN_VIEWS for the columnar
+    shape (?shape=columns).
+    """
+    match = getattr(request, "resolver_match", None)
+    return (
+        request.GET.get("shape") == "columns"
+        and match is not None
+        and match.url_name in COLUMN_VIEWS
+    )
+
+
+def to_columns(data: Any) -> Any:
+    """
+    The columnar shape of a response: every non-empty list of dicts that
+    share the same keys becomes one object of parallel arrays, e.g.
+    [{"id": 1, "name": "A"}, {"id": 2, "name": "B"}]
+    -> {"id": [1, 2], "name": ["A", "B"]}, and so does every such list
+    inside those arrays (the answers of each quiz in a batch).
+    Anything else, including empty lists, keeps its shape.
+    """
+    if isinstance(data, dict):
+        return {key: to_columns(value) for key, value in data.items()}
+    if isinstance(data, list):
+        if data and all(isinstance(item, dict) for item in data):
+            keys = list(data[0])
+            if all(len(item) == len(keys) and all(key in item for key in keys) for item in data):
+                return {key: to_columns([item[key] for item in data]) for key in keys}
+        return [to_columns(item) for item in data]
+    return data
+
+
+_encoder = JSONEncoder()
+
+
+def dumps(data: Any) -> bytes:
+    """
+    Compact UTF-8 JSON, with orjson when it is installed. Types JSON
+    doesn't know (Decimal, lazy strings, ...) are encoded as DRF does.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=_encoder.default)
+    return json.dumps(
+        data, cls=JSONEncoder, ensure_ascii=False, separators=(",", ":"), allow_nan=False
+    ).encode("utf-8")
+
+
+class FastJSONRenderer(BaseRenderer):
+    """
+    DRF JSON renderer using dumps() (orjson when available), with the
+    columnar response shape on request for successful responses of the
+    COLUMN_VIEWS. Output is otherwise the same JSON as
+    rest_framework.renderers.JSONRenderer's compact form.
+    """
+
+    media_type = "application/json"
+    format = "json"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        request = (renderer_context or {}).get("request")
+        response = (renderer_context or {}).get("response")
+        if (
+            request is not None
+            and wants_columns(request)
+            and (response is None or response.status_code < 400)
+        ):
+            data = to_columns(data)
+        return dumps(data)
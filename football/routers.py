@@ -0,0 +1,121 @@
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+# Reads of these apps' models may go to a replica
+ROUTED_APPS = {"football"}
+
+# Depth of use_primary() blocks, and (monotonic) time until which the
+# current request keeps reading from the primary after a write (reset
+# for every request by ReplicaPinMiddleware)
+_primary_depth: ContextVar = ContextVar("primary_depth", default=0)
+_pinned_until: ContextVar = ContextVar("primary_pinned_until", default=0.0)
+
+# Last data change seen by this process, re-read from the cache at most
+# once a second: {"checked": time.time(), "modified": time.time()}
+_last_change = {"checked": 0.0, "modified": 0.0}
+
+
+def replica_aliases():
+    return list(getattr(settings, "DATABASE_REPLICAS", []))
+
+
+def sticky_seconds() -> float:
+    return getattr(settings, "DATABASE_REPLICA_STICKY_SECONDS", 5)
+
+
+@contextmanager
+def use_primary():
+    """
+    Send every read inside the block to the primary, e.g. for a command
+    that reads back what it just wrote.
+    """
+    token = _primary_depth.set(_primary_depth.get() + 1)
+    try:
+        yield
+    finally:
+        _primary_depth.reset(token)
+
+
+@contextmanager
+def request_pin_scope():
+    """
+    Start a request with no read-after-write pin, and drop the pins its
+    writes set when it ends.
+    """
+    token = _pinned_until.set(0.0)
+    try:
+        yield
+    finally:
+        _pinned_until.reset(token)
+
+
+def data_changed_recently() -> bool:
+    """
+    True within DATABASE_REPLICA_STICKY_SECONDS of the last import or
+    admin edit anywhere (bump_data_version), while replicas may lag.
+    """
+    now = time.time()
+    if now - _last_change["checked"] >= 1.0:
+        from football.services.quiz_cache import get_data_last_modified
+
+        _last_change["modified"] = get_data_last_modified()
+        _last_change["checked"] = now
+    return now - _last_change["modified"] < sticky_seconds()
+
+
+def primary_pinned() -> bool:
+    return (
+        _primary_depth.get() > 0
+        or _pinned_until.get() > time.monotonic()
+        or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        or data_changed_recently()
+    )
+
+
+class ReplicaRouter:
+    """
+    Reads of football models go to a random alias in
+    settings.DATABASE_REPLICAS; writes, and everything else, go to the
+    primary ("default").
+
+    Reads stay on the primary:
+    - inside use_primary() and inside transactions on the primary;
+    - for DATABASE_REPLICA_STICKY_SECONDS after this request (thread/task
+      outside requests) wrote a football model;
+    - for DATABASE_REPLICA_STICKY_SECONDS after any data change
+      (import_stats, admin edits), to cover replica lag.
+    """
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label not in ROUTED_APPS:
+            return None
+        replicas = replica_aliases()
+        if not replicas or primary_pinned():
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        # Sessions, auth etc. are never read from a replica, so their
+        # writes don't need to pin the football reads that follow
+        if model._meta.app_label in ROUTED_APPS:
+            _pinned_until.set(time.monotonic() + sticky_seconds())
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema through replication
+        if db in replica_aliases():
+            return False
+        return None
@@ -0,0 +1,124 @@
+import math
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle
+from typing import Any, Callable, Dict, List
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of a list of samples.
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(math.ceil(pct / 100 * len(ordered)) - 1, 0)
+    return ordered[index]
+
+
+def summarize(samples_ms: List[float], queries: int) -> Dict[str, Any]:
+    return {
+        "iterations": len(samples_ms),
+        "p50_ms": round(percentile(samples_ms, 50), 3),
+        "p95_ms": round(percentile(samples_ms, 95), 3),
+        "mean_ms": round(sum(samples_ms) / len(samples_ms), 3) if samples_ms else 0.0,
+        "queries": queries,
+    }
+
+
+def measure(fn: Callable[[], Any], iterations: int = 20, warmup: int = 1) -> Dict[str, Any]:
+    """
+    Time `fn` over several iterations. Queries are counted on the first
+    measured run (they are the same on every run).
+    """
+    for _ in range(warmup):
+        fn()
+
+    samples: List[float] = []
+    queries = 0
+    for i in range(iterations):
+        if i == 0:
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                fn()
+                samples.append((time.perf_counter() - started) * 1000)
+            queries = len(captured)
+        else:
+            started = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - started) * 1000)
+
+    return summarize(samples, queries)
+
+
+def compare(previous: Dict[str, Any], current: Dict[str, Any], metric: str = "p50_ms") -> List[str]:
+    """
+    Human-readable lines comparing `metric` between two benchmark reports.
+    """
+    lines = []
+    for section, results in current.items():
+        if not isinstance(results, dict) or section == "meta":
+            continue
+        for name, result in results.items():
+            before = previous.get(section, {}).get(name, {}).get(metric)
+            after = result.get(metric) if isinstance(result, dict) else None
+            if before is None or after is None:
+                continue
+            change = (after - before) / before * 100 if before else 0.0
+            lines.append(f"{section}/{name}: {before} -> {after} {metric} ({change:+.1f}%)")
+    return lines
+
+
+def load_test(base_url: str, paths: List[str], requests: int, concurrency: int, timeout: float = 30.0) -> Dict[str, Any]:
+    """
+    Send `requests` GETs, cycling through `paths`, from `concurrency`
+    client threads against a running server. Returns throughput, latency
+    percentiles and the number of failed (non-2xx/3xx or errored) requests.
+    """
+    targets = cycle(paths)
+    lock = threading.Lock()
+    samples: List[float] = []
+    errors = 0
+
+    def next_path():
+        with lock:
+            return next(targets)
+
+    def send(_):
+        nonlocal errors
+        url = base_url.rstrip("/") + next_path()
+        started = time.perf_counter()
+        try:
+            with urllib.request.urlopen(url, timeout=timeout) as response:
+                response.read()
+            ok = True
+        except (urllib.error.URLError, OSError):
+            ok = False
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with lock:
+            if ok:
+                samples.append(elapsed_ms)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(send, range(requests)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(len(samples) / elapsed, 1) if elapsed else None,
+        "p50_ms": round(percentile(samples, 50), 3),
+        "p95_ms": round(percentile(samples, 95), 3),
+        "p99_ms": round(percentile(samples, 99), 3),
+        "max_ms": round(max(samples), 3) if samples else 0.0,
+    }
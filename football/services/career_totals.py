@@ -0,0 +1,203 @@
+from collections import defaultdict
+from typing import Any, Collection, Dict, List, Optional, Tuple
+from django.db import transaction
+from django.db.models import Count, F, Sum, Window
+from django.db.models.functions import Rank
+from football.models import CareerTotal, StatsPersonClubSeason
+
+
+STATS = ("appearances", "goals", "assists")
+
+# (person_id, club_id or None) -> (appearances, goals, assists)
+TotalsKey = Tuple[int, Optional[int]]
+Totals = Tuple[int, int, int]
+
+
+def stats_delta(old: Optional[Totals], new: Totals) -> Totals:
+    """
+    Change in (appearances, goals, assists) when a stats row goes from
+    old (None if it is being created) to new.
+    """
+    old = old or (0, 0, 0)
+    return tuple(after - before for before, after in zip(old, new))
+
+
+def apply_deltas(deltas: Dict[Tuple[int, int], Totals]) -> int:
+    """
+    Add per (person_id, club_id) stat changes to the career totals, both
+    the per-club rows and each person's all-clubs row. Only the affected
+    people's rows are read and written. Returns the number of rows touched.
+    """
+    combined: Dict[TotalsKey, List[int]] = defaultdict(lambda: [0, 0, 0])
+    for (person_id, club_id), delta in deltas.items():
+        for key in ((person_id, club_id), (person_id, None)):
+            row = combined[key]
+            for i, change in enumerate(delta):
+                row[i] += change
+
+    combined = {key: row for key, row in combined.items() if any(row)}
+    if not combined:
+        return 0
+
+    with transaction.atomic():
+        existing = {
+            (total.person_id, total.club_id): total
+            for total in CareerTotal.objects.select_for_update().filter(
+                person_id__in={person_id for person_id, _ in combined}
+            )
+        }
+
+        to_update = []
+        to_create = []
+        for (person_id, club_id), delta in combined.items():
+            total = existing.get((person_id, club_id))
+            if total is None:
+                to_create.append(CareerTotal(
+                    person_id=person_id,
+                    club_id=club_id,
+                    **dict(zip(STATS, delta)),
+                ))
+                continue
+            for stat, change in zip(STATS, delta):
+                setattr(total, stat, getattr(total, stat) + change)
+            to_update.append(total)
+
+        if to_update:
+            CareerTotal.objects.bulk_update(to_update, list(STATS), batch_size=1000)
+        if to_create:
+            CareerTotal.objects.bulk_create(to_create, batch_size=1000)
+
+    return len(combined)
+
+
+def compute_career_totals(
+    person_ids: Optional[Collection[int]] = None,
+) -> Dict[TotalsKey, Totals]:
+    """
+    Career totals recomputed from scratch from StatsPersonClubSeason,
+    for everyone or only person_ids. Rows that are all zero are left out.
+    """
+    totals: Dict[TotalsKey, List[int]] = defaultdict(lambda: [0, 0, 0])
+    stats = StatsPersonClubSeason.objects.all()
+    if person_ids is not None:
+        stats = stats.filter(person_club_season__person_id__in=person_ids)
+    rows = (
+        stats.values(
+            "person_club_season__person_id", "person_club_season__club_id"
+        )
+        .annotate(**{stat: Sum(stat) for stat in STATS})
+        .order_by()
+    )
+    for row in rows.iterator(chunk_size=5000):
+        person_id = row["person_club_season__person_id"]
+        values = [row[stat] or 0 for stat in STATS]
+        for key in ((person_id, row["person_club_season__club_id"]), (person_id, None)):
+            for i, value in enumerate(values):
+                totals[key][i] += value
+    return {key: tuple(values) for key, values in totals.items() if any(values)}
+
+
+def stored_career_totals() -> Dict[TotalsKey, Totals]:
+    return {
+        (person_id, club_id): tuple(values)
+        for person_id, club_id, *values in CareerTotal.objects.values_list(
+            "person_id", "club_id", *STATS
+        ).iterator(chunk_size=5000)
+        if any(values)
+    }
+
+
+def diff_career_totals() -> List[Dict[str, Any]]:
+    """
+    Differences between the stored totals and a from-scratch recompute:
+    [{"person_id", "club_id", "stored", "expected"}], empty when in sync.
+    """
+    expected = compute_career_totals()
+    stored = stored_career_totals()
+    return [
+        {
+            "person_id": person_id,
+            "club_id": club_id,
+            "stored": stored.get((person_id, club_id)),
+            "expected": expected.get((person_id, club_id)),
+        }
+        for person_id, club_id in sorted(
+            expected.keys() | stored.keys(), key=lambda key: (key[0], key[1] or 0)
+        )
+        if stored.get((person_id, club_id)) != expected.get((person_id, club_id))
+    ]
+
+
+def rebuild_career_totals(person_ids: Optional[Collection[int]] = None) -> int:
+    """
+    Replace every career total (or only person_ids' totals) with a
+    from-scratch recompute, in one transaction. Returns the number of
+    rows written.
+    """
+    totals = compute_career_totals(person_ids)
+    stale = CareerTotal.objects.all()
+    if person_ids is not None:
+        stale = stale.filter(person_id__in=person_ids)
+    with transaction.atomic():
+        stale.delete()
+        CareerTotal.objects.bulk_create(
+            [
+                CareerTotal(person_id=person_id, club_id=club_id, **dict(zip(STATS, values)))
+                for (person_id, club_id), values in totals.items()
+            ],
+            batch_size=2000,
+        )
+    return len(totals)
+
+
+def career_ranked_query(category: str):
+    """
+    Per-club career rows ranked by one stat: the same rows, ranks and
+    order as quiz_engine.ranked_stats_query in overall mode, without
+    summing every season at request time.
+    """
+    total_field = f"total_{category}"
+    return (
+        CareerTotal.objects.filter(club__isnull=False, **{f"{category}__gt": 0})
+        .values(
+            "person_id",
+            "person__first_name",
+            "person__last_name",
+            "club__name",
+            **{total_field: F(category)},
+        )
+        .annotate(
+            rank=Window(Rank(), order_by=F(category).desc()),
+            answer_count=Window(Count("*")),
+        )
+        .order_by(f"-{category}", "person__last_name", "person_id", "club__name")
+    )
+
+
+def career_answer(row, category: str) -> Tuple[int, Dict[str, Any]]:
+    """
+    (answer_count, answer) for one career_ranked_query row.
+    """
+    total_field = f"total_{category}"
+    full_name = f"{row['person__first_name']} {row['person__last_name']}"
+    return row["answer_count"], {
+        "id": row["person_id"],
+        "rank": row["rank"],
+        "name": full_name.strip(),
+        "first_name": row["person__first_name"],
+        "last_name": row["person__last_name"],
+        "club": row["club__name"],
+        total_field: row[total_field],
+    }
+
+
+def career_answers(rows, category: str) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    (max_answers, answers) from career_ranked_query rows.
+    """
+    max_answers = 0
+    answers: List[Dict[str, Any]] = []
+    for row in rows:
+        max_answers, answer = career_answer(row, category)
+        answers.append(answer)
+    return max_answers, answers
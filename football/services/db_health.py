@@ -0,0 +1,127 @@
+import time
+import weakref
+from typing import Any, Dict, Optional
+from django.db import DatabaseError, connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+# Every DatabaseWrapper (one per alias and thread) that has connected in
+# this process. With CONN_MAX_AGE > 0 their connections stay open between
+# requests, so this is the process's share of the connection "pool".
+_wrappers = weakref.WeakSet()
+
+
+@receiver(connection_created)
+def track_connection(sender, connection, **kwargs):
+    _wrappers.add(connection)
+
+
+def process_connections(alias: str) -> Dict[str, int]:
+    """
+    Connections to `alias` held by this process: open ones, and those of
+    them inside a transaction (i.e. checked out for a request right now).
+    """
+    wrappers = [w for w in list(_wrappers) if w.alias == alias and w.connection is not None]
+    return {
+        "open": len(wrappers),
+        "in_transaction": sum(1 for w in wrappers if w.in_atomic_block),
+    }
+
+
+def server_connections(alias: str) -> Optional[Dict[str, int]]:
+    """
+    Connections to this database across every worker, from PostgreSQL's
+    pg_stat_activity: in use (running a statement), idle, idle inside a
+    transaction, and waiting on a lock. None on other databases.
+    """
+    connection = connections[alias]
+    if connection.vendor != "postgresql":
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT
+                count(*) FILTER (WHERE state = 'active'),
+                count(*) FILTER (WHERE state = 'idle'),
+                count(*) FILTER (WHERE state IN ('idle in transaction', 'idle in transaction (aborted)')),
+                count(*) FILTER (WHERE wait_event_type = 'Lock'),
+                current_setting('max_connections')::int
+            FROM pg_stat_activity
+            WHERE datname = current_database() AND backend_type = 'client backend'
+            """
+        )
+        in_use, idle, idle_in_transaction, waiting, max_connections = cursor.fetchone()
+
+    return {
+        "in_use": in_use,
+        "idle": idle,
+        "idle_in_transaction": idle_in_transaction,
+        "waiting": waiting,
+        "max_connections": max_connections,
+    }
+
+
+def replica_lag(alias: str) -> Optional[float]:
+    """
+    Seconds since the last transaction replayed on a PostgreSQL standby.
+    None on a primary or on other databases.
+    """
+    connection = connections[alias]
+    if connection.vendor != "postgresql":
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT CASE WHEN pg_is_in_recovery() "
+            "THEN EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+        )
+        lag = cursor.fetchone()[0]
+    return float(lag) if lag is not None else None
+
+
+def ping_database(alias: str = "default") -> bool:
+    """
+    True if the database answers a SELECT 1.
+    """
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+    except DatabaseError:
+        return False
+    return True
+
+
+def check_database(alias: str = "default") -> Dict[str, Any]:
+    """
+    Readiness of one database: a round trip (SELECT 1) with its latency,
+    the persistent-connection settings and connection usage.
+    """
+    connection = connections[alias]
+    report: Dict[str, Any] = {
+        "alias": alias,
+        "vendor": connection.vendor,
+        "conn_max_age": connection.settings_dict.get("CONN_MAX_AGE"),
+        "conn_health_checks": connection.settings_dict.get("CONN_HEALTH_CHECKS"),
+    }
+
+    try:
+        started = time.perf_counter()
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+        report["latency_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        report["replica_lag_seconds"] = replica_lag(alias)
+        report["connections"] = {
+            "process": process_connections(alias),
+            "server": server_connections(alias),
+        }
+    except DatabaseError as exc:
+        report["ok"] = False
+        report["error"] = str(exc).strip()
+        return report
+
+    report["ok"] = True
+    return report
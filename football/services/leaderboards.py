@@ -0,0 +1,223 @@
+from typing import Any, Collection, Dict, List, Optional, Tuple
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum, Window
+from django.db.models.functions import Rank, RowNumber
+from football.models import LeaderboardEntry, StatsPersonClubSeason
+
+
+LEADERBOARD_CATEGORIES = ("goals", "assists", "appearances")
+
+# Scope -> the PersonClubSeason column the leaderboard is partitioned by
+SCOPE_FIELDS = {
+    LeaderboardEntry.SCOPE_CLUB: "person_club_season__club_id",
+    LeaderboardEntry.SCOPE_SEASON: "person_club_season__season_id",
+    LeaderboardEntry.SCOPE_OVERALL: None,
+}
+
+
+def resolve_scope(mode: str, club_id: Any, season_id: Any) -> Tuple[str, Optional[int]]:
+    """
+    Map a quiz mode + ids to a leaderboard (scope, scope_id).
+    Mirrors generate_quiz: a club/season quiz without an id is unfiltered.
+    """
+    if mode == "club" and club_id:
+        return LeaderboardEntry.SCOPE_CLUB, int(club_id)
+    if mode == "season" and season_id:
+        return LeaderboardEntry.SCOPE_SEASON, int(season_id)
+    return LeaderboardEntry.SCOPE_OVERALL, None
+
+
+def leaderboard_query(mode: str, category: str, club_id: Any, season_id: Any):
+    """
+    Entries of one leaderboard in position order: a range read on the
+    (scope, scope_id, category, position) index.
+    """
+    scope, scope_id = resolve_scope(mode, club_id, season_id)
+    return (
+        LeaderboardEntry.objects.filter(
+            scope=scope, scope_id=scope_id, category=category
+        )
+        .order_by("position")
+        .values_list(
+            "person_id", "rank", "first_name", "last_name", "club_name", "total",
+            "answer_count",
+        )
+    )
+
+
+def leaderboard_answer(row, category: str) -> Tuple[int, Dict[str, Any]]:
+    """
+    (answer_count, answer) for one leaderboard_query row.
+    """
+    person_id, rank, first_name, last_name, club_name, total, answer_count = row
+    full_name = f"{first_name} {last_name}"
+    return answer_count, {
+        'id': person_id,
+        'rank': rank,
+        'name': full_name.strip(),
+        'first_name': first_name,
+        'last_name': last_name,
+        'club': club_name,
+        f'total_{category}': total,
+    }
+
+
+def leaderboard_answers(rows, category: str) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    (max_answers, answers) from leaderboard_query rows.
+    """
+    max_answers = 0
+    answers: List[Dict[str, Any]] = []
+    for row in rows:
+        max_answers, answer = leaderboard_answer(row, category)
+        answers.append(answer)
+    return max_answers, answers
+
+
+def read_leaderboard(
+    mode: str, category: str, club_id: Any, season_id: Any, limit: int
+) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    Return (max_answers, answers) for a quiz from the precomputed table.
+    """
+    rows = leaderboard_query(mode, category, club_id, season_id)[:limit]
+    return leaderboard_answers(rows, category)
+
+
+def read_leaderboards(
+    mode: str, club_id: Any, season_id: Any, limits: Dict[str, int]
+) -> Dict[str, Tuple[int, List[Dict[str, Any]]]]:
+    """
+    {category: (max_answers, answers)} for several categories of one
+    scope, each cut to limits[category], in one range read per category
+    on the same index as leaderboard_query.
+    """
+    scope, scope_id = resolve_scope(mode, club_id, season_id)
+    wanted = Q()
+    for category, limit in limits.items():
+        wanted |= Q(category=category, position__lte=limit)
+    rows = (
+        LeaderboardEntry.objects.filter(wanted, scope=scope, scope_id=scope_id)
+        .order_by("category", "position")
+        .values_list(
+            "category", "person_id", "rank", "first_name", "last_name", "club_name", "total",
+            "answer_count",
+        )
+    )
+    counts: Dict[str, int] = dict.fromkeys(limits, 0)
+    answers: Dict[str, List[Dict[str, Any]]] = {category: [] for category in limits}
+    for category, *row in rows:
+        counts[category], answer = leaderboard_answer(row, category)
+        answers[category].append(answer)
+    return {category: (counts[category], answers[category]) for category in limits}
+
+
+def ranked_boards(
+    scope: str, category: str, scope_ids: Optional[Collection[int]] = None
+):
+    """
+    Every leaderboard of one scope/category as one query: the per-person
+    and club totals with position, rank and answer count computed by
+    window functions partitioned by the scope column. Positions follow
+    the ORM engine's ORDER BY, so ties on names are broken in the
+    database's collation, not Python's.
+    """
+    scope_field = SCOPE_FIELDS[scope]
+    group_fields = [
+        'person_club_season__person_id',
+        'person_club_season__person__first_name',
+        'person_club_season__person__last_name',
+        'person_club_season__club__name',
+    ]
+    if scope_field:
+        group_fields.insert(0, scope_field)
+    partition = [F(scope_field)] if scope_field else None
+
+    rows = StatsPersonClubSeason.objects.filter(**{f"{category}__gt": 0})
+    if scope_field and scope_ids is not None:
+        rows = rows.filter(**{f"{scope_field}__in": scope_ids})
+    return (
+        rows.values(*group_fields)
+        .annotate(total=Sum(category))
+        .annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=partition,
+                order_by=[
+                    F('total').desc(),
+                    F('person_club_season__person__last_name').asc(),
+                    F('person_club_season__person_id').asc(),
+                    F('person_club_season__club__name').asc(),
+                ],
+            ),
+            # Same RANK() semantics as the ORM path: ties share a rank
+            rank=Window(Rank(), partition_by=partition, order_by=F('total').desc()),
+            answer_count=Window(Count('*'), partition_by=partition),
+        )
+        .order_by()
+    )
+
+
+def build_entries(
+    scope: str, category: str, scope_ids: Optional[Collection[int]] = None
+) -> List[LeaderboardEntry]:
+    """
+    Rank every leaderboard of one scope/category, or only the club/season
+    boards in scope_ids, into unsaved LeaderboardEntry rows.
+    """
+    scope_field = SCOPE_FIELDS[scope]
+    return [
+        LeaderboardEntry(
+            scope=scope,
+            scope_id=row[scope_field] if scope_field else None,
+            category=category,
+            position=row['position'],
+            rank=row['rank'],
+            person_id=row['person_club_season__person_id'],
+            first_name=row['person_club_season__person__first_name'],
+            last_name=row['person_club_season__person__last_name'],
+            club_name=row['person_club_season__club__name'],
+            total=row['total'],
+            answer_count=row['answer_count'],
+        )
+        for row in ranked_boards(scope, category, scope_ids).iterator(chunk_size=5000)
+    ]
+
+
+def rebuild_leaderboards(
+    club_ids: Optional[Collection[int]] = None,
+    season_ids: Optional[Collection[int]] = None,
+) -> int:
+    """
+    Recompute the leaderboards from StatsPersonClubSeason.
+    With club_ids and/or season_ids only those club and season boards (and
+    the overall boards, which every row feeds) are rebuilt; with neither,
+    every board is.
+    Runs in one transaction so readers never see a half-built table.
+    Returns the number of entries written.
+    """
+    partial = club_ids is not None or season_ids is not None
+    scope_ids = {
+        LeaderboardEntry.SCOPE_CLUB: set(club_ids or ()),
+        LeaderboardEntry.SCOPE_SEASON: set(season_ids or ()),
+        LeaderboardEntry.SCOPE_OVERALL: None,
+    }
+    written = 0
+    with transaction.atomic():
+        if partial:
+            for scope, ids in scope_ids.items():
+                stale = LeaderboardEntry.objects.filter(scope=scope)
+                if ids is not None:
+                    stale = stale.filter(scope_id__in=ids)
+                stale.delete()
+        else:
+            LeaderboardEntry.objects.all().delete()
+        for category in LEADERBOARD_CATEGORIES:
+            for scope in SCOPE_FIELDS:
+                ids = scope_ids[scope] if partial else None
+                if ids is not None and not ids:
+                    continue
+                entries = build_entries(scope, category, ids)
+                LeaderboardEntry.objects.bulk_create(entries, batch_size=2000)
+                written += len(entries)
+    return written
@@ -0,0 +1,192 @@
+import re
+import unicodedata
+from collections import Counter
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Tuple
+
+
+# Letters that NFKD doesn't split into base letter + accent
+SPECIAL_LETTERS = str.maketrans({
+    "ø": "o", "Ø": "o", "æ": "ae", "Æ": "ae", "œ": "oe", "Œ": "oe",
+    "ß": "ss", "đ": "d", "Đ": "d", "ł": "l", "Ł": "l", "ı": "i",
+    "þ": "th", "Þ": "th", "ð": "d", "Ð": "d",
+})
+APOSTROPHES = re.compile(r"['’`.]")
+SEPARATORS = re.compile(r"[^a-z0-9]+")
+
+
+def fold_name(text: str) -> str:
+    """
+    Accent-, case- and punctuation-insensitive key for a name:
+    "Martin Ødegaard" -> "martin odegaard", "N'Golo Kanté" -> "ngolo kante".
+    """
+    text = (text or "").translate(SPECIAL_LETTERS)
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = APOSTROPHES.sub("", text.casefold())
+    return SEPARATORS.sub(" ", text).strip()
+
+
+def max_typos(key: str) -> int:
+    """
+    Edit-distance budget for a guess: none for short names, where a
+    single edit usually turns one real name into another.
+    """
+    if len(key) <= 4:
+        return 0
+    if len(key) <= 8:
+        return 1
+    return 2
+
+
+def bounded_levenshtein(a: str, b: str, bound: int) -> int:
+    """
+    Levenshtein distance, or bound + 1 as soon as it must exceed bound.
+    Only the diagonal band |i - j| <= bound is computed.
+    """
+    if abs(len(a) - len(b)) > bound:
+        return bound + 1
+    over = bound + 1
+    previous = [j if j <= bound else over for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        ca = a[i - 1]
+        low = max(1, i - bound)
+        high = min(len(b), i + bound)
+        current = [over] * (len(b) + 1)
+        current[0] = i if i <= bound else over
+        row_min = current[0]
+        for j in range(low, high + 1):
+            value = previous[j - 1] + (ca != b[j - 1])
+            if previous[j] + 1 < value:
+                value = previous[j] + 1
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > bound:
+            return over
+        previous = current
+    return min(previous[-1], over)
+
+
+def trigrams(key: str) -> List[str]:
+    padded = f"  {key} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+class TrigramIndex:
+    """
+    Trigram index over name keys for edit-distance lookups.
+
+    One edit changes at most three trigrams, so a key within `bound`
+    edits of the guess shares at least len(trigrams) - 3 * bound of its
+    trigrams. Only keys over that threshold are checked with a bounded
+    Levenshtein, which keeps lookups independent of the number of names.
+    """
+
+    def __init__(self, keys: Iterable[str] = ()):
+        self.keys: List[str] = []
+        self.postings: Dict[str, List[int]] = {}
+        for key in keys:
+            self.add(key)
+
+    def add(self, key: str) -> None:
+        key_id = len(self.keys)
+        self.keys.append(key)
+        for gram in set(trigrams(key)):
+            self.postings.setdefault(gram, []).append(key_id)
+
+    def search(self, key: str, bound: int) -> List[Tuple[int, str]]:
+        """
+        All (distance, key) pairs within `bound` edits of key.
+        """
+        grams = set(trigrams(key))
+        threshold = max(len(grams) - 3 * bound, 1)
+
+        shared = Counter(chain.from_iterable(
+            self.postings.get(gram, ()) for gram in grams
+        ))
+
+        results = []
+        for key_id, count in shared.items():
+            if count < threshold:
+                continue
+            candidate = self.keys[key_id]
+            distance = bounded_levenshtein(key, candidate, bound)
+            if distance <= bound:
+                results.append((distance, candidate))
+        return results
+
+
+class NameMatcher:
+    """
+    Matches typed guesses against a quiz's answers.
+
+    Exact (folded) full names and last names resolve with a dict lookup;
+    anything else falls back to a trigram-filtered edit-distance search.
+    Positions are indexes into the answers list.
+    """
+
+    def __init__(self, answers: List[Dict[str, Any]]):
+        self.ids = [answer.get("id") for answer in answers]
+        self.full_names: Dict[str, List[int]] = {}
+        self.last_names: Dict[str, List[int]] = {}
+        for position, answer in enumerate(answers):
+            full_key = fold_name(answer.get("name", ""))
+            last_key = fold_name(answer.get("last_name") or "")
+            if full_key:
+                self.full_names.setdefault(full_key, []).append(position)
+            if last_key:
+                self.last_names.setdefault(last_key, []).append(position)
+        self.index = TrigramIndex(set(self.full_names) | set(self.last_names))
+
+    def positions(self, key: str) -> List[int]:
+        return self.full_names.get(key, []) + self.last_names.get(key, [])
+
+    def match(self, guess: str, found: int = 0) -> Dict[str, Any]:
+        """
+        Resolve a guess given the found-answers bitset.
+        Returns {"position": int | None, "ambiguous": bool, "fuzzy": bool}.
+
+        - An exact full name wins.
+        - An exact last name shared by several unfound answers credits the
+          first of them (answers are in rank order) and flags "ambiguous".
+        - A fuzzy guess is only credited when a single unfound answer is
+          closest; a tie between different people is "ambiguous" and
+          credits nothing, rather than picking a player at random.
+        """
+        key = fold_name(guess)
+        if not key:
+            return {"position": None, "ambiguous": False, "fuzzy": False}
+
+        def unfound(positions):
+            return [p for p in positions if not found >> p & 1]
+
+        exact = unfound(self.full_names.get(key, []))
+        if exact:
+            return {"position": exact[0], "ambiguous": False, "fuzzy": False}
+
+        exact = unfound(self.last_names.get(key, []))
+        if exact:
+            return {"position": exact[0], "ambiguous": len(exact) > 1, "fuzzy": False}
+
+        bound = max_typos(key)
+        if bound == 0:
+            return {"position": None, "ambiguous": False, "fuzzy": False}
+
+        best: Dict[int, List[int]] = {}
+        for distance, candidate in self.index.search(key, bound):
+            best.setdefault(distance, []).extend(unfound(self.positions(candidate)))
+
+        for distance in sorted(best):
+            candidates = sorted(set(best[distance]))
+            if candidates:
+                # Several rows of the same person (e.g. one per club) aren't ambiguous
+                single = len({self.ids[p] for p in candidates}) == 1
+                return {
+                    "position": candidates[0] if single else None,
+                    "ambiguous": not single,
+                    "fuzzy": True,
+                }
+        return {"position": None, "ambiguous": False, "fuzzy": False}
@@ -0,0 +1,135 @@
+import cProfile
+import pstats
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connections, transaction
+
+
+REPORT_KEY = "football:profile:{}"
+
+
+class QueryRecorder:
+    """
+    Database execute wrapper keeping every statement with its timing.
+    Without an alias, the statement's own connection is recorded (for the
+    one wrapper shared by every connection under async requests).
+    """
+
+    def __init__(self, alias: Optional[str] = None):
+        self.alias = alias
+        self.queries: List[Dict[str, Any]] = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                "alias": self.alias or context["connection"].alias,
+                "sql": sql,
+                "params": params,
+                "many": many,
+                "ms": (time.perf_counter() - started) * 1000,
+            })
+
+
+def top_functions(profiler: cProfile.Profile, limit: int = 25) -> List[Dict[str, Any]]:
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, name), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            "function": f"{filename}:{line}({name})",
+            "calls": calls,
+            "tottime_ms": round(tottime * 1000, 3),
+            "cumtime_ms": round(cumtime * 1000, 3),
+        })
+    rows.sort(key=lambda row: row["cumtime_ms"], reverse=True)
+    return rows[:limit]
+
+
+# Statements EXPLAIN accepts; transaction control (SAVEPOINT, ...) has no plan
+EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+
+def explain(query: Dict[str, Any]) -> Optional[str]:
+    """
+    Plan for a captured statement. On PostgreSQL, SELECTs get EXPLAIN
+    ANALYZE, which runs them again; writes get a plain EXPLAIN so they
+    are never repeated. For executemany the first parameter set is used.
+    """
+    sql = query["sql"].lstrip()
+    verb = sql.split(None, 1)[0].upper() if sql else ""
+    if verb not in EXPLAINABLE:
+        return None
+
+    params = query["params"]
+    if query["many"]:
+        params = next(iter(params or ()), None)
+
+    connection = connections[query["alias"]]
+    if connection.vendor == "postgresql":
+        prefix = "EXPLAIN (ANALYZE, BUFFERS) " if verb in ("SELECT", "WITH") else "EXPLAIN "
+    elif connection.vendor == "sqlite":
+        prefix = "EXPLAIN QUERY PLAN "
+    else:
+        prefix = "EXPLAIN "
+
+    try:
+        # A savepoint, so a statement EXPLAIN rejects can't abort the
+        # request's transaction
+        with transaction.atomic(using=query["alias"]), connection.cursor() as cursor:
+            cursor.execute(prefix + query["sql"], params)
+            return "\n".join(" ".join(str(col) for col in row) for row in cursor.fetchall())
+    except DatabaseError as exc:
+        return f"EXPLAIN failed: {exc}"
+
+
+def build_report(request, response, profiler, recorders, elapsed: float) -> Dict[str, Any]:
+    """
+    The stored profile: timings, the top functions (None when no profiler
+    ran, as for async requests) and every SQL statement, slowest first,
+    each with its plan. Repeated statements (same SQL and parameters) are
+    explained once.
+    """
+    queries = [query for recorder in recorders for query in recorder.queries]
+    plans: Dict[tuple, Optional[str]] = {}
+    report_queries = []
+    for query in sorted(queries, key=lambda query: query["ms"], reverse=True):
+        key = (query["alias"], query["sql"], repr(query["params"]))
+        if key not in plans:
+            plans[key] = explain(query)
+        report_queries.append({
+            "alias": query["alias"],
+            "sql": query["sql"],
+            "params": [str(param) for param in (query["params"] or ())],
+            "ms": round(query["ms"], 3),
+            "plan": plans[key],
+        })
+
+    return {
+        "method": request.method,
+        "path": request.get_full_path(),
+        "status": response.status_code,
+        "total_ms": round(elapsed * 1000, 3),
+        "sql_count": len(queries),
+        "sql_ms": round(sum(query["ms"] for query in queries), 3),
+        "functions": top_functions(profiler) if profiler is not None else None,
+        "queries": report_queries,
+    }
+
+
+def store_report(report: Dict[str, Any]) -> str:
+    report_id = str(uuid.uuid4())
+    cache.set(
+        REPORT_KEY.format(report_id),
+        report,
+        getattr(settings, "API_PROFILING_REPORT_TIMEOUT", 24 * 60 * 60),
+    )
+    return report_id
+
+
+def get_report(report_id: str) -> Optional[Dict[str, Any]]:
+    return cache.get(REPORT_KEY.format(report_id))
@@ -0,0 +1,306 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+from django.conf import settings
+from django.core.cache import cache, caches
+from football.services.quiz_engine import (
+    QuizConfig,
+    agenerate_quiz,
+    generate_quiz,
+    generate_quizzes,
+    normalize_config,
+)
+
+
+DATA_VERSION_KEY = "football:data_version"
+DATA_MODIFIED_KEY = "football:data_modified"
+
+
+class LRUCache:
+    """
+    Small thread-safe in-process LRU used as the first cache tier.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+local_cache = LRUCache(getattr(settings, "QUIZ_CACHE_LRU_SIZE", 256))
+
+_stats_lock = threading.Lock()
+_stats = {"local_hits": 0, "shared_hits": 0, "misses": 0}
+
+
+def _count(name: str) -> None:
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """
+    Hit/miss counters for this process.
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats["local_hits"] + stats["shared_hits"] + stats["misses"]
+    hits = stats["local_hits"] + stats["shared_hits"]
+    stats["hit_ratio"] = hits / lookups if lookups else 0.0
+    return stats
+
+
+def reset_cache_stats() -> None:
+    with _stats_lock:
+        for name in _stats:
+            _stats[name] = 0
+
+
+def get_data_version() -> int:
+    """
+    Current global data version. Seeded from the clock so a version that
+    was evicted from the cache never comes back as an older number.
+    """
+    version = cache.get(DATA_VERSION_KEY)
+    if version is None:
+        cache.add(DATA_VERSION_KEY, int(time.time()), timeout=None)
+        version = cache.get(DATA_VERSION_KEY)
+    return version
+
+
+def get_data_last_modified() -> float:
+    """
+    Unix time of the last data change (bump), for Last-Modified headers.
+    If it was never recorded (or evicted), "now" is recorded instead, which
+    errs on the side of clients refetching.
+    """
+    modified = cache.get(DATA_MODIFIED_KEY)
+    if modified is None:
+        cache.add(DATA_MODIFIED_KEY, time.time(), timeout=None)
+        modified = cache.get(DATA_MODIFIED_KEY)
+    return modified
+
+
+async def aget_data_version() -> int:
+    version = await cache.aget(DATA_VERSION_KEY)
+    if version is None:
+        await cache.aadd(DATA_VERSION_KEY, int(time.time()), timeout=None)
+        version = await cache.aget(DATA_VERSION_KEY)
+    return version
+
+
+async def aget_data_last_modified() -> float:
+    modified = await cache.aget(DATA_MODIFIED_KEY)
+    if modified is None:
+        await cache.aadd(DATA_MODIFIED_KEY, time.time(), timeout=None)
+        modified = await cache.aget(DATA_MODIFIED_KEY)
+    return modified
+
+
+def bump_data_version() -> int:
+    """
+    Invalidate every cached quiz by moving to a new data version.
+    Called by import_stats and by admin edits of the football models.
+    """
+    try:
+        version = cache.incr(DATA_VERSION_KEY)
+    except ValueError:
+        cache.add(DATA_VERSION_KEY, int(time.time()), timeout=None)
+        version = cache.incr(DATA_VERSION_KEY)
+    cache.set(DATA_MODIFIED_KEY, time.time(), timeout=None)
+    local_cache.clear()
+    return version
+
+
+def shared_cache():
+    """
+    The cache holding generated quizzes (settings.QUIZ_CACHE_ALIAS). The
+    data version keys stay in the default cache, out of reach of its culling.
+    """
+    return caches[getattr(settings, "QUIZ_CACHE_ALIAS", "default")]
+
+
+def quiz_cache_key(config: QuizConfig, version: int) -> Tuple:
+    normalized = normalize_config(config)
+    return (
+        version,
+        normalized["mode"],
+        normalized["category"],
+        normalized["club_id"],
+        normalized["season_id"],
+        normalized["limit"],
+    )
+
+
+def config_echo(config: QuizConfig) -> Dict[str, Any]:
+    """
+    The "config" block generate_quiz returns for this exact request.
+    """
+    return {
+        "mode": config.get("mode", "club"),
+        "category": config.get("category", "goals"),
+        "limit": int(config.get("limit", 10) or 10),
+        "club_id": config.get("club_id"),
+        "season_id": config.get("season_id"),
+    }
+
+
+def shared_cache_key(key: Tuple) -> str:
+    return "football:quiz:" + ":".join(str(part) for part in key)
+
+
+def lookup(key: Tuple) -> Optional[Dict[str, Any]]:
+    """
+    Check both cache tiers, counting the hit or miss.
+    """
+    quiz = local_cache.get(key)
+    if quiz is not None:
+        _count("local_hits")
+        return quiz
+
+    quiz = shared_cache().get(shared_cache_key(key))
+    if quiz is not None:
+        _count("shared_hits")
+        local_cache.set(key, quiz)
+        return quiz
+
+    _count("misses")
+    return None
+
+
+def store(key: Tuple, quiz: Dict[str, Any]) -> None:
+    shared_cache().set(shared_cache_key(key), quiz, getattr(settings, "QUIZ_CACHE_TIMEOUT", 3600))
+    local_cache.set(key, quiz)
+
+
+async def alookup(key: Tuple) -> Optional[Dict[str, Any]]:
+    quiz = local_cache.get(key)
+    if quiz is not None:
+        _count("local_hits")
+        return quiz
+
+    quiz = await shared_cache().aget(shared_cache_key(key))
+    if quiz is not None:
+        _count("shared_hits")
+        local_cache.set(key, quiz)
+        return quiz
+
+    _count("misses")
+    return None
+
+
+async def astore(key: Tuple, quiz: Dict[str, Any]) -> None:
+    await shared_cache().aset(shared_cache_key(key), quiz, getattr(settings, "QUIZ_CACHE_TIMEOUT", 3600))
+    local_cache.set(key, quiz)
+
+
+def get_quiz(config: QuizConfig) -> Dict[str, Any]:
+    """
+    generate_quiz behind an in-process LRU and Django's cache framework.
+    Keys include the data version, so stale results are never served.
+    """
+    key = quiz_cache_key(config, get_data_version())
+
+    quiz = lookup(key)
+    if quiz is None:
+        quiz = generate_quiz(config)
+        store(key, quiz)
+
+    # Echo this request's config, not the one that filled the cache
+    return {**quiz, "config": config_echo(config)}
+
+
+async def aget_quiz(config: QuizConfig) -> Dict[str, Any]:
+    """
+    get_quiz for async views.
+    """
+    key = quiz_cache_key(config, await aget_data_version())
+
+    quiz = await alookup(key)
+    if quiz is None:
+        quiz = await agenerate_quiz(config)
+        await astore(key, quiz)
+
+    return {**quiz, "config": config_echo(config)}
+
+
+def get_quizzes(configs: List[Any]) -> List[Dict[str, Any]]:
+    """
+    Cached version of generate_quizzes: hits are served from the cache and
+    only the misses are generated, together, in one generate_quizzes call.
+    """
+    version = get_data_version()
+    results: List[Dict[str, Any]] = [None] * len(configs)
+    missing: List[Tuple[int, Tuple]] = []
+
+    for index, config in enumerate(configs):
+        try:
+            key = quiz_cache_key(config, version)
+        except (AttributeError, TypeError, ValueError):
+            # Invalid configs get their per-item error from generate_quizzes
+            missing.append((index, None))
+            continue
+
+        quiz = lookup(key)
+        if quiz is None:
+            missing.append((index, key))
+        else:
+            results[index] = {**quiz, "config": config_echo(config)}
+
+    generated = generate_quizzes([configs[index] for index, _ in missing])
+    for (index, key), quiz in zip(missing, generated):
+        if key is not None:
+            store(key, quiz)
+        results[index] = dict(quiz)
+
+    return results
+
+
+def warm_quizzes(configs: List[QuizConfig], version: Optional[int] = None) -> Dict[str, int]:
+    """
+    Generate and store every config that isn't in the shared cache yet
+    for `version` (default: the current data version). Configs sharing a
+    scope are generated together by generate_quizzes.
+    Warmed entries don't expire: their keys are scoped to the data
+    version, so the next bump is what retires them.
+    Returns {"cached": already present, "generated": newly stored}.
+    """
+    if version is None:
+        version = get_data_version()
+
+    quizzes = shared_cache()
+    keys = [shared_cache_key(quiz_cache_key(config, version)) for config in configs]
+    present = quizzes.get_many(keys)
+    missing = [(config, key) for config, key in zip(configs, keys) if key not in present]
+
+    for key in present:
+        # Entries stored by a request would expire with QUIZ_CACHE_TIMEOUT
+        quizzes.touch(key, None)
+    generated = generate_quizzes([config for config, _ in missing])
+    quizzes.set_many(
+        {key: quiz for (_, key), quiz in zip(missing, generated)}, timeout=None
+    )
+
+    return {"cached": len(configs) - len(missing), "generated": len(missing)}
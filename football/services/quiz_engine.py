@@ -1,5 +1,7 @@
-from typing import Literal, TypedDict, List, Dict, Any
-from django.db.models import Sum
+from typing import Literal, TypedDict, List, Dict, Any, Optional
+from django.conf import settings
+from django.db.models import Count, F, Q, Sum, Window
+from django.db.models.functions import Coalesce, Rank, RowNumber, Sign
 from football.models import (
     Club,
     Season,
@@ -7,11 +9,24 @@ from football.models import (
     PersonClubSeason,
     StatsPersonClubSeason,
 )
+from football.services.leaderboards import (
+    LEADERBOARD_CATEGORIES,
+    leaderboard_answers,
+    leaderboard_query,
+    read_leaderboard,
+    read_leaderboards,
+)
+from football.services import snapshot
+from football.services.career_totals import career_answers, career_ranked_query
+from football.services.metrics import timed
 
 
 QuizMode = Literal["club", "season", "overall"]
 QuizCategory = Literal["goals", "assists", "managers", "appearances"]
 
+STAT_CATEGORIES = ("goals", "assists", "appearances")
+ANSWER_CATEGORIES = STAT_CATEGORIES + ("managers",)
+
 class QuizConfig(TypedDict, total=False):
     mode: QuizMode
     club_id: int
@@ -19,6 +34,49 @@ class QuizConfig(TypedDict, total=False):
     category: QuizCategory
     limit: int
 
+def normalize_config(config: QuizConfig) -> QuizConfig:
+    """
+    Return the canonical form of a quiz config: defaults applied, ids as
+    ints and ids that the mode ignores dropped, so equivalent requests
+    compare equal.
+    """
+    mode = config.get("mode", "club")
+    club_id = config.get("club_id")
+    season_id = config.get("season_id")
+
+    return {
+        "mode": mode,
+        "category": config.get("category", "goals"),
+        "limit": int(config.get("limit", 10) or 10),
+        "club_id": int(club_id) if mode == "club" and club_id else None,
+        "season_id": int(season_id) if mode == "season" and season_id else None,
+    }
+
+def choose_engine(mode: str, category: str) -> Optional[str]:
+    """
+    How a quiz is answered, for generate_quiz, agenerate_quiz and
+    QuizStream alike: "invalid" (managers in overall mode), "snapshot",
+    "leaderboard", "career", "orm" (ranked stats) or "managers", or None
+    for an unknown category.
+    """
+    if category == 'managers' and mode == 'overall':
+        return 'invalid'
+    if category in ANSWER_CATEGORIES and snapshot.get_engine() is not None:
+        # In-memory columnar snapshot (settings.QUIZ_ENGINE == "snapshot")
+        return 'snapshot'
+    if category in STAT_CATEGORIES and use_career_totals(mode):
+        # Overall quizzes: CareerTotal is kept up to date on every import
+        # anyway, and its per-stat indexes serve the top N directly
+        return 'career'
+    if category in LEADERBOARD_CATEGORIES and getattr(settings, 'QUIZ_USE_LEADERBOARDS', False):
+        # Pre-ranked table maintained by import_stats
+        return 'leaderboard'
+    if category in STAT_CATEGORIES:
+        return 'orm'
+    if category == 'managers':
+        return 'managers'
+    return None
+
 def generate_quiz(config: QuizConfig) -> Dict[str, Any]:
     """
     Generates the list of correct answers based on mode (club/season/overall) and category (goals, assists, appearances, managers)
@@ -32,170 +90,381 @@ def generate_quiz(config: QuizConfig) -> Dict[str, Any]:
 
     answers: List[Dict[str, Any]] = []
     max_answers = 0
+    engine = choose_engine(mode, category)
 
-    if category == 'managers' and mode == 'overall':
-        return {
-            'config': {
-                'mode': mode,
-                'category': category,
-                'limit': limit,
-                'club_id': club_id,
-                'season_id': season_id,
-            },
-            'max_answers': 0,
-            'answers': [],
-            'error': 'Managers quiz is only available for club or season mode.'
-        }
-
-    if category == 'goals':
-        qs = StatsPersonClubSeason.objects.select_related(
-            "person_club_season__person",
-            "person_club_season__club",
-            "person_club_season__season",
-        ).filter(goals__gt=0)
-
-        if mode == 'club' and club_id:
-            qs = qs.filter(person_club_season__club_id=club_id)
-        elif mode == 'season' and season_id:
-            qs = qs.filter(person_club_season__season_id=season_id)
-        
-        agg = (
-            qs.values(
-                'person_club_season__person_id',
-                'person_club_season__person__first_name',
-                'person_club_season__person__last_name',
-                'person_club_season__club__name',
-            )
-            .annotate(total_goals=Sum('goals'))
-            .order_by('-total_goals', 'person_club_season__person__last_name')
-        )
+    if engine == 'invalid':
+        return managers_overall_error(config)
 
-        max_answers = agg.count()
+    elif engine == 'snapshot':
+        with timed('quiz_stage_duration_seconds', mode=mode, category=category, engine='snapshot', stage='query'):
+            max_answers, answers = snapshot.get_engine().answers(mode, category, club_id, season_id, limit)
 
-        for row in agg[:limit]:
-            full_name = f"{row['person_club_season__person__first_name']} {row['person_club_season__person__last_name']}"
-            answers.append({
-                'id': row['person_club_season__person_id'],
-                'name': full_name.strip(),
-                'first_name': row['person_club_season__person__first_name'],
-                'last_name': row['person_club_season__person__last_name'],
-                'club': row.get('person_club_season__club__name'),
-                'total_goals': row['total_goals'],
-            })
-    
-    elif category == 'assists':
-        qs = StatsPersonClubSeason.objects.select_related(
-            'person_club_season__person',
-            'person_club_season__club',
-            'person_club_season__season',
-        ).filter(assists__gt=0)
-
-        if mode == 'club' and club_id:
-            qs = qs.filter(person_club_season__club_id=club_id)
-        elif mode == 'season' and season_id:
-            qs = qs.filter(person_club_season__season_id=season_id)
-        
-        agg = (
-            qs.values(
-                'person_club_season__person_id',
-                'person_club_season__person__first_name',
-                'person_club_season__person__last_name',
-                'person_club_season__club__name',
-            )
-            .annotate(total_assists=Sum('assists'))
-            .order_by('-total_assists', 'person_club_season__person__last_name')
+    elif engine == 'leaderboard':
+        with timed('quiz_stage_duration_seconds', mode=mode, category=category, engine='leaderboard', stage='query'):
+            max_answers, answers = read_leaderboard(mode, category, club_id, season_id, limit)
+
+    elif engine == 'career':
+        max_answers, answers = career_stats(category, limit)
+
+    elif engine == 'orm':
+        max_answers, answers = ranked_stats(mode, category, club_id, season_id, limit)
+
+    elif engine == 'managers':
+        max_answers, answers = managers(mode, club_id, season_id, limit)
+
+    return quiz_response(config, max_answers, answers)
+
+async def agenerate_quiz(config: QuizConfig) -> Dict[str, Any]:
+    """
+    generate_quiz for async views: the same engines (choose_engine) and
+    results, with the leaderboard and ORM reads going through the async ORM.
+    """
+    mode = config.get("mode", "club")
+    category = config.get("category", "goals")
+    limit = int(config.get("limit", 10) or 10)
+    club_id = config.get("club_id")
+    season_id = config.get("season_id")
+
+    answers: List[Dict[str, Any]] = []
+    max_answers = 0
+    engine = choose_engine(mode, category)
+    labels = {'mode': mode, 'category': category, 'engine': engine}
+
+    if engine == 'invalid':
+        return managers_overall_error(config)
+
+    elif engine == 'snapshot':
+        # In memory, no I/O to wait for
+        with timed('quiz_stage_duration_seconds', stage='query', **labels):
+            max_answers, answers = snapshot.get_engine().answers(mode, category, club_id, season_id, limit)
+
+    elif engine == 'leaderboard':
+        with timed('quiz_stage_duration_seconds', stage='query', **labels):
+            rows = leaderboard_query(mode, category, club_id, season_id)[:limit]
+            max_answers, answers = leaderboard_answers([row async for row in rows], category)
+
+    elif engine == 'career':
+        with timed('quiz_stage_duration_seconds', stage='query', **labels):
+            rows = [row async for row in career_ranked_query(category)[:limit]]
+        with timed('quiz_stage_duration_seconds', stage='build', **labels):
+            max_answers, answers = career_answers(rows, category)
+
+    elif engine == 'orm':
+        with timed('quiz_stage_duration_seconds', stage='query', **labels):
+            rows = [row async for row in ranked_stats_query(mode, category, club_id, season_id)[:limit]]
+        with timed('quiz_stage_duration_seconds', stage='build', **labels):
+            max_answers, answers = ranked_answers(rows, category)
+
+    elif engine == 'managers':
+        labels['engine'] = 'orm'
+        with timed('quiz_stage_duration_seconds', stage='query', **labels):
+            rows = [row async for row in managers_query(mode, club_id, season_id)[:limit]]
+        with timed('quiz_stage_duration_seconds', stage='build', **labels):
+            max_answers, answers = manager_answers(rows)
+
+    return quiz_response(config, max_answers, answers)
+
+def quiz_response(config: QuizConfig, max_answers: int, answers: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "config": {
+            "mode": config.get("mode", "club"),
+            "category": config.get("category", "goals"),
+            "limit": int(config.get("limit", 10) or 10),
+            "club_id": config.get("club_id"),
+            "season_id": config.get("season_id"),
+        },
+        'max_answers': max_answers,
+        "answers": answers,
+    }
+
+def managers_overall_error(config: QuizConfig) -> Dict[str, Any]:
+    return {
+        **quiz_response(config, 0, []),
+        'error': 'Managers quiz is only available for club or season mode.'
+    }
+
+def generate_quizzes(configs: List[QuizConfig]) -> List[Dict[str, Any]]:
+    """
+    Generate several quizzes at once, in request order.
+
+    Goals/assists/appearances quizzes that share a scope (mode + club/season)
+    are answered together: one range read over the leaderboards when they
+    are on, else one aggregation summing all three stats with each
+    category's limit applied in SQL. Anything else goes through
+    generate_quiz. A config that can't be parsed gets an {"error": ...}
+    item instead of failing the whole batch.
+    """
+    results: List[Dict[str, Any]] = [None] * len(configs)
+    scopes: Dict[tuple, List[int]] = {}
+
+    for index, config in enumerate(configs):
+        if not isinstance(config, dict):
+            results[index] = {'config': config, 'error': 'Quiz config must be an object.'}
+            continue
+        try:
+            normalized = normalize_config(config)
+        except (TypeError, ValueError):
+            results[index] = {'config': config, 'error': 'Invalid quiz config.'}
+            continue
+
+        engine = choose_engine(normalized['mode'], normalized['category'])
+        if engine in ('leaderboard', 'orm'):
+            scope = (engine, normalized['mode'], normalized['club_id'], normalized['season_id'])
+            scopes.setdefault(scope, []).append(index)
+        else:
+            results[index] = generate_quiz(config)
+
+    for (engine, mode, club_id, season_id), indexes in scopes.items():
+        if len(indexes) == 1:
+            results[indexes[0]] = generate_quiz(configs[indexes[0]])
+            continue
+
+        limits: Dict[str, int] = {}
+        for i in indexes:
+            normalized = normalize_config(configs[i])
+            category = normalized['category']
+            limits[category] = max(limits.get(category, 0), normalized['limit'])
+
+        if engine == 'leaderboard':
+            boards = read_leaderboards(mode, club_id, season_id, limits)
+        else:
+            boards = ranked_stats_by_category(mode, club_id, season_id, limits)
+        for i in indexes:
+            normalized = normalize_config(configs[i])
+            max_answers, answers = boards[normalized['category']]
+            results[i] = quiz_response(configs[i], max_answers, answers[:normalized['limit']])
+
+    return results
+
+def ranked_stats_by_category(mode, club_id, season_id, limits):
+    """
+    Top answers for several stat categories of one scope, from a single
+    GROUP BY that sums every requested stat at once: {category:
+    (max_answers, answers)}, each cut to limits[category].
+
+    Per category, RANK()/ROW_NUMBER() windows order the groups exactly like
+    ranked_stats_query (names in the database collation) and a COUNT(*)
+    window partitioned on "total > 0" gives the answer count, so only the
+    rows inside some category's limit leave the database.
+    """
+    categories = sorted(limits)
+    qs = StatsPersonClubSeason.objects.all()
+
+    if mode == 'club' and club_id:
+        qs = qs.filter(person_club_season__club_id=club_id)
+    elif mode == 'season' and season_id:
+        qs = qs.filter(person_club_season__season_id=season_id)
+
+    positive = Q()
+    for category in categories:
+        positive |= Q(**{f"{category}__gt": 0})
+
+    windows = {}
+    inside_limit = Q()
+    for category in categories:
+        total = F(f"total_{category}")
+        windows.update({
+            f"rank_{category}": Window(Rank(), order_by=total.desc()),
+            # Groups without this stat have a 0 total and sort after the
+            # answers, so they only pass the limit when answers run out
+            f"position_{category}": Window(RowNumber(), order_by=[
+                total.desc(),
+                F('person_club_season__person__last_name').asc(),
+                F('person_club_season__person_id').asc(),
+                F('person_club_season__club__name').asc(),
+            ]),
+            f"count_{category}": Window(Count('*'), partition_by=[Sign(total)]),
+        })
+        inside_limit |= Q(**{f"position_{category}__lte": limits[category]})
+
+    rows = (
+        qs.filter(positive)
+        .values(
+            'person_club_season__person_id',
+            'person_club_season__person__first_name',
+            'person_club_season__person__last_name',
+            'person_club_season__club__name',
         )
-    
-        max_answers = agg.count()
+        .annotate(**{f"total_{category}": Coalesce(Sum(category), 0) for category in categories})
+        .annotate(**windows)
+        .filter(inside_limit)
+    )
 
-        for row in agg[:limit]:
+    boards: Dict[str, List[Dict[str, Any]]] = {category: [] for category in categories}
+    counts: Dict[str, int] = dict.fromkeys(categories, 0)
+    for row in rows:
+        for category in categories:
+            total_field = f"total_{category}"
+            if row[total_field] and row[f"position_{category}"] <= limits[category]:
+                boards[category].append(row)
+                counts[category] = row[f"count_{category}"]
+
+    results = {}
+    for category, ranked in boards.items():
+        total_field = f"total_{category}"
+        ranked.sort(key=lambda row: row[f"position_{category}"])
+        answers: List[Dict[str, Any]] = []
+        for row in ranked:
             full_name = f"{row['person_club_season__person__first_name']} {row['person_club_season__person__last_name']}"
             answers.append({
                 'id': row['person_club_season__person_id'],
+                'rank': row[f"rank_{category}"],
                 'name': full_name.strip(),
                 'first_name': row['person_club_season__person__first_name'],
                 'last_name': row['person_club_season__person__last_name'],
                 'club': row.get('person_club_season__club__name'),
-                'total_assists': row['total_assists'],
+                total_field: row[total_field],
             })
-    
-    elif category == 'appearances':
-        qs = StatsPersonClubSeason.objects.select_related(
-            'person_club_season__person',
-            'person_club_season__club',
-            'person_club_season__season',
-        ).filter(appearances__gt=0)
-        
-        if mode == 'club' and club_id:
-            qs = qs.filter(person_club_season__club_id=club_id)
-        elif mode == 'season' and season_id:
-            qs = qs.filter(person_club_season__season_id=season_id)
-        
-        agg = (
-            qs.values(
-                'person_club_season__person_id',
-                'person_club_season__person__first_name',
-                'person_club_season__person__last_name',
-                'person_club_season__club__name',
-            )
-            .annotate(total_appearances=Sum('appearances'))
-            .order_by('-total_appearances', 'person_club_season__person__last_name')
+        results[category] = (counts[category], answers)
+    return results
+
+
+def use_career_totals(mode) -> bool:
+    return mode == 'overall' and getattr(settings, 'QUIZ_USE_CAREER_TOTALS', False)
+
+def career_stats(category, limit):
+    """
+    Top `limit` people for an overall goals/assists/appearances quiz, from
+    the CareerTotal table maintained by import_stats.
+    """
+    labels = {'mode': 'overall', 'category': category, 'engine': 'career'}
+    with timed('quiz_stage_duration_seconds', stage='query', **labels):
+        rows = list(career_ranked_query(category)[:limit])
+
+    with timed('quiz_stage_duration_seconds', stage='build', **labels):
+        return career_answers(rows, category)
+
+def ranked_stats_query(mode, category, club_id, season_id):
+    """
+    Ranked rows for a goals/assists/appearances quiz, with tie-aware ranks
+    and the total answer count from RANK() OVER / COUNT(*) OVER () window
+    annotations, so a slice of it is a single query.
+    """
+    qs = StatsPersonClubSeason.objects.filter(**{f"{category}__gt": 0})
+
+    if mode == 'club' and club_id:
+        qs = qs.filter(person_club_season__club_id=club_id)
+    elif mode == 'season' and season_id:
+        qs = qs.filter(person_club_season__season_id=season_id)
+
+    total_field = f"total_{category}"
+    return (
+        qs.values(
+            'person_club_season__person_id',
+            'person_club_season__person__first_name',
+            'person_club_season__person__last_name',
+            'person_club_season__club__name',
+        )
+        .annotate(**{total_field: Sum(category)})
+        .annotate(
+            rank=Window(Rank(), order_by=F(total_field).desc()),
+            answer_count=Window(Count('*')),
+        )
+        .order_by(
+            f'-{total_field}',
+            'person_club_season__person__last_name',
+            'person_club_season__person_id',
+            'person_club_season__club__name',
         )
-        
-        max_answers = agg.count()
+    )
 
-        for row in agg[:limit]:
-            full_name = f"{row['person_club_season__person__first_name']} {row['person_club_season__person__last_name']}"
-            answers.append({
-                    'id': row['person_club_season__person_id'],
-                    'name': full_name.strip(),
-                    'first_name': row['person_club_season__person__first_name'],
-                    'last_name': row['person_club_season__person__last_name'],
-                    'club': row.get('person_club_season__club__name'),
-                    'total_appearances': row['total_appearances'],
-                })
-    
-    elif category == 'managers':
-        qs = PersonClubSeason.objects.select_related(
-            'person',
-            'club',
-            'season',
-        ).filter(role__iexact='manager')
-
-        if mode == 'club' and club_id:
-            qs = qs.filter(club_id=club_id)
-        elif mode == 'season' and season_id:
-            qs = qs.filter(season_id=season_id)
-        
-        manager_rows = (
-            qs.values(
-                'person_id',
-                'person__first_name',
-                'person__last_name',
-            )
-            .distinct()
-            .order_by('person__last_name', 'person__first_name')
+def ranked_answer(row, category):
+    """
+    (answer_count, answer) for one ranked_stats_query row.
+    """
+    total_field = f"total_{category}"
+    full_name = f"{row['person_club_season__person__first_name']} {row['person_club_season__person__last_name']}"
+    return row['answer_count'], {
+        'id': row['person_club_season__person_id'],
+        'rank': row['rank'],
+        'name': full_name.strip(),
+        'first_name': row['person_club_season__person__first_name'],
+        'last_name': row['person_club_season__person__last_name'],
+        'club': row.get('person_club_season__club__name'),
+        total_field: row[total_field],
+    }
+
+def ranked_answers(rows, category):
+    """
+    (max_answers, answers) from ranked_stats_query rows.
+    """
+    max_answers = 0
+    answers: List[Dict[str, Any]] = []
+    for row in rows:
+        max_answers, answer = ranked_answer(row, category)
+        answers.append(answer)
+    return max_answers, answers
+
+def ranked_stats(mode, category, club_id, season_id, limit):
+    """
+    Top `limit` people for a goals/assists/appearances quiz, in one query.
+    """
+    agg = ranked_stats_query(mode, category, club_id, season_id)
+
+    labels = {'mode': mode, 'category': category, 'engine': 'orm'}
+    with timed('quiz_stage_duration_seconds', stage='query', **labels):
+        rows = list(agg[:limit])
+
+    with timed('quiz_stage_duration_seconds', stage='build', **labels):
+        return ranked_answers(rows, category)
+
+def managers_query(mode, club_id, season_id):
+    """
+    One row per manager of a club or season, with the answer count from
+    the same query (COUNT(*) OVER () across the grouped people).
+    """
+    qs = PersonClubSeason.objects.filter(role=PersonClubSeason.ROLE_MANAGER)
+
+    if mode == 'club' and club_id:
+        qs = qs.filter(club_id=club_id)
+    elif mode == 'season' and season_id:
+        qs = qs.filter(season_id=season_id)
+
+    return (
+        qs.values(
+            'person_id',
+            'person__first_name',
+            'person__last_name',
         )
+        # Group by person (one row per manager, however many stints),
+        # then count the grouped rows
+        .annotate(stints=Count('id'))
+        .annotate(answer_count=Window(Count('*')))
+        .order_by('person__last_name', 'person__first_name', 'person_id')
+    )
 
-        max_answers = manager_rows.count()
+def manager_answer(row):
+    """
+    (answer_count, answer) for one managers_query row.
+    """
+    full_name = f"{row['person__first_name']} {row['person__last_name']}"
+    return row['answer_count'], {
+        'id': row['person_id'],
+        'name': full_name.strip(),
+        'first_name': row['person__first_name'],
+        'last_name': row['person__last_name'],
+    }
 
-        for row in manager_rows[:limit]:
-            full_name = f"{row['person__first_name']} {row['person__last_name']}"
-            answers.append({
-                'id': row['person_id'],
-                'name': full_name.strip(),
-                'first_name': row['person__first_name'],
-                'last_name': row['person__last_name'],
-            })
+def manager_answers(rows):
+    """
+    (max_answers, answers) from managers_query rows.
+    """
+    max_answers = 0
+    answers: List[Dict[str, Any]] = []
+    for row in rows:
+        max_answers, answer = manager_answer(row)
+        answers.append(answer)
+    return max_answers, answers
 
-    return {
-        "config": {
-            "mode": mode,
-            "category": category,
-            "limit": limit,
-            "club_id": club_id,
-            "season_id": season_id,
-        },
-        'max_answers': max_answers,
-        "answers": answers,
-    }
\ No newline at end of file
+def managers(mode, club_id, season_id, limit):
+    """
+    Managers for a club or season quiz, in one query.
+    """
+    manager_rows = managers_query(mode, club_id, season_id)
+
+    labels = {'mode': mode, 'category': 'managers', 'engine': 'orm'}
+    with timed('quiz_stage_duration_seconds', stage='query', **labels):
+        rows = list(manager_rows[:limit])
+
+    with timed('quiz_stage_duration_seconds', stage='build', **labels):
+        return manager_answers(rows)
@@ -0,0 +1,179 @@
+import base64
+import binascii
+import json
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
+from django.db.models import Q
+from football.services import snapshot
+from football.services.career_totals import career_answer, career_ranked_query
+from football.services.leaderboards import leaderboard_answers, leaderboard_query
+from football.services.metrics import timed
+from football.services.quiz_engine import (
+    STAT_CATEGORIES,
+    QuizConfig,
+    choose_engine,
+    quiz_response,
+    ranked_answer,
+    ranked_stats_query,
+)
+
+
+# Cursor fields: the sort key of the last answer on the page (total,
+# last_name, person_id, club), plus its rank and position (1-based) so
+# the next page can carry on the global ranks and answer count
+CURSOR_FIELDS = ("total", "last_name", "person_id", "club", "rank", "position")
+
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    raw = json.dumps([values[field] for field in CURSOR_FIELDS], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    Inverse of encode_cursor. Raises ValueError for anything it didn't make.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor.")
+    if not isinstance(values, list) or len(values) != len(CURSOR_FIELDS):
+        raise ValueError("Invalid cursor.")
+
+    after = dict(zip(CURSOR_FIELDS, values))
+    for field in ("total", "person_id", "rank", "position"):
+        if not isinstance(after[field], int) or isinstance(after[field], bool):
+            raise ValueError("Invalid cursor.")
+    for field in ("last_name", "club"):
+        if not isinstance(after[field], str):
+            raise ValueError("Invalid cursor.")
+    return after
+
+
+def after_key(after: Dict[str, Any], total: str, last_name: str, person_id: str, club: str) -> Q:
+    """
+    Rows that sort after the cursor in the ranked order
+    (total DESC, last_name, person_id, club), given the lookups for
+    those columns. The leading total <= bound lets an index on the total
+    (CareerTotal) be range-scanned.
+    """
+    return Q(**{f"{total}__lte": after["total"]}) & (
+        Q(**{f"{total}__lt": after["total"]})
+        | Q(**{f"{last_name}__gt": after["last_name"]})
+        | Q(**{last_name: after["last_name"], f"{person_id}__gt": after["person_id"]})
+        | Q(**{
+            last_name: after["last_name"],
+            person_id: after["person_id"],
+            f"{club}__gt": after["club"],
+        })
+    )
+
+
+def continue_ranks(rows, to_answer, total_field: str, after: Optional[Dict[str, Any]]) -> Tuple[int, List[Dict[str, Any]]]:
+    """
+    (max_answers, answers) for a page of rows whose RANK() and
+    COUNT(*) OVER () windows only saw the rows after the cursor.
+
+    Rows tied with the cursor's total keep its rank; any other row's
+    global rank is the position before the page plus its rank within
+    the remaining rows. The total answer count is likewise that position
+    plus the remaining count.
+    """
+    position = after["position"] if after else 0
+    max_answers = position
+    answers: List[Dict[str, Any]] = []
+    for row in rows:
+        remaining, answer = to_answer(row)
+        max_answers = position + remaining
+        if after and answer[total_field] == after["total"]:
+            answer["rank"] = after["rank"]
+        else:
+            answer["rank"] += position
+        answers.append(answer)
+    return max_answers, answers
+
+
+def quiz_page(config: QuizConfig, cursor: Optional[str] = None) -> Dict[str, Any]:
+    """
+    One page of a goals/assists/appearances quiz: `limit` answers after
+    `cursor` (from the previous page's "next_cursor"; None for the first
+    page), with the same ranks and max_answers as the full quiz.
+
+    Pages are keyset reads, so a later page costs the same as the first:
+    the leaderboard table is range-scanned from the cursor's position,
+    the ORM and career-total queries filter on the cursor's sort key
+    rather than skipping rows with OFFSET. Raises ValueError for an
+    unusable cursor or category.
+    """
+    mode = config.get("mode", "club")
+    category = config.get("category", "goals")
+    limit = int(config.get("limit", 10) or 10)
+    club_id = config.get("club_id")
+    season_id = config.get("season_id")
+
+    if category not in STAT_CATEGORIES:
+        raise ValueError("Only goals, assists and appearances quizzes can be paged.")
+    after = decode_cursor(cursor) if cursor else None
+    position = after["position"] if after else 0
+    total_field = f"total_{category}"
+
+    engine = choose_engine(mode, category)
+
+    if engine == 'snapshot':
+        # In memory: taking the first position + limit answers is cheap
+        with timed('quiz_stage_duration_seconds', mode=mode, category=category, engine='snapshot', stage='query'):
+            max_answers, answers = snapshot.get_engine().answers(mode, category, club_id, season_id, position + limit)
+            answers = answers[position:]
+
+    elif engine == 'career':
+        labels = {'mode': mode, 'category': category, 'engine': 'career'}
+        query = career_ranked_query(category)
+        if after:
+            query = query.filter(after_key(after, category, "person__last_name", "person_id", "club__name"))
+        with timed('quiz_stage_duration_seconds', stage='query', **labels):
+            rows = list(query[:limit])
+        with timed('quiz_stage_duration_seconds', stage='build', **labels):
+            max_answers, answers = continue_ranks(
+                rows, partial(career_answer, category=category), total_field, after
+            )
+
+    elif engine == 'leaderboard':
+        # Positions follow the same order, and ranks are stored
+        with timed('quiz_stage_duration_seconds', mode=mode, category=category, engine='leaderboard', stage='query'):
+            rows = leaderboard_query(mode, category, club_id, season_id).filter(position__gt=position)[:limit]
+            max_answers, answers = leaderboard_answers(rows, category)
+            max_answers = max_answers or position
+
+    else:
+        labels = {'mode': mode, 'category': category, 'engine': 'orm'}
+        query = ranked_stats_query(mode, category, club_id, season_id)
+        if after:
+            query = query.filter(after_key(
+                after,
+                total_field,
+                "person_club_season__person__last_name",
+                "person_club_season__person_id",
+                "person_club_season__club__name",
+            ))
+        with timed('quiz_stage_duration_seconds', stage='query', **labels):
+            rows = list(query[:limit])
+        with timed('quiz_stage_duration_seconds', stage='build', **labels):
+            max_answers, answers = continue_ranks(
+                rows, partial(ranked_answer, category=category), total_field, after
+            )
+
+    next_cursor = None
+    end = position + len(answers)
+    if answers and len(answers) == limit and end < max_answers:
+        last = answers[-1]
+        next_cursor = encode_cursor({
+            "total": last[total_field],
+            "last_name": last["last_name"],
+            "person_id": last["id"],
+            "club": last["club"],
+            "rank": last["rank"],
+            "position": end,
+        })
+
+    return {**quiz_response(config, max_answers, answers), "next_cursor": next_cursor}
@@ -0,0 +1,134 @@
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+from football.models import QuizSession
+from football.services.name_matching import NameMatcher
+from football.services.quiz_cache import LRUCache
+
+
+# Matchers are derived from the session's answers, so each worker builds
+# one on the first guess it sees for a quiz and keeps it in memory.
+matchers = LRUCache(getattr(settings, "QUIZ_MATCHER_CACHE_SIZE", 512))
+
+
+def sessions():
+    # A session is read straight after it is written, so never from a replica
+    return QuizSession.objects.using(DEFAULT_DB_ALIAS)
+
+
+def expires_at():
+    return timezone.now() + timedelta(seconds=getattr(settings, "QUIZ_SESSION_TIMEOUT", 2 * 60 * 60))
+
+
+def create_session(quiz: Dict[str, Any]) -> str:
+    """
+    Store a server-side session for a generated quiz and return its id.
+    """
+    return str(sessions().create(answers=quiz["answers"], expires_at=expires_at()).pk)
+
+
+async def acreate_session(quiz: Dict[str, Any]) -> str:
+    session = await sessions().acreate(answers=quiz["answers"], expires_at=expires_at())
+    return str(session.pk)
+
+
+def playable_quiz(quiz: Dict[str, Any], quiz_id: str) -> Dict[str, Any]:
+    """
+    What a player is sent for a quiz with a session: everything but the
+    answers, which only come back one at a time from submit_guess or all
+    at once from reveal_session.
+    """
+    playable = {key: value for key, value in quiz.items() if key != "answers"}
+    playable["answer_count"] = len(quiz["answers"])
+    playable["quiz_id"] = quiz_id
+    return playable
+
+
+def get_session(quiz_id: str) -> Optional[QuizSession]:
+    return sessions().filter(pk=quiz_id, expires_at__gt=timezone.now()).first()
+
+
+def get_matcher(quiz_id: str, answers: List[Dict[str, Any]]) -> NameMatcher:
+    matcher = matchers.get(quiz_id)
+    if matcher is None:
+        matcher = NameMatcher(answers)
+        matchers.set(quiz_id, matcher)
+    return matcher
+
+
+def found_positions(found: int, total: int) -> List[int]:
+    return [position for position in range(total) if found >> position & 1]
+
+
+def submit_guess(quiz_id: str, guess: str) -> Optional[Dict[str, Any]]:
+    """
+    Resolve a guess against a quiz session. Returns None if the session
+    doesn't exist (or has expired).
+
+    Matching is accent-, case- and typo-tolerant; see NameMatcher.match
+    for how shared last names and ties are resolved. A match is saved
+    with a compare-and-set on found_count; if another guess got there
+    first, this one is matched again against the updated bitset.
+    """
+    while True:
+        session = get_session(quiz_id)
+        if session is None:
+            return None
+
+        found = int(session.found, 16)
+        found_count = session.found_count
+        result = get_matcher(quiz_id, session.answers).match(guess, found)
+        match = result["position"]
+
+        if match is not None:
+            found |= 1 << match
+            found_count += 1
+            updated = sessions().filter(pk=quiz_id, found_count=session.found_count).update(
+                found=format(found, "x"),
+                found_count=found_count,
+                expires_at=expires_at(),
+            )
+            if not updated:
+                continue
+
+        total = len(session.answers)
+        return {
+            "correct": match is not None,
+            "position": match,
+            "answer": session.answers[match] if match is not None else None,
+            "ambiguous": result["ambiguous"],
+            "fuzzy": result["fuzzy"],
+            "found": found_count,
+            "total": total,
+            "complete": total > 0 and found_count == total,
+        }
+
+
+def reveal_session(quiz_id: str) -> Optional[Dict[str, Any]]:
+    """
+    End a quiz: return every answer and the positions that were found,
+    and delete the session so no more guesses can be made. Returns None
+    if the session doesn't exist (or has expired).
+    """
+    session = get_session(quiz_id)
+    if session is None:
+        return None
+    sessions().filter(pk=quiz_id).delete()
+
+    total = len(session.answers)
+    return {
+        "answers": session.answers,
+        "found_positions": found_positions(int(session.found, 16), total),
+        "found": session.found_count,
+        "total": total,
+    }
+
+
+def clear_expired_sessions() -> int:
+    """
+    Delete every expired session. Returns how many were deleted.
+    """
+    deleted, _ = sessions().filter(expires_at__lte=timezone.now()).delete()
+    return deleted
@@ -0,0 +1,147 @@
+from functools import partial
+from itertools import islice
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional, Tuple
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from football.renderers import dumps
+from football.services.career_totals import career_answer, career_ranked_query
+from football.services.leaderboards import leaderboard_answer, leaderboard_query
+from football.services.quiz_engine import (
+    QuizConfig,
+    choose_engine,
+    generate_quiz,
+    manager_answer,
+    managers_overall_error,
+    managers_query,
+    quiz_response,
+    ranked_answer,
+    ranked_stats_query,
+)
+
+
+# row -> (answer_count, answer)
+RowToAnswer = Callable[[Any], Tuple[int, Dict[str, Any]]]
+
+
+def chunk_size() -> int:
+    return getattr(settings, "QUIZ_STREAM_CHUNK_SIZE", 500)
+
+
+async def aiterate(queryset, size: int) -> AsyncIterator[Any]:
+    """
+    queryset.iterator() for async code, fetched `size` rows at a time on
+    the ORM's sync thread. Django 4.2's own aiterator() runs values_list()
+    queries in the event loop and fails.
+    """
+    rows = queryset.iterator(chunk_size=size)
+    fetch = sync_to_async(lambda: list(islice(rows, size)))
+    while True:
+        chunk = await fetch()
+        if not chunk:
+            return
+        for row in chunk:
+            yield row
+
+
+class QuizStream:
+    """
+    A quiz written as JSON while its ranked query is read, for quizzes
+    too large to build in memory: the same document generate_quiz
+    returns, with "max_answers" moved after the answers (it is only
+    known once a row has been read).
+
+    The query is chosen when the stream is created, by the same
+    choose_engine as generate_quiz, so a bad config fails before the
+    response starts. Rows come from a server-side cursor
+    (QuerySet.iterator) and go out in chunks of QUIZ_STREAM_CHUNK_SIZE
+    answers; the first bytes go out before the query has run. Values
+    are encoded by the API's own renderers.dumps, so chunks are bytes.
+
+    Raises ValueError if the limit or an id isn't an integer; a limit
+    below 1 is read as 1.
+    """
+
+    def __init__(self, config: QuizConfig):
+        self.document: Optional[Dict[str, Any]] = None
+        self.rows = None
+        self.to_answer: Optional[RowToAnswer] = None
+
+        mode = config.get("mode", "club")
+        category = config.get("category", "goals")
+        try:
+            limit = max(int(config.get("limit", 10) or 10), 1)
+            club_id = int(config["club_id"]) if config.get("club_id") else None
+            season_id = int(config["season_id"]) if config.get("season_id") else None
+        except TypeError as exc:
+            raise ValueError(str(exc)) from exc
+        self.config = {**config, "limit": limit, "club_id": club_id, "season_id": season_id}
+
+        engine = choose_engine(mode, category)
+        if engine == "invalid":
+            self.document = managers_overall_error(self.config)
+        elif engine == "snapshot":
+            # Already in memory: nothing to stream from
+            self.document = generate_quiz(self.config)
+        elif engine == "leaderboard":
+            self.rows = leaderboard_query(mode, category, club_id, season_id)[:limit]
+            self.to_answer = partial(leaderboard_answer, category=category)
+        elif engine == "career":
+            self.rows = career_ranked_query(category)[:limit]
+            self.to_answer = partial(career_answer, category=category)
+        elif engine == "orm":
+            self.rows = ranked_stats_query(mode, category, club_id, season_id)[:limit]
+            self.to_answer = partial(ranked_answer, category=category)
+        elif engine == "managers":
+            self.rows = managers_query(mode, club_id, season_id)[:limit]
+            self.to_answer = manager_answer
+        else:
+            self.document = quiz_response(self.config, 0, [])
+
+    def head(self) -> bytes:
+        config = quiz_response(self.config, 0, [])["config"]
+        return b'{"config":' + dumps(config) + b',"answers":['
+
+    def tail(self, max_answers: int) -> bytes:
+        return b'],"max_answers":' + dumps(max_answers) + b"}"
+
+    def __iter__(self) -> Iterator[bytes]:
+        if self.document is not None:
+            yield dumps(self.document)
+            return
+
+        yield self.head()
+        max_answers = 0
+        pending = []
+        separator = b""
+        size = chunk_size()
+        for row in self.rows.iterator(chunk_size=size):
+            max_answers, answer = self.to_answer(row)
+            pending.append(dumps(answer))
+            if len(pending) >= size:
+                yield separator + b",".join(pending)
+                separator = b","
+                pending = []
+        if pending:
+            yield separator + b",".join(pending)
+        yield self.tail(max_answers)
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        if self.document is not None:
+            yield dumps(self.document)
+            return
+
+        yield self.head()
+        max_answers = 0
+        pending = []
+        separator = b""
+        size = chunk_size()
+        async for row in aiterate(self.rows, size):
+            max_answers, answer = self.to_answer(row)
+            pending.append(dumps(answer))
+            if len(pending) >= size:
+                yield separator + b",".join(pending)
+                separator = b","
+                pending = []
+        if pending:
+            yield separator + b",".join(pending)
+        yield self.tail(max_answers)
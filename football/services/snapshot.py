@@ -0,0 +1,293 @@
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from football.models import Club, Person, PersonClubSeason, Season
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed for the snapshot engine
+    np = None
+
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+ROLE_CODES = {PersonClubSeason.ROLE_PLAYER: 0, PersonClubSeason.ROLE_MANAGER: 1}
+ROLE_OTHER = 2
+
+# Column name -> dtype for the per-PersonClubSeason arrays
+COLUMNS = {
+    "person": "int32",
+    "club": "int32",
+    "season": "int32",
+    "role": "int8",
+    "goals": "int32",
+    "assists": "int32",
+    "appearances": "int32",
+}
+
+
+def require_numpy():
+    if np is None:
+        raise ImproperlyConfigured(
+            "The snapshot quiz engine requires numpy (pip install numpy)."
+        )
+
+
+def db_sort_ranks(queryset, field: str) -> List[int]:
+    """
+    Dense rank of every row's `field` in the database's own ORDER BY,
+    indexed like the queryset ordered by id. Tie-breaks on names then
+    follow the DB collation, exactly like the ORM engine's order_by.
+    """
+    codes = {pk: code for code, pk in enumerate(queryset.order_by("id").values_list("id", flat=True))}
+    ranks = [0] * len(codes)
+    rank = -1
+    previous = None
+    for i, (pk, value) in enumerate(queryset.order_by(field, "id").values_list("id", field)):
+        if i == 0 or value != previous:
+            rank += 1
+            previous = value
+        ranks[codes[pk]] = rank
+    return ranks
+
+
+def export_snapshot(path) -> int:
+    """
+    Write PersonClubSeason + StatsPersonClubSeason to `path` as one .npy
+    file per column, integer-coded against the person/club/season tables
+    stored alongside. Returns the number of rows written.
+    """
+    require_numpy()
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+
+    people = list(Person.objects.order_by("id").values_list("id", "first_name", "last_name"))
+    clubs = list(Club.objects.order_by("id").values_list("id", "name"))
+    seasons = list(Season.objects.order_by("id").values_list("id", "label"))
+
+    person_codes = {pk: code for code, (pk, _, _) in enumerate(people)}
+    club_codes = {pk: code for code, (pk, _) in enumerate(clubs)}
+    season_codes = {pk: code for code, (pk, _) in enumerate(seasons)}
+
+    rows = [
+        (
+            person_codes[person_id],
+            club_codes[club_id],
+            season_codes[season_id],
+            ROLE_CODES.get(role, ROLE_OTHER),
+            goals or 0,
+            assists or 0,
+            appearances or 0,
+        )
+        for person_id, club_id, season_id, role, goals, assists, appearances in (
+            PersonClubSeason.objects.order_by("id")
+            .values_list(
+                "person_id", "club_id", "season_id", "role",
+                "stats__goals", "stats__assists", "stats__appearances",
+            )
+            .iterator(chunk_size=10000)
+        )
+    ]
+    table = np.array(rows, dtype="int64").reshape(-1, len(COLUMNS))
+    for index, (name, dtype) in enumerate(COLUMNS.items()):
+        np.save(path / f"{name}.npy", table[:, index].astype(dtype))
+
+    with open(path / MANIFEST, "w", encoding="utf-8") as f:
+        json.dump({
+            "rows": len(rows),
+            "people": people,
+            "clubs": clubs,
+            "seasons": seasons,
+            "sort_ranks": {
+                "last_name": db_sort_ranks(Person.objects.all(), "last_name"),
+                "first_name": db_sort_ranks(Person.objects.all(), "first_name"),
+                "club_name": db_sort_ranks(Club.objects.all(), "name"),
+            },
+        }, f)
+
+    return len(rows)
+
+
+class SnapshotEngine:
+    """
+    Answers quizzes from a memory-mapped snapshot with vectorized
+    group-by/sort, returning exactly what the ORM path returns.
+    """
+
+    def __init__(self, path):
+        require_numpy()
+        path = Path(path)
+
+        with open(path / MANIFEST, encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        self.columns = {
+            name: np.load(path / f"{name}.npy", mmap_mode="r") for name in COLUMNS
+        }
+
+        self.person_ids = np.array([row[0] for row in manifest["people"]], dtype="int64")
+        self.first_names = [row[1] for row in manifest["people"]]
+        self.last_names = [row[2] for row in manifest["people"]]
+        self.club_names = [row[1] for row in manifest["clubs"]]
+        self.club_codes = {row[0]: code for code, row in enumerate(manifest["clubs"])}
+        self.season_codes = {row[0]: code for code, row in enumerate(manifest["seasons"])}
+
+        # Sort keys as dense ranks so ordering stays vectorized. The ranks
+        # come from the database's ORDER BY; snapshots written before they
+        # were exported fall back to Python's code-point order.
+        sort_ranks = manifest.get("sort_ranks")
+        if sort_ranks:
+            self.last_name_rank = np.array(sort_ranks["last_name"], dtype="int64")
+            self.first_name_rank = np.array(sort_ranks["first_name"], dtype="int64")
+            self.club_name_rank = np.array(sort_ranks["club_name"], dtype="int64")
+        else:
+            self.last_name_rank = self.dense_rank(self.last_names)
+            self.first_name_rank = self.dense_rank(self.first_names)
+            self.club_name_rank = self.dense_rank(self.club_names)
+
+    @staticmethod
+    def dense_rank(values: List[str]):
+        order = sorted(range(len(values)), key=values.__getitem__)
+        ranks = np.empty(len(values), dtype="int64")
+        rank = -1
+        previous = None
+        for i, index in enumerate(order):
+            if i == 0 or values[index] != previous:
+                rank += 1
+                previous = values[index]
+            ranks[index] = rank
+        return ranks
+
+    def scope_mask(self, mode: str, club_id: Any, season_id: Any):
+        """
+        Boolean row mask for the quiz scope, or None when the id is unknown.
+        """
+        mask = np.ones(len(self.columns["person"]), dtype=bool)
+        if mode == "club" and club_id:
+            code = self.club_codes.get(int(club_id))
+            if code is None:
+                return None
+            mask &= self.columns["club"] == code
+        elif mode == "season" and season_id:
+            code = self.season_codes.get(int(season_id))
+            if code is None:
+                return None
+            mask &= self.columns["season"] == code
+        return mask
+
+    def answers(
+        self, mode: str, category: str, club_id: Any, season_id: Any, limit: int
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Same contract as quiz_engine.ranked_stats / quiz_engine.managers.
+        """
+        mask = self.scope_mask(mode, club_id, season_id)
+        if mask is None:
+            return 0, []
+        if category == "managers":
+            return self.managers(mask, limit)
+        return self.ranked_stats(mask, category, limit)
+
+    def ranked_stats(self, mask, category: str, limit: int):
+        values = self.columns[category]
+        mask &= values > 0
+
+        # Group by (person, club): the ORM groups by person and club name
+        n_clubs = max(len(self.club_names), 1)
+        keys = self.columns["person"][mask].astype("int64") * n_clubs + self.columns["club"][mask]
+        groups, inverse = np.unique(keys, return_inverse=True)
+        totals = np.bincount(inverse, weights=values[mask], minlength=len(groups)).astype("int64")
+
+        persons = groups // n_clubs
+        clubs = groups % n_clubs
+
+        order = np.lexsort((
+            self.club_name_rank[clubs],
+            self.person_ids[persons],
+            self.last_name_rank[persons],
+            -totals,
+        ))
+        sorted_totals = totals[order]
+        # RANK(): 1 + number of groups with a strictly larger total
+        ranks = np.searchsorted(-sorted_totals, -sorted_totals, side="left") + 1
+
+        answers: List[Dict[str, Any]] = []
+        for i in order[:limit].tolist():
+            position = len(answers)
+            person = int(persons[i])
+            first_name = self.first_names[person]
+            last_name = self.last_names[person]
+            full_name = f"{first_name} {last_name}"
+            answers.append({
+                'id': int(self.person_ids[person]),
+                'rank': int(ranks[position]),
+                'name': full_name.strip(),
+                'first_name': first_name,
+                'last_name': last_name,
+                'club': self.club_names[int(clubs[i])],
+                f'total_{category}': int(totals[i]),
+            })
+        return len(groups), answers
+
+    def managers(self, mask, limit: int):
+        mask &= self.columns["role"] == ROLE_CODES[PersonClubSeason.ROLE_MANAGER]
+        persons = np.unique(self.columns["person"][mask]).astype("int64")
+
+        order = np.lexsort((
+            self.person_ids[persons],
+            self.first_name_rank[persons],
+            self.last_name_rank[persons],
+        ))
+
+        answers: List[Dict[str, Any]] = []
+        for person in persons[order[:limit]].tolist():
+            first_name = self.first_names[person]
+            last_name = self.last_names[person]
+            full_name = f"{first_name} {last_name}"
+            answers.append({
+                'id': int(self.person_ids[person]),
+                'name': full_name.strip(),
+                'first_name': first_name,
+                'last_name': last_name,
+            })
+        return len(persons), answers
+
+
+_engine: Optional[SnapshotEngine] = None
+_engine_failed = False
+_engine_lock = threading.Lock()
+
+
+def load_engine(path=None) -> SnapshotEngine:
+    """
+    (Re)load the process-wide snapshot engine.
+    """
+    global _engine
+    engine = SnapshotEngine(path or settings.QUIZ_SNAPSHOT_PATH)
+    with _engine_lock:
+        _engine = engine
+    return engine
+
+
+def get_engine() -> Optional[SnapshotEngine]:
+    """
+    The snapshot engine when QUIZ_ENGINE == "snapshot", else None.
+    A snapshot that fails to load is logged once and the ORM path is used
+    until the worker restarts.
+    """
+    global _engine_failed
+    if getattr(settings, "QUIZ_ENGINE", "orm") != "snapshot" or _engine_failed:
+        return None
+    if _engine is None:
+        try:
+            load_engine()
+        except (OSError, ValueError, ImproperlyConfigured):
+            logger.exception("Could not load quiz snapshot, falling back to the ORM engine.")
+            _engine_failed = True
+            return None
+    return _engine
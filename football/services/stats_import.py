@@ -0,0 +1,105 @@
+import os
+import time
+from typing import Any, Dict, Tuple
+
+# Models are imported inside the functions: in a spawned worker process
+# this module is unpickled before setup_worker() has configured Django.
+
+# The CSV layout import_stats reads and generate_dataset/export_stats write
+COLUMNS = [
+    "person_id", "first_name", "last_name", "season_label", "club_name",
+    "role", "appearances", "goals", "assists",
+]
+STAT_COLUMNS = ("appearances", "goals", "assists")
+
+# A person_id cell of "ref:<key>" names a person new to this file: the
+# first row with the key creates them, later rows in the file reuse them.
+PERSON_REF_PREFIX = "ref:"
+
+# pcs_id -> (appearances, goals, assists)
+StatsValues = Dict[int, Tuple[int, int, int]]
+
+
+def setup_worker():
+    """
+    Process pool initializer for import_stats --workers.
+    """
+    import django
+
+    django.setup()
+
+
+def write_stats(stats_values: StatsValues):
+    """
+    Create or overwrite StatsPersonClubSeason rows.
+    Returns (created_count, updated_count, deltas), deltas mapping
+    pcs_id -> the change in (appearances, goals, assists).
+    """
+    from football.models import StatsPersonClubSeason
+    from football.services.career_totals import stats_delta
+
+    if not stats_values:
+        return 0, 0, {}
+
+    to_update = []
+    deltas = {}
+    for stats in StatsPersonClubSeason.objects.filter(
+        person_club_season_id__in=stats_values.keys()
+    ):
+        appearances, goals, assists = stats_values[stats.person_club_season_id]
+        deltas[stats.person_club_season_id] = stats_delta(
+            (stats.appearances, stats.goals, stats.assists),
+            (appearances, goals, assists),
+        )
+        stats.appearances = appearances
+        stats.goals = goals
+        stats.assists = assists
+        to_update.append(stats)
+
+    existing = {stats.person_club_season_id for stats in to_update}
+    to_create = [
+        StatsPersonClubSeason(
+            person_club_season_id=pcs_id,
+            appearances=appearances,
+            goals=goals,
+            assists=assists,
+        )
+        for pcs_id, (appearances, goals, assists) in stats_values.items()
+        if pcs_id not in existing
+    ]
+
+    if to_update:
+        StatsPersonClubSeason.objects.bulk_update(
+            to_update, ["appearances", "goals", "assists"], batch_size=1000
+        )
+    if to_create:
+        StatsPersonClubSeason.objects.bulk_create(to_create, batch_size=1000)
+    for stats in to_create:
+        deltas[stats.person_club_season_id] = stats_delta(
+            None, (stats.appearances, stats.goals, stats.assists)
+        )
+
+    return len(to_create), len(to_update), deltas
+
+
+def import_season_shard(season_id: int, stats_values: StatsValues) -> Dict[str, Any]:
+    """
+    Write the stats of one season in one transaction. Every
+    PersonClubSeason belongs to exactly one season, so shards of
+    different seasons never touch the same rows and can run in parallel.
+    """
+    from django.db import transaction
+
+    started = time.perf_counter()
+    with transaction.atomic():
+        created, updated, deltas = write_stats(stats_values)
+
+    return {
+        "season_id": season_id,
+        "worker": os.getpid(),
+        "rows": len(stats_values),
+        "created": created,
+        "updated": updated,
+        "deltas": deltas,
+        "elapsed": time.perf_counter() - started,
+    }
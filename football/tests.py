@@ -1,3 +1,1603 @@
-from django.test import TestCase
+import csv
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+import time
+from concurrent.futures import Future
+from contextvars import Context
+from importlib import import_module
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from rest_framework.response import Response
+from django.utils import timezone
+
+from .models import (
+    CareerTotal,
+    Club,
+    ImportCheckpoint,
+    ImportedRow,
+    LeaderboardEntry,
+    Season,
+    Person,
+    PersonClubSeason,
+    QuizSession,
+    StatsPersonClubSeason,
+)
+from . import routers
+from .middleware import ProfilingMiddleware, ReplicaPinMiddleware, install_context_counter
+from .renderers import FastJSONRenderer, to_columns, wants_columns
+from .routers import ReplicaRouter, use_primary
+from .services import snapshot
+from .services.career_totals import diff_career_totals, rebuild_career_totals
+from .services.leaderboards import rebuild_leaderboards
+from .services.metrics import MetricsRegistry, registry
+from .services.quiz_cache import (
+    bump_data_version,
+    get_cache_stats,
+    get_data_version,
+    get_quiz,
+    local_cache,
+    reset_cache_stats,
+)
+from .services.quiz_engine import agenerate_quiz, choose_engine, generate_quiz, generate_quizzes
+from .services.quiz_pages import quiz_page
+from .services.quiz_stream import QuizStream
+from .services.name_matching import NameMatcher, fold_name
+from .services.profiling import get_report, store_report
+from .services import quiz_sessions
+from .services.quiz_sessions import create_session, reveal_session, submit_guess
+
+
+MODES = ("club", "season", "overall")
+CATEGORIES = ("goals", "assists", "appearances", "managers")
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "quizzes": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "quizzes"},
+}
+
+
+def seed_quiz_data():
+    """
+    Two clubs, two seasons, a handful of players (with a goals tie) and
+    a manager who stayed at the same club for both seasons.
+    """
+    arsenal = Club.objects.create(name="Arsenal")
+    chelsea = Club.objects.create(name="Chelsea")
+    s1 = Season.objects.create(label="2023/24")
+    s2 = Season.objects.create(label="2024/25")
+
+    players = [
+        ("Bukayo", "Saka", arsenal, s1, 38, 16, 9),
+        ("Bukayo", "Saka", arsenal, s2, 25, 6, 10),
+        ("Kai", "Havertz", arsenal, s1, 37, 13, 7),
+        ("Cole", "Palmer", chelsea, s1, 34, 22, 11),
+        ("Nicolas", "Jackson", chelsea, s2, 30, 10, 5),
+        ("Reiss", "Nelson", arsenal, s2, 4, 0, 0),
+    ]
+    people = {}
+    for first, last, club, season, apps, goals, assists in players:
+        person = people.get((first, last))
+        if person is None:
+            person = people[(first, last)] = Person.objects.create(
+                first_name=first, last_name=last
+            )
+        pcs = PersonClubSeason.objects.create(
+            person=person, club=club, season=season, role="player"
+        )
+        StatsPersonClubSeason.objects.create(
+            person_club_season=pcs, appearances=apps, goals=goals, assists=assists
+        )
+
+    arteta = Person.objects.create(first_name="Mikel", last_name="Arteta")
+    for season in (s1, s2):
+        PersonClubSeason.objects.create(
+            person=arteta, club=arsenal, season=season, role="manager"
+        )
+
+    return arsenal, chelsea, s1, s2
+
+
+class GenerateQuizTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.arsenal, cls.chelsea, cls.s1, cls.s2 = seed_quiz_data()
+        rebuild_career_totals()
+        rebuild_leaderboards()
+
+    def configs(self):
+        for mode in MODES:
+            for category in CATEGORIES:
+                yield {
+                    "mode": mode,
+                    "category": category,
+                    "club_id": self.arsenal.id,
+                    "season_id": self.s1.id,
+                    "limit": 10,
+                }
+
+    def test_single_query_per_quiz(self):
+        for use_leaderboards in (False, True):
+            with override_settings(QUIZ_USE_LEADERBOARDS=use_leaderboards):
+                for config in self.configs():
+                    expected = 0 if config["mode"] == "overall" and config["category"] == "managers" else 1
+                    with self.subTest(leaderboards=use_leaderboards, **config):
+                        with self.assertNumQueries(expected):
+                            generate_quiz(config)
+
+    async def test_async_generation_matches_sync(self):
+        for use_leaderboards in (False, True):
+            with override_settings(QUIZ_USE_LEADERBOARDS=use_leaderboards):
+                for config in self.configs():
+                    with self.subTest(leaderboards=use_leaderboards, **config):
+                        expected = await sync_to_async(generate_quiz)(config)
+                        self.assertEqual(await agenerate_quiz(config), expected)
+
+    def test_one_dispatcher_picks_the_engine(self):
+        with override_settings(QUIZ_USE_LEADERBOARDS=True, QUIZ_USE_CAREER_TOTALS=True):
+            self.assertEqual(choose_engine("club", "goals"), "leaderboard")
+            self.assertEqual(choose_engine("overall", "goals"), "career")
+            self.assertEqual(choose_engine("overall", "assists"), "career")
+            self.assertEqual(choose_engine("club", "managers"), "managers")
+            self.assertEqual(choose_engine("overall", "managers"), "invalid")
+            self.assertIsNone(choose_engine("club", "cards"))
+        with override_settings(QUIZ_USE_LEADERBOARDS=False, QUIZ_USE_CAREER_TOTALS=True):
+            self.assertEqual(choose_engine("overall", "goals"), "career")
+            self.assertEqual(choose_engine("season", "goals"), "orm")
+
+    @override_settings(ALLOWED_HOSTS=["testserver"])
+    def test_get_rejects_malformed_parameters(self):
+        bump_data_version()
+        for query in ("limit=abc", "club_id=abc", "season_id=1.5&mode=season"):
+            with self.subTest(query=query):
+                response = self.client.get(f"/api/quizzes/generate/?mode=club&category=goals&{query}")
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {"error": "Ids and limit must be integers."})
+
+        # Like the canonical URLs, a limit below 1 is clamped
+        response = self.client.get(
+            f"/api/quizzes/generate/?mode=club&category=goals&club_id={self.arsenal.id}&limit=-5"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["config"]["limit"], 1)
+        self.assertEqual(len(response.json()["answers"]), 1)
+
+    @override_settings(QUIZ_STREAM_CHUNK_SIZE=2)
+    async def test_streamed_quizzes_match_generated(self):
+        for use_leaderboards in (False, True):
+            with override_settings(QUIZ_USE_LEADERBOARDS=use_leaderboards):
+                for config in self.configs():
+                    with self.subTest(leaderboards=use_leaderboards, **config):
+                        expected = await sync_to_async(generate_quiz)(config)
+                        streamed = await sync_to_async(lambda: b"".join(QuizStream(config)))()
+                        self.assertEqual(json.loads(streamed), expected)
+                        streamed = b"".join([chunk async for chunk in QuizStream(config)])
+                        self.assertEqual(json.loads(streamed), expected)
+
+    @override_settings(QUIZ_STREAM_MIN_LIMIT=1000, ALLOWED_HOSTS=["testserver"])
+    def test_large_get_quizzes_are_streamed(self):
+        response = self.client.get("/api/quizzes/generate/?mode=overall&category=goals&limit=1000")
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(
+            json.loads(b"".join(response)),
+            generate_quiz({"mode": "overall", "category": "goals", "limit": "1000"}),
+        )
+        response = self.client.get("/api/quizzes/generate/?mode=overall&category=goals&limit=999")
+        self.assertFalse(response.streaming)
+
+    def test_stream_checks_its_config(self):
+        streamed = json.loads(b"".join(QuizStream({"mode": "overall", "category": "goals", "limit": -5})))
+        self.assertEqual(len(streamed["answers"]), 1)
+        for config in ({"limit": "abc"}, {"club_id": "abc"}, {"season_id": [1]}):
+            with self.subTest(**config):
+                with self.assertRaises(ValueError):
+                    QuizStream({"mode": "club", "category": "goals", **config})
+
+    @override_settings(ALLOWED_HOSTS=["testserver"])
+    def test_streamed_get_rejects_malformed_parameters(self):
+        url = "/api/quizzes/generate/?mode=club&category=goals&stream=1"
+        response = self.client.get(f"{url}&club_id={self.arsenal.id}&limit=-5")
+        self.assertTrue(response.streaming)
+        self.assertEqual(len(json.loads(b"".join(response))["answers"]), 1)
+        for query in ("limit=abc", "club_id=abc"):
+            with self.subTest(query=query):
+                response = self.client.get(f"{url}&{query}")
+                self.assertEqual(response.status_code, 400)
+
+    def test_pages_match_full_quiz(self):
+        engines = {
+            "orm": {"QUIZ_USE_LEADERBOARDS": False, "QUIZ_USE_CAREER_TOTALS": False},
+            "career": {"QUIZ_USE_LEADERBOARDS": False, "QUIZ_USE_CAREER_TOTALS": True},
+            "leaderboard": {"QUIZ_USE_LEADERBOARDS": True, "QUIZ_USE_CAREER_TOTALS": False},
+        }
+        for engine, engine_settings in engines.items():
+            with override_settings(**engine_settings):
+                for config in self.configs():
+                    if config["category"] == "managers":
+                        continue
+                    full = generate_quiz({**config, "limit": 100})
+                    for page_size in (1, 2, 3):
+                        with self.subTest(engine=engine, page_size=page_size, **config):
+                            answers, cursor = [], None
+                            while True:
+                                with CaptureQueriesContext(connection) as ctx:
+                                    page = quiz_page({**config, "limit": page_size}, cursor)
+                                self.assertEqual(len(ctx.captured_queries), 1)
+                                self.assertNotIn("OFFSET", ctx.captured_queries[0]["sql"])
+                                self.assertEqual(page["max_answers"], full["max_answers"])
+                                answers += page["answers"]
+                                cursor = page["next_cursor"]
+                                if cursor is None:
+                                    break
+                            self.assertEqual(answers, full["answers"])
+
+    @override_settings(ALLOWED_HOSTS=["testserver"])
+    def test_page_endpoint(self):
+        response = self.client.get("/api/quizzes/overall/goals/page/?limit=3")
+        self.assertEqual(len(response.data["answers"]), 3)
+        response = self.client.get(
+            f"/api/quizzes/overall/goals/page/?limit=3&cursor={response.data['next_cursor']}"
+        )
+        self.assertEqual([a["last_name"] for a in response.data["answers"]], ["Jackson"])
+        self.assertIsNone(response.data["next_cursor"])
+
+        response = self.client.get("/api/quizzes/overall/goals/page/?cursor=bogus")
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get("/api/quizzes/club/managers/page/?club_id=1")
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(QUIZ_USE_LEADERBOARDS=False)
+    def test_career_totals_match_summed_stats(self):
+        for category in CATEGORIES[:3]:
+            config = {"mode": "overall", "category": category, "limit": 10}
+            with override_settings(QUIZ_USE_CAREER_TOTALS=False):
+                expected = generate_quiz(config)
+            with self.subTest(category=category):
+                self.assertEqual(generate_quiz(config), expected)
+
+    def test_ties_share_a_rank(self):
+        config = {"mode": "overall", "category": "goals", "limit": 10}
+        for use_leaderboards in (False, True):
+            with override_settings(QUIZ_USE_LEADERBOARDS=use_leaderboards):
+                quiz = generate_quiz(config)
+                self.assertEqual(quiz["max_answers"], 4)
+                self.assertEqual(
+                    [(a["last_name"], a["rank"]) for a in quiz["answers"]],
+                    [("Palmer", 1), ("Saka", 1), ("Havertz", 3), ("Jackson", 4)],
+                )
+
+    def test_max_answers_ignores_limit(self):
+        config = {"mode": "overall", "category": "appearances", "limit": 2}
+        for use_leaderboards in (False, True):
+            with override_settings(QUIZ_USE_LEADERBOARDS=use_leaderboards):
+                quiz = generate_quiz(config)
+                self.assertEqual(len(quiz["answers"]), 2)
+                self.assertEqual(quiz["max_answers"], 5)
+
+    def test_batch_matches_single_quizzes(self):
+        rebuild_leaderboards()
+        configs = [
+            {"mode": "club", "club_id": self.arsenal.id, "category": category, "limit": 2}
+            for category in ("goals", "assists", "appearances")
+        ]
+        configs.append({"mode": "club", "club_id": self.arsenal.id, "category": "goals", "limit": 1})
+        configs.append({"mode": "overall", "category": "managers"})
+
+        for use_leaderboards in (False, True):
+            with self.subTest(use_leaderboards=use_leaderboards), override_settings(
+                QUIZ_USE_LEADERBOARDS=use_leaderboards
+            ):
+                # One shared read for the club scope, none for overall+managers
+                with self.assertNumQueries(1):
+                    results = generate_quizzes(configs)
+
+                self.assertEqual(results[:4], [generate_quiz(config) for config in configs[:4]])
+                self.assertEqual(len(results[0]["answers"]), 2)
+                self.assertIn("error", results[4])
+
+    @override_settings(QUIZ_USE_LEADERBOARDS=False, QUIZ_USE_CAREER_TOTALS=False)
+    def test_shared_scan_cuts_each_category_in_sql(self):
+        configs = [
+            {"mode": "overall", "category": "goals", "limit": 1},
+            {"mode": "overall", "category": "appearances", "limit": 50},
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            results = generate_quizzes(configs)
+        self.assertEqual(len(queries), 1)
+        self.assertIn("ROW_NUMBER", queries[0]["sql"])
+        self.assertEqual(results, [generate_quiz(config) for config in configs])
+        self.assertEqual(results[0]["max_answers"], 4)
+        self.assertEqual(len(results[0]["answers"]), 1)
+
+    def test_batch_reports_invalid_items(self):
+        results = generate_quizzes(["goals", {"category": "goals", "limit": "many"}])
+        self.assertEqual([("error" in result) for result in results], [True, True])
+
+    def test_manager_counted_once(self):
+        quiz = generate_quiz({"mode": "club", "club_id": self.arsenal.id, "category": "managers"})
+        self.assertEqual(quiz["max_answers"], 1)
+        self.assertEqual(quiz["answers"][0]["name"], "Mikel Arteta")
+
+
+class LeaderboardTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.arsenal, cls.chelsea, cls.s1, cls.s2 = seed_quiz_data()
+
+    def configs(self):
+        for category in CATEGORIES[:3]:
+            yield {"mode": "overall", "category": category, "limit": 50}
+            for club_id in (self.arsenal.id, self.chelsea.id):
+                yield {"mode": "club", "category": category, "club_id": club_id, "limit": 50}
+            for season_id in (self.s1.id, self.s2.id):
+                yield {"mode": "season", "category": category, "season_id": season_id, "limit": 50}
+
+    def assert_matches_orm(self):
+        for config in self.configs():
+            with self.subTest(**config):
+                with override_settings(QUIZ_USE_LEADERBOARDS=False, QUIZ_USE_CAREER_TOTALS=False):
+                    expected = generate_quiz(config)
+                with override_settings(QUIZ_USE_LEADERBOARDS=True, QUIZ_USE_CAREER_TOTALS=False):
+                    self.assertEqual(generate_quiz(config), expected)
+
+    @override_settings(CACHES=LOCMEM_CACHES, QUIZ_USE_LEADERBOARDS=True)
+    def test_rebuild_command_invalidates_cached_quizzes(self):
+        bump_data_version()
+        config = {"mode": "club", "category": "goals", "club_id": self.arsenal.id}
+        self.assertEqual(get_quiz(config)["answers"], [])
+
+        call_command("rebuild_leaderboards", stdout=StringIO())
+        self.assertEqual(get_quiz(config)["answers"][0]["last_name"], "Saka")
+
+    def test_rebuilt_leaderboards_match_orm(self):
+        rebuild_leaderboards()
+        self.assert_matches_orm()
+
+    def test_migration_backfills_existing_data(self):
+        backfill = import_module("football.migrations.0006_backfill_leaderboards")
+        backfill.fill_leaderboards(django_apps, None)
+        self.assert_matches_orm()
+
+        # Leaderboards already built (e.g. by import_stats) are left alone
+        with self.assertNumQueries(1):
+            backfill.fill_leaderboards(django_apps, None)
+
+    def test_import_rebuilds_leaderboards(self):
+        rebuild_leaderboards()
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as f:
+            f.write(CareerTotalImportTests.HEADER + ",Declan,Rice,2023/24,Arsenal,player,38,30,8\n")
+        self.addCleanup(os.unlink, f.name)
+        call_command("import_stats", f.name, stdout=StringIO())
+
+        with override_settings(QUIZ_USE_LEADERBOARDS=True):
+            quiz = generate_quiz({"mode": "club", "category": "goals", "club_id": self.arsenal.id})
+        self.assertEqual(quiz["answers"][0]["last_name"], "Rice")
+        self.assert_matches_orm()
+
+    def test_partial_rebuild_matches_full_rebuild(self):
+        rebuild_leaderboards()
+        stats = StatsPersonClubSeason.objects.get(
+            person_club_season__person__last_name="Saka", person_club_season__season=self.s1
+        )
+        stats.goals = 40
+        stats.save()
+        written = rebuild_leaderboards(club_ids={self.arsenal.id}, season_ids={self.s1.id})
+
+        entries = lambda: sorted(LeaderboardEntry.objects.values_list(
+            "scope", "scope_id", "category", "position", "rank", "person_id", "total", "answer_count",
+        ))
+        partial = entries()
+        self.assertEqual(written, LeaderboardEntry.objects.exclude(
+            scope__in=("club", "season")
+        ).count() + LeaderboardEntry.objects.filter(
+            scope="club", scope_id=self.arsenal.id
+        ).count() + LeaderboardEntry.objects.filter(scope="season", scope_id=self.s1.id).count())
+        rebuild_leaderboards()
+        self.assertEqual(partial, entries())
+        self.assert_matches_orm()
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class QuizCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.arsenal, cls.chelsea, cls.s1, cls.s2 = seed_quiz_data()
+        rebuild_leaderboards()
+
+    def setUp(self):
+        bump_data_version()
+        reset_cache_stats()
+        self.config = {"mode": "club", "category": "goals", "club_id": self.arsenal.id}
+
+    def test_hit_and_miss_counters(self):
+        quiz = get_quiz(self.config)
+        self.assertEqual(get_quiz(self.config), quiz)
+        local_cache.clear()
+        self.assertEqual(get_quiz(self.config), quiz)
+
+        stats = get_cache_stats()
+        self.assertEqual(
+            (stats["misses"], stats["local_hits"], stats["shared_hits"]), (1, 1, 1)
+        )
+        self.assertAlmostEqual(stats["hit_ratio"], 2 / 3)
+        reset_cache_stats()
+        self.assertEqual(get_cache_stats()["hit_ratio"], 0.0)
+
+    def test_version_bump_invalidates_cached_quizzes(self):
+        self.assertEqual(get_quiz(self.config)["answers"][0]["last_name"], "Saka")
+        StatsPersonClubSeason.objects.filter(
+            person_club_season__person__last_name="Saka"
+        ).update(goals=0)
+        rebuild_leaderboards()
+
+        # Still served from the cache until the version moves
+        self.assertEqual(get_quiz(self.config)["answers"][0]["last_name"], "Saka")
+        bump_data_version()
+        self.assertNotEqual(get_quiz(self.config)["answers"][0]["last_name"], "Saka")
+        self.assertEqual(get_cache_stats()["misses"], 2)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class AdminDataVersionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.arsenal, cls.chelsea, cls.s1, cls.s2 = seed_quiz_data()
+        rebuild_career_totals()
+        rebuild_leaderboards()
+        cls.admin = get_user_model().objects.create_superuser("admin", "admin@example.com", "pw")
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def assert_derived_data_in_sync(self):
+        self.assertEqual(diff_career_totals(), [])
+        boards = lambda: sorted(LeaderboardEntry.objects.values_list(
+            "scope", "scope_id", "category", "position", "person_id", "total", "answer_count",
+        ))
+        scoped = boards()
+        rebuild_leaderboards()
+        self.assertEqual(scoped, boards())
+
+    def test_delete_rebuilds_affected_scope_and_bumps_version(self):
+        version = get_data_version()
+        pcs = PersonClubSeason.objects.get(person__last_name="Saka", season=self.s2)
+        response = self.client.post(
+            reverse("admin:football_personclubseason_delete", args=[pcs.pk]), {"post": "yes"}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertGreater(get_data_version(), version)
+        self.assert_derived_data_in_sync()
+
+    def test_club_delete_rebuilds_every_board_it_fed(self):
+        response = self.client.post(
+            reverse("admin:football_club_delete", args=[self.chelsea.pk]), {"post": "yes"}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(LeaderboardEntry.objects.filter(club_name="Chelsea").exists())
+        self.assert_derived_data_in_sync()
+
+
+@skipUnless(connection.vendor == "postgresql", "EXPLAIN checks target PostgreSQL")
+class QuizQueryPlanTests(TestCase):
+    """
+    Every quiz query must be answerable from an index. Sequential scans are
+    disabled for the session, so a "Seq Scan" left in the plan means the
+    planner had no index to fall back to.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.arsenal, cls.chelsea, cls.s1, cls.s2 = seed_quiz_data()
+        rebuild_leaderboards()
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("EXPLAIN " + sql)
+            return "\n".join(row[0] for row in cursor.fetchall())
+
+    def test_no_sequential_scans(self):
+        for use_leaderboards in (False, True):
+            with override_settings(QUIZ_USE_LEADERBOARDS=use_leaderboards):
+                for mode in MODES:
+                    for category in CATEGORIES:
+                        config = {
+                            "mode": mode,
+                            "category": category,
+                            "club_id": self.arsenal.id,
+                            "season_id": self.s1.id,
+                        }
+                        with CaptureQueriesContext(connection) as queries:
+                            generate_quiz(config)
+                        for query in queries:
+                            plan = self.explain(query["sql"])
+                            with self.subTest(leaderboards=use_leaderboards, **config):
+                                self.assertNotIn("Seq Scan", plan)
+
+
+@skipUnless(snapshot.np is not None, "snapshot engine requires numpy")
+class SnapshotEngineEquivalenceTests(TestCase):
+    """
+    The snapshot engine must return exactly what the ORM engine returns.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.arsenal, cls.chelsea, cls.s1, cls.s2 = seed_quiz_data()
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        snapshot.export_snapshot(self.tmp.name)
+        snapshot.load_engine(self.tmp.name)
+
+    def configs(self):
+        for category in CATEGORIES:
+            for limit in (2, 50):
+                yield {"mode": "overall", "category": category, "limit": limit}
+                for club_id in (self.arsenal.id, self.chelsea.id, 9999, None):
+                    yield {"mode": "club", "category": category, "club_id": club_id, "limit": limit}
+                for season_id in (self.s1.id, self.s2.id, 9999, None):
+                    yield {"mode": "season", "category": category, "season_id": season_id, "limit": limit}
+
+    def test_engines_return_identical_quizzes(self):
+        for config in self.configs():
+            with self.subTest(**config):
+                with override_settings(
+                    QUIZ_ENGINE="orm", QUIZ_USE_LEADERBOARDS=False, QUIZ_USE_CAREER_TOTALS=False
+                ):
+                    expected = generate_quiz(config)
+                with override_settings(QUIZ_ENGINE="snapshot"):
+                    with self.assertNumQueries(0):
+                        actual = generate_quiz(config)
+                self.assertEqual(actual, expected)
+
+    def test_name_ties_follow_the_exported_database_order(self):
+        manifest_path = os.path.join(self.tmp.name, snapshot.MANIFEST)
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        db_order = list(Person.objects.order_by("last_name", "id").values_list("id", flat=True))
+        ranks = manifest["sort_ranks"]["last_name"]
+        people = [row[0] for row in manifest["people"]]
+        self.assertEqual(sorted(people, key=lambda pk: (ranks[people.index(pk)], pk)), db_order)
+
+        # Palmer and Saka tie on 22 overall goals: reverse the exported
+        # order (as a different collation could) and the engine follows it
+        manifest["sort_ranks"]["last_name"] = [max(ranks) - rank for rank in ranks]
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        snapshot.load_engine(self.tmp.name)
+        with override_settings(QUIZ_ENGINE="snapshot"):
+            quiz = generate_quiz({"mode": "overall", "category": "goals", "limit": 2})
+        self.assertEqual([a["last_name"] for a in quiz["answers"]], ["Saka", "Palmer"])
+
+
+class QuizSessionTests(TestCase):
+    def setUp(self):
+        self.quiz = {"answers": [
+            {"id": 1, "name": "Bukayo Saka", "last_name": "Saka"},
+            {"id": 2, "name": "Cole Palmer", "last_name": "Palmer"},
+            {"id": 3, "name": "Jeremy Palmer", "last_name": "Palmer"},
+        ]}
+        self.quiz_id = create_session(self.quiz)
+
+    def test_shared_last_name_matches_next_unfound_answer(self):
+        result = submit_guess(self.quiz_id, " palmer ")
+        self.assertEqual((result["position"], result["ambiguous"]), (1, True))
+        result = submit_guess(self.quiz_id, "Palmer")
+        self.assertEqual((result["position"], result["ambiguous"]), (2, False))
+        self.assertFalse(submit_guess(self.quiz_id, "Palmer")["correct"])
+
+    def test_completion_and_unknown_session(self):
+        for guess in ("Bukayo Saka", "cole palmer", "jeremy palmer"):
+            result = submit_guess(self.quiz_id, guess)
+        self.assertTrue(result["complete"])
+        self.assertEqual(result["found"], 3)
+        self.assertIsNone(submit_guess("0" * 32, "Saka"))
+
+    def test_concurrent_guesses_keep_every_found_answer(self):
+        # The second guess matched against the bitset from before the first
+        # one was saved: its compare-and-set fails and it matches again
+        stale = quiz_sessions.get_session(self.quiz_id)
+        submit_guess(self.quiz_id, "Saka")
+        with mock.patch.object(
+            quiz_sessions, "get_session", side_effect=[stale, quiz_sessions.get_session(self.quiz_id)]
+        ):
+            result = submit_guess(self.quiz_id, "Palmer")
+        self.assertEqual((result["position"], result["found"]), (1, 2))
+        self.assertEqual(reveal_session(self.quiz_id)["found_positions"], [0, 1])
+
+    def test_reveal_ends_the_session(self):
+        submit_guess(self.quiz_id, "Saka")
+        revealed = reveal_session(self.quiz_id)
+        self.assertEqual(revealed["answers"], self.quiz["answers"])
+        self.assertEqual((revealed["found_positions"], revealed["total"]), ([0], 3))
+        self.assertIsNone(submit_guess(self.quiz_id, "Palmer"))
+        self.assertIsNone(reveal_session(self.quiz_id))
+
+    def test_expired_sessions_are_ignored_and_cleared(self):
+        QuizSession.objects.filter(pk=self.quiz_id).update(expires_at=timezone.now())
+        self.assertIsNone(submit_guess(self.quiz_id, "Saka"))
+        out = StringIO()
+        call_command("clear_quiz_sessions", stdout=out)
+        self.assertIn("Deleted 1 expired quiz sessions.", out.getvalue())
+        self.assertFalse(QuizSession.objects.exists())
+
+
+@override_settings(ALLOWED_HOSTS=["testserver"])
+class QuizSessionApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.arsenal, cls.chelsea, cls.s1, cls.s2 = seed_quiz_data()
+        rebuild_leaderboards()
+
+    def setUp(self):
+        bump_data_version()
+
+    def post(self, url, data):
+        return self.client.post(url, data, content_type="application/json")
+
+    def test_played_quiz_answers_stay_on_the_server(self):
+        config = {"mode": "club", "club_id": self.arsenal.id, "category": "goals", "limit": 10}
+        quiz = self.post("/api/quizzes/generate/", config).json()
+        self.assertNotIn("answers", quiz)
+        self.assertEqual(quiz["answer_count"], 2)
+
+        guess = self.post(f"/api/quizzes/{quiz['quiz_id']}/guess/", {"guess": "havertz"}).json()
+        self.assertEqual((guess["position"], guess["answer"]["name"]), (1, "Kai Havertz"))
+
+        revealed = self.post(f"/api/quizzes/{quiz['quiz_id']}/reveal/", {}).json()
+        self.assertEqual(revealed["answers"], generate_quiz(config)["answers"])
+        self.assertEqual(revealed["found_positions"], [1])
+        response = self.post(f"/api/quizzes/{quiz['quiz_id']}/guess/", {"guess": "saka"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_batch_quizzes_have_no_answers(self):
+        results = self.post("/api/quizzes/generate-batch/", {"quizzes": [
+            {"mode": "club", "club_id": self.arsenal.id, "category": category}
+            for category in ("goals", "assists")
+        ] + [{"mode": "overall", "category": "managers"}]}).json()["results"]
+        self.assertEqual([("answers" in quiz) for quiz in results[:2]], [False, False])
+        self.assertEqual([quiz["answer_count"] for quiz in results[:2]], [2, 2])
+        self.assertIn("error", results[2])
+
+    def test_post_rejects_malformed_configs(self):
+        for config in ({"limit": "abc"}, {"club_id": "abc"}, {"limit": [10]}):
+            with self.subTest(**config):
+                response = self.post("/api/quizzes/generate/", {"mode": "club", "category": "goals", **config})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json(), {"error": "Ids and limit must be integers."})
+        response = self.post("/api/quizzes/generate/", [{"mode": "club"}])
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(QuizSession.objects.exists())
+
+    def test_post_clamps_the_limit(self):
+        quiz = self.post("/api/quizzes/generate/", {
+            "mode": "overall", "category": "goals", "limit": 10 ** 9,
+        }).json()
+        self.assertEqual(quiz["config"]["limit"], 100)
+        session = QuizSession.objects.get(pk=quiz["quiz_id"])
+        self.assertEqual(session.answers, generate_quiz({"mode": "overall", "category": "goals", "limit": 100})["answers"])
+
+
+class NameMatcherTests(TestCase):
+    def setUp(self):
+        self.matcher = NameMatcher([
+            {"id": 1, "name": "Martin Ødegaard", "last_name": "Ødegaard"},
+            {"id": 2, "name": "Bruno Fernandes", "last_name": "Fernandes"},
+            {"id": 3, "name": "Gabriel Jesus", "last_name": "Jesus"},
+            {"id": 4, "name": "Gabriel Martinelli", "last_name": "Martinelli"},
+            {"id": 5, "name": "N'Golo Kanté", "last_name": "Kanté"},
+        ])
+
+    def test_fold_name(self):
+        self.assertEqual(fold_name("  Martin ØDEGAARD "), "martin odegaard")
+        self.assertEqual(fold_name("N'Golo Kanté"), "ngolo kante")
+        self.assertEqual(fold_name("Trent Alexander-Arnold"), "trent alexander arnold")
+
+    def test_accents_and_punctuation(self):
+        self.assertEqual(self.matcher.match("odegaard")["position"], 0)
+        self.assertEqual(self.matcher.match("ngolo kante")["position"], 4)
+
+    def test_single_typo(self):
+        result = self.matcher.match("Fernandez")
+        self.assertEqual((result["position"], result["fuzzy"]), (1, True))
+        self.assertEqual(self.matcher.match("martin odegard")["position"], 0)
+
+    def test_short_names_must_be_exact(self):
+        self.assertIsNone(self.matcher.match("Jesu")["position"])
+
+    def test_found_answers_are_skipped(self):
+        self.assertIsNone(self.matcher.match("Fernandes", found=0b10)["position"])
+
+
+@override_settings(
+    ALLOWED_HOSTS=["testserver"],
+    CACHES=LOCMEM_CACHES,
+)
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        seed_quiz_data()
+
+    def test_current_etag_gets_not_modified(self):
+        for path in ("/api/clubs/", "/api/quizzes/generate/?mode=overall&category=goals"):
+            response = self.client.get(path)
+            self.assertEqual(response["Cache-Control"], "no-cache")
+            with self.assertNumQueries(0):
+                cached = self.client.get(path, HTTP_IF_NONE_MATCH=response["ETag"])
+            self.assertEqual(cached.status_code, 304)
+
+    def test_data_change_invalidates_etag(self):
+        etag = self.client.get("/api/seasons/")["ETag"]
+        bump_data_version()
+        response = self.client.get("/api/seasons/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+
+@override_settings(
+    ALLOWED_HOSTS=["testserver"],
+    CACHES=LOCMEM_CACHES,
+)
+class CanonicalQuizUrlTests(TestCase):
+    def setUp(self):
+        seed_quiz_data()
+        self.arsenal = Club.objects.get(name="Arsenal")
+
+    def test_equivalent_requests_redirect_to_one_url(self):
+        response = self.client.get(
+            f"/api/quizzes/club/goals/?limit=500&season_id=1&club_id={self.arsenal.id}"
+        )
+        self.assertEqual(response.status_code, 301)
+        self.assertEqual(
+            response["Location"],
+            f"/api/quizzes/club/goals/?club_id={self.arsenal.id}&limit=100",
+        )
+
+    def test_canonical_url_is_publicly_cacheable(self):
+        response = self.client.get(f"/api/quizzes/club/goals/?club_id={self.arsenal.id}&limit=10")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("public", response["Cache-Control"])
+        self.assertIn("s-maxage", response["Cache-Control"])
+        self.assertNotIn("quiz_id", response.json())
+        self.assertEqual(
+            response.json()["answers"],
+            generate_quiz({"mode": "club", "category": "goals", "club_id": self.arsenal.id})["answers"],
+        )
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get("/api/quizzes/club/goals/").status_code, 400)
+        self.assertEqual(self.client.get("/api/quizzes/club/goals/?club_id=x").status_code, 400)
+        self.assertEqual(self.client.get("/api/quizzes/overall/managers/?limit=10").status_code, 400)
+        self.assertEqual(self.client.get("/api/quizzes/weekly/goals/?limit=10").status_code, 404)
+
+
+@override_settings(
+    ALLOWED_HOSTS=["testserver"],
+    CACHES=LOCMEM_CACHES,
+)
+class ColumnarResponseTests(TestCase):
+    def setUp(self):
+        self.arsenal, self.chelsea, self.s1, _ = seed_quiz_data()
+        rebuild_leaderboards()
+        # Don't serve quizzes cached by earlier tests with the same ids
+        bump_data_version()
+
+    def test_rows_by_default(self):
+        response = self.client.get("/api/clubs/")
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(response.content, json.dumps(
+            [{"id": self.arsenal.id, "name": "Arsenal"}, {"id": self.chelsea.id, "name": "Chelsea"}],
+            separators=(",", ":"),
+        ).encode())
+
+    def test_reference_lists_as_columns(self):
+        response = self.client.get("/api/clubs/?shape=columns")
+        self.assertEqual(response.json(), {"id": [self.arsenal.id, self.chelsea.id], "name": ["Arsenal", "Chelsea"]})
+        self.assertEqual(self.client.get("/api/seasons/?shape=columns").json()["label"], ["2023/24", "2024/25"])
+
+    def test_quiz_answers_as_columns(self):
+        quiz = generate_quiz({"mode": "club", "category": "goals", "club_id": self.arsenal.id})
+        response = self.client.get(
+            f"/api/quizzes/generate/?mode=club&category=goals&club_id={self.arsenal.id}&shape=columns"
+        )
+        answers = response.json()["answers"]
+        self.assertEqual(answers["last_name"], [answer["last_name"] for answer in quiz["answers"]])
+        self.assertEqual(answers["rank"], [answer["rank"] for answer in quiz["answers"]])
+        self.assertEqual(answers["last_name"][0], "Saka")
+        self.assertEqual(response.json()["max_answers"], quiz["max_answers"])
+
+    def test_canonical_redirect_keeps_shape(self):
+        response = self.client.get(f"/api/quizzes/club/goals/?shape=columns&club_id={self.arsenal.id}")
+        self.assertEqual(
+            response["Location"],
+            f"/api/quizzes/club/goals/?club_id={self.arsenal.id}&limit=10&shape=columns",
+        )
+        answers = self.client.get(response["Location"]).json()["answers"]
+        self.assertEqual(answers["last_name"][0], "Saka")
+
+    def test_mixed_lists_keep_their_shape(self):
+        self.assertEqual(to_columns([]), [])
+        self.assertEqual(to_columns([{"a": 1}, {"b": 2}]), [{"a": 1}, {"b": 2}])
+        self.assertEqual(to_columns({"x": [{"a": 1}, 2]}), {"x": [{"a": 1}, 2]})
+
+    def test_nested_lists_become_columns(self):
+        batch = {"results": [{"answers": [{"a": 1}]}, {"answers": [{"a": 2}, {"a": 3}]}]}
+        self.assertEqual(to_columns(batch), {"results": {"answers": [{"a": [1]}, {"a": [2, 3]}]}})
+
+        response = self.client.post(
+            "/api/quizzes/generate-batch/?shape=columns",
+            {"quizzes": [
+                {"mode": "club", "category": "goals", "club_id": self.arsenal.id},
+                {"mode": "season", "category": "goals", "season_id": self.s1.id},
+            ]},
+            content_type="application/json",
+        )
+        results = response.json()["results"]
+        # Batch quizzes are playable (no answers), so their configs are
+        # the nested list of objects here
+        self.assertEqual(results["config"]["mode"], ["club", "season"])
+        self.assertEqual(len(results["quiz_id"]), 2)
+
+    def test_only_quiz_and_reference_successes_use_columns(self):
+        def request(path):
+            request = RequestFactory().get(f"{path}?shape=columns")
+            request.resolver_match = resolve(path)
+            return request
+
+        self.assertTrue(wants_columns(request("/api/clubs/")))
+        self.assertTrue(wants_columns(request("/api/quizzes/generate/")))
+        self.assertFalse(wants_columns(request("/api/health/ready/")))
+        self.assertFalse(wants_columns(request("/api/metrics/")))
+
+        rows = [{"a": 1}, {"a": 2}]
+        renderer = FastJSONRenderer()
+        for status_code, expected in ((200, b'{"a":[1,2]}'), (400, b'[{"a":1},{"a":2}]')):
+            with self.subTest(status=status_code):
+                context = {"request": request("/api/clubs/"), "response": Response(status=status_code)}
+                self.assertEqual(renderer.render(rows, renderer_context=context), expected)
+
+
+
+@override_settings(ALLOWED_HOSTS=["testserver"])
+@override_settings(ALLOWED_HOSTS=["testserver"], METRICS_ALLOWED_IPS=["10.0.0.5"])
+class ReadinessTests(TestCase):
+    databases = "__all__"
+
+    def test_probe_only_says_ready(self):
+        response = self.client.get("/api/health/ready/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"status": "ok"})
+
+        with mock.patch("football.views.ping_database", return_value=False):
+            response = self.client.get("/api/health/ready/")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json(), {"status": "unavailable"})
+
+    def test_reports_database_connections_to_allowed_addresses(self):
+        self.assertEqual(self.client.get("/api/health/connections/").status_code, 403)
+
+        response = self.client.get("/api/health/connections/", REMOTE_ADDR="10.0.0.5")
+        self.assertEqual(response.status_code, 200)
+        database = response.json()["databases"][0]
+        self.assertTrue(database["ok"])
+        self.assertEqual(database["alias"], "default")
+        self.assertGreaterEqual(database["connections"]["process"]["open"], 1)
+
+
+class MetricsRegistryTests(SimpleTestCase):
+    def test_render_counters_and_histograms(self):
+        metrics = MetricsRegistry()
+        metrics.describe("jobs_total", "Jobs run.")
+        metrics.inc("jobs_total", kind='say "hi"')
+        metrics.inc("jobs_total", 2, kind='say "hi"')
+        metrics.observe("job_seconds", 0.003, kind="a")
+        metrics.observe("job_seconds", 7, kind="a")
+
+        lines = metrics.render().splitlines()
+        self.assertEqual(lines[:3], [
+            "# HELP jobs_total Jobs run.",
+            "# TYPE jobs_total counter",
+            'jobs_total{kind="say \\"hi\\""} 3',
+        ])
+        self.assertIn("# TYPE job_seconds histogram", lines)
+        # Buckets are cumulative and end with +Inf
+        self.assertIn('job_seconds_bucket{kind="a",le="0.0025"} 0', lines)
+        self.assertIn('job_seconds_bucket{kind="a",le="0.005"} 1', lines)
+        self.assertIn('job_seconds_bucket{kind="a",le="10.0"} 2', lines)
+        self.assertIn('job_seconds_bucket{kind="a",le="+Inf"} 2', lines)
+        self.assertIn('job_seconds_sum{kind="a"} 7.003', lines)
+        self.assertIn('job_seconds_count{kind="a"} 2', lines)
+
+        metrics.reset()
+        self.assertEqual(metrics.render(), "\n")
+
+
+@override_settings(ALLOWED_HOSTS=["testserver"], METRICS_ALLOWED_IPS=["10.0.0.5"])
+class MetricsEndpointTests(TestCase):
+    def setUp(self):
+        registry.reset()
+        self.addCleanup(registry.reset)
+
+    def test_middleware_records_requests_and_queries(self):
+        Club.objects.create(name="Arsenal")
+        self.client.get("/api/clubs/")
+        lines = self.client.get("/api/metrics/", REMOTE_ADDR="10.0.0.5").content.decode().splitlines()
+        self.assertIn('http_requests_total{method="GET",status="200",view="list_clubs"} 1', lines)
+        self.assertIn('http_request_duration_seconds_count{view="list_clubs"} 1', lines)
+        queries = next(line for line in lines if line.startswith('db_queries_total{view="list_clubs"}'))
+        self.assertGreaterEqual(int(queries.split()[-1]), 1)
+
+    def test_only_staff_and_allowed_addresses(self):
+        self.assertEqual(self.client.get("/api/metrics/").status_code, 403)
+        self.assertEqual(self.client.get("/api/metrics/", REMOTE_ADDR="10.0.0.5").status_code, 200)
+
+        user = get_user_model().objects.create_user("fan", password="pw")
+        self.client.force_login(user)
+        self.assertEqual(self.client.get("/api/metrics/").status_code, 403)
+        user.is_staff = True
+        user.save()
+        self.assertEqual(self.client.get("/api/metrics/").status_code, 200)
+
+
+@override_settings(ALLOWED_HOSTS=["testserver"], API_PROFILING_ENABLED=True, CACHES=LOCMEM_CACHES)
+class ProfilingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_quiz_data()
+        cls.staff = get_user_model().objects.create_user("staff", password="pw", is_staff=True)
+        cls.fan = get_user_model().objects.create_user("fan", password="pw")
+
+    def test_only_staff_requests_are_profiled(self):
+        self.assertNotIn("X-Profile-Id", self.client.get("/api/clubs/?profile=1"))
+        self.client.force_login(self.fan)
+        self.assertNotIn("X-Profile-Id", self.client.get("/api/clubs/?profile=1"))
+
+        self.client.force_login(self.staff)
+        self.assertNotIn("X-Profile-Id", self.client.get("/api/clubs/"))
+        with override_settings(API_PROFILING_ENABLED=False):
+            self.assertNotIn("X-Profile-Id", self.client.get("/api/clubs/?profile=1"))
+        self.assertIn("X-Profile-Id", self.client.get("/api/clubs/", HTTP_X_PROFILE="1"))
+
+    @override_settings(QUIZ_USE_LEADERBOARDS=False, QUIZ_USE_CAREER_TOTALS=False)
+    def test_report_explains_every_statement(self):
+        bump_data_version()
+        self.client.force_login(self.staff)
+        # A played quiz: the quiz SELECT plus the session INSERT
+        response = self.client.post(
+            "/api/quizzes/generate/", {"mode": "overall", "category": "goals"},
+            content_type="application/json", HTTP_X_PROFILE="1",
+        )
+        report = self.client.get(f"/api/profiles/{response['X-Profile-Id']}/").json()
+
+        self.assertTrue(report["functions"])
+        self.assertGreaterEqual(report["sql_count"], 2)
+        self.assertEqual(len(report["queries"]), report["sql_count"])
+        verbs = {query["sql"].split()[0] for query in report["queries"]}
+        self.assertLessEqual({"SELECT", "INSERT"}, verbs)
+        for query in report["queries"]:
+            if query["sql"].split()[0] in ("SELECT", "INSERT"):
+                self.assertIsNotNone(query["plan"], query["sql"])
+                self.assertNotIn("EXPLAIN failed", query["plan"])
+            if query["sql"].startswith("SELECT"):
+                self.assertTrue(query["plan"], query["sql"])
+
+    def test_report_view_is_staff_only(self):
+        url = f"/api/profiles/{store_report({'path': '/api/clubs/'})}/"
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_login(self.fan)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get(url).json(), {"path": "/api/clubs/"})
+        self.assertEqual(self.client.get(f"/api/profiles/{'0' * 32}/").status_code, 404)
+
+    async def test_async_requests_record_statements(self):
+        # The test database connection was opened before the middleware
+        # module registered its connection_created hook
+        install_context_counter(None, connection)
+
+        async def view(request):
+            await sync_to_async(list)(Club.objects.all())
+            return HttpResponse("ok")
+
+        request = AsyncRequestFactory().get("/api/clubs/", headers={"X-Profile": "1"})
+        request.user = self.staff
+        response = await ProfilingMiddleware(view)(request)
+
+        report = await sync_to_async(get_report)(response["X-Profile-Id"])
+        self.assertIsNone(report["functions"])
+        self.assertEqual(report["sql_count"], 1)
+        self.assertIn("football_club", report["queries"][0]["sql"])
+        self.assertTrue(report["queries"][0]["plan"])
+
+
+@override_settings(DATABASE_REPLICAS=["replica"], DATABASE_REPLICA_STICKY_SECONDS=5)
+class ReplicaRouterTests(SimpleTestCase):
+    """
+    Routing decisions only; each check runs in a fresh context so pins
+    left by earlier writes in the test thread don't leak in.
+    """
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+        routers._last_change.update(checked=time.time(), modified=0.0)
+
+    def read_db(self, model=Club):
+        return Context().run(self.router.db_for_read, model)
+
+    def test_football_reads_go_to_replica(self):
+        self.assertEqual(self.read_db(), "replica")
+        self.assertIsNone(self.read_db(get_user_model()))
+        self.assertEqual(self.router.db_for_write(Club), "default")
+
+    def test_reads_after_a_write_stay_on_primary(self):
+        def write_then_read():
+            self.router.db_for_write(Club)
+            return self.router.db_for_read(Club)
+
+        self.assertEqual(Context().run(write_then_read), "default")
+
+    def test_only_football_writes_pin(self):
+        def write_then_read():
+            self.router.db_for_write(get_user_model())
+            return self.router.db_for_read(Club)
+
+        self.assertEqual(Context().run(write_then_read), "replica")
+
+    def test_pins_end_with_the_request(self):
+        # One WSGI worker thread (one context) serving two requests
+        def write(request):
+            self.router.db_for_write(Club)
+            return HttpResponse(self.router.db_for_read(Club))
+
+        def read(request):
+            return HttpResponse(self.router.db_for_read(Club))
+
+        def serve_both():
+            first = ReplicaPinMiddleware(write)(None)
+            return first.content, ReplicaPinMiddleware(read)(None).content
+
+        self.assertEqual(Context().run(serve_both), (b"default", b"replica"))
+
+    def test_use_primary_and_recent_data_change(self):
+        def read_in_block():
+            with use_primary():
+                return self.router.db_for_read(Club)
+
+        self.assertEqual(Context().run(read_in_block), "default")
+        routers._last_change["modified"] = time.time()
+        self.assertEqual(self.read_db(), "default")
+
+    def test_replicas_are_not_migrated(self):
+        self.assertIs(self.router.allow_migrate("replica", "football"), False)
+        self.assertIsNone(self.router.allow_migrate("default", "football"))
+
+
+class CareerTotalImportTests(TestCase):
+    HEADER = "person_id,first_name,last_name,season_label,club_name,role,appearances,goals,assists\n"
+
+    def run_import(self, rows, bulk):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as f:
+            f.write(self.HEADER + "".join(row + "\n" for row in rows))
+        self.addCleanup(os.unlink, f.name)
+        call_command("import_stats", f.name, bulk=bulk, stdout=StringIO())
+
+    @override_settings(CACHES=LOCMEM_CACHES, QUIZ_USE_CAREER_TOTALS=True)
+    def test_verify_fix_invalidates_cached_quizzes(self):
+        seed_quiz_data()
+        bump_data_version()
+        config = {"mode": "overall", "category": "goals"}
+        self.assertEqual(get_quiz(config)["answers"], [])
+
+        out = StringIO()
+        call_command("verify_career_totals", fix=True, stdout=out)
+        self.assertIn("Quiz cache invalidated", out.getvalue())
+        self.assertEqual(get_quiz(config)["answers"][0]["last_name"], "Palmer")
+
+    def test_imports_adjust_totals_incrementally(self):
+        for bulk in (False, True):
+            with self.subTest(bulk=bulk):
+                CareerTotal.objects.all().delete()
+                Person.objects.all().delete()
+                self.run_import([
+                    ",Bukayo,Saka,2023/24,Arsenal,player,38,16,9",
+                    ",Cole,Palmer,2023/24,Chelsea,player,34,22,11",
+                ], bulk)
+                saka = Person.objects.get(last_name="Saka")
+                palmer = Person.objects.get(last_name="Palmer")
+                palmer_totals = CareerTotal.objects.filter(person=palmer).values_list(
+                    "club_id", "appearances", "goals", "assists"
+                )
+                before = set(palmer_totals)
+
+                self.run_import([
+                    f"{saka.id},Bukayo,Saka,2024/25,Arsenal,player,25,6,10",
+                    f"{saka.id},Bukayo,Saka,2023/24,Arsenal,player,38,17,9",
+                ], bulk)
+
+                self.assertEqual(
+                    CareerTotal.objects.values_list("goals", "assists").get(person=saka, club=None),
+                    (23, 19),
+                )
+                self.assertEqual(diff_career_totals(), [])
+                self.assertEqual(set(palmer_totals), before)
+
+
+def imported_content():
+    """
+    What an import wrote, keyed by names rather than ids, so imports that
+    created the same rows in a different order compare equal.
+    """
+    return {
+        "people": sorted(Person.objects.values_list("first_name", "last_name")),
+        "rows": sorted(PersonClubSeason.objects.values_list(
+            "person__first_name", "person__last_name", "club__name", "season__label", "role",
+            "stats__appearances", "stats__goals", "stats__assists",
+        ), key=str),
+        "careers": sorted(CareerTotal.objects.values_list(
+            "person__last_name", "club__name", "appearances", "goals", "assists",
+        ), key=str),
+    }
+
+
+class BulkImportTests(TestCase):
+    ROWS = [
+        ",Bukayo,Saka,2023/24,Arsenal,player,38,16,9",
+        ",Cole,Palmer,2023/24,Chelsea,player,34,22,11",
+        "500,Declan,Rice,2023/24,Arsenal,player,38,7,8",
+        # Same person/club/season/role again: the later row wins
+        "500,Declan,Rice,2023/24,Arsenal,player,38,7,9",
+        "500,Declan,Rice,2024/25,Arsenal,player,,x,3",
+        ",Mikel,Arteta,2023/24,Arsenal,manager,0,0,0",
+        "abc,Bad,Id,2023/24,Arsenal,player,1,1,1",
+        "999,No,Body,2023/24,Arsenal,player,1,1,1",
+        ",,,2023/24,Arsenal,player,1,1,1",
+        ",Kai,Havertz,,Arsenal,player,37,13,7",
+    ]
+
+    def import_rows(self, bulk):
+        for model in (Person, Club, Season):
+            model.objects.all().delete()
+        Person.objects.create(id=500, first_name="Declan", last_name="Rice")
+
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as f:
+            f.write(CareerTotalImportTests.HEADER + "".join(row + "\n" for row in self.ROWS))
+        self.addCleanup(os.unlink, f.name)
+        call_command("import_stats", f.name, bulk=bulk, chunk_size=3, stdout=StringIO())
+        return imported_content()
+
+    def test_bulk_import_matches_row_by_row(self):
+        with CaptureQueriesContext(connection) as serial_queries:
+            serial = self.import_rows(bulk=False)
+        self.assertEqual(len(serial["people"]), 4)
+        self.assertIn(("Declan", "Rice", "Arsenal", "2023/24", "player", 38, 7, 9), serial["rows"])
+        self.assertIn(("Declan", "Rice", "Arsenal", "2024/25", "player", 0, 0, 3), serial["rows"])
+
+        with CaptureQueriesContext(connection) as bulk_queries:
+            bulk = self.import_rows(bulk=True)
+        self.assertEqual(bulk, serial)
+        self.assertEqual(diff_career_totals(), [])
+        self.assertLess(len(bulk_queries), len(serial_queries))
+
+
+class IncrementalImportTests(TestCase):
+    HEADER = CareerTotalImportTests.HEADER
+    ROWS = [
+        ",Bukayo,Saka,2023/24,Arsenal,player,38,16,9",
+        ",Cole,Palmer,2023/24,Chelsea,player,34,22,11",
+        ",Mikel,Arteta,2023/24,Arsenal,manager,0,0,0",
+    ]
+
+    def write_csv(self, rows, path=None):
+        """
+        Write rows to a new temporary CSV, or over an earlier one: rows are
+        tracked per file, so a rerun has to read the same path.
+        """
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(self.HEADER + "".join(row + "\n" for row in rows))
+            return path
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as f:
+            f.write(self.HEADER + "".join(row + "\n" for row in rows))
+        self.addCleanup(os.unlink, f.name)
+        return f.name
+
+    def run_import(self, path, **options):
+        out = StringIO()
+        call_command("import_stats", path, incremental=True, chunk_size=2, stdout=out, **options)
+        return out.getvalue()
+
+    def test_unchanged_rows_are_skipped(self):
+        path = self.write_csv(self.ROWS)
+        self.run_import(path)
+        self.assertEqual(ImportedRow.objects.count(), 3)
+        self.assertFalse(ImportCheckpoint.objects.exists())
+
+        with CaptureQueriesContext(connection) as ctx:
+            output = self.run_import(self.write_csv(self.ROWS, path))
+        self.assertIn("skipped 2 unchanged rows", output)
+        self.assertIn("skipped 1 unchanged rows", output)
+        self.assertFalse([
+            q for q in ctx.captured_queries
+            if "football_stats" in q["sql"] and not q["sql"].startswith("SELECT")
+        ])
+        self.assertEqual(Person.objects.count(), 3)
+
+        # A changed row updates its stats without creating a new person
+        changed = [self.ROWS[0].replace("38,16,9", "38,17,9")] + self.ROWS[1:]
+        output = self.run_import(self.write_csv(changed, path))
+        self.assertIn("updated 1 stats rows, skipped 1 unchanged rows", output)
+        self.assertEqual(Person.objects.count(), 3)
+        self.assertEqual(
+            StatsPersonClubSeason.objects.get(person_club_season__person__last_name="Saka").goals,
+            17,
+        )
+        self.assertEqual(diff_career_totals(), [])
+
+    def test_resumes_after_checkpoint(self):
+        path = self.write_csv(self.ROWS)
+        stat = os.stat(path)
+        ImportCheckpoint.objects.create(
+            source=os.path.abspath(path),
+            fingerprint=f"{stat.st_size}:{stat.st_mtime_ns}",
+            last_row=3,
+        )
+
+        output = self.run_import(path)
+        self.assertIn("Resuming after row 3.", output)
+        self.assertEqual(list(Person.objects.values_list("last_name", flat=True)), ["Arteta"])
+        self.assertFalse(ImportCheckpoint.objects.exists())
+
+        # --restart ignores the checkpoint
+        ImportCheckpoint.objects.create(
+            source=os.path.abspath(path),
+            fingerprint=f"{stat.st_size}:{stat.st_mtime_ns}",
+            last_row=3,
+        )
+        self.run_import(path, restart=True)
+        self.assertEqual(Person.objects.count(), 3)
+
+    def test_person_refs_survive_reruns_and_resume(self):
+        rows = [
+            "ref:1,Bukayo,Saka,2023/24,Arsenal,player,38,16,9",
+            "ref:2,Mikel,Arteta,2023/24,Arsenal,manager,,,",
+            "ref:1,Bukayo,Saka,2024/25,Arsenal,player,35,12,8",
+        ]
+        # Interrupted after the first chunk, then resumed
+        path = self.write_csv(rows[:2])
+        self.run_import(path)
+        self.write_csv(rows, path)
+        stat = os.stat(path)
+        ImportCheckpoint.objects.create(
+            source=os.path.abspath(path),
+            fingerprint=f"{stat.st_size}:{stat.st_mtime_ns}",
+            last_row=3,
+        )
+        self.run_import(path)
+        self.assertEqual(Person.objects.count(), 2)
+        self.assertEqual(
+            PersonClubSeason.objects.filter(person__last_name="Saka").count(), 2
+        )
+
+        # A rerun with a new row for an unchanged person reuses them too
+        self.run_import(self.write_csv(rows + ["ref:1,Bukayo,Saka,2025/26,Arsenal,player,30,10,7"], path))
+        self.assertEqual(Person.objects.count(), 2)
+        self.assertEqual(
+            PersonClubSeason.objects.filter(person__last_name="Saka").count(), 3
+        )
+        self.assertEqual(diff_career_totals(), [])
+
+    def test_rows_are_tracked_per_file(self):
+        # The same row in two files, with different stats in each
+        first = self.write_csv(self.ROWS)
+        second = self.write_csv([self.ROWS[0].replace("38,16,9", "38,17,9")])
+
+        options = {"incremental": True, "chunk_size": 2}
+        call_command("import_stats", first, second, stdout=StringIO(), **options)
+        self.assertEqual(ImportedRow.objects.count(), 4)
+        state = import_state()
+
+        # Neither file changed: every row is skipped and nothing is written
+        out = StringIO()
+        with CaptureQueriesContext(connection) as ctx:
+            call_command("import_stats", first, second, stdout=out, **options)
+        self.assertEqual(out.getvalue().count("created 0 and updated 0 stats rows"), 3)
+        self.assertFalse([
+            q for q in ctx.captured_queries
+            if "football_stats" in q["sql"] and not q["sql"].startswith("SELECT")
+        ])
+        self.assertEqual(import_state(), state)
+        self.assertEqual(diff_career_totals(), [])
+
+
+def import_state():
+    """
+    Everything an import writes, without the ids that depend on write order.
+    """
+    return {
+        "people": sorted(Person.objects.values_list("id", "first_name", "last_name")),
+        "pcs": sorted(PersonClubSeason.objects.values_list(
+            "id", "person_id", "club__name", "season__label", "role"
+        )),
+        "stats": sorted(StatsPersonClubSeason.objects.values_list(
+            "person_club_season_id", "appearances", "goals", "assists"
+        )),
+        "careers": sorted(
+            CareerTotal.objects.values_list("person_id", "club__name", "appearances", "goals", "assists"),
+            key=lambda row: (row[0], row[1] or ""),
+        ),
+    }
+
+
+class ParallelImportTests(TransactionTestCase):
+    HEADER = CareerTotalImportTests.HEADER
+    SEASONS = {
+        "2022-23.csv": [
+            ",Bukayo,Saka,2022/23,Arsenal,player,38,14,11",
+            ",Mikel,Arteta,2022/23,Arsenal,manager,0,0,0",
+            ",Mason,Mount,2022/23,Chelsea,player,24,3,2",
+        ],
+        "2023-24.csv": [
+            "1,Bukayo,Saka,2023/24,Arsenal,player,35,16,9",
+            "3,Mason,Mount,2023/24,Manchester United,player,14,1,0",
+            ",Cole,Palmer,2023/24,Chelsea,player,34,22,11",
+            ",Cole,Palmer,2023/24,Chelsea,player,34,22,12",
+            "99,Nobody,Known,2023/24,Chelsea,player,1,1,1",
+        ],
+    }
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        for name, rows in self.SEASONS.items():
+            with open(os.path.join(self.directory, name), "w", encoding="utf-8") as f:
+                f.write(self.HEADER + "".join(row + "\n" for row in rows))
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def reset_ids(self):
+        # Person ids in the CSVs refer to the first people created
+        call_command("flush", interactive=False, verbosity=0)
+        if connection.vendor == "sqlite":
+            with connection.cursor() as cursor:
+                cursor.execute("DELETE FROM sqlite_sequence")
+        else:
+            out = StringIO()
+            call_command("sqlsequencereset", "football", stdout=out)
+            with connection.cursor() as cursor:
+                cursor.execute(out.getvalue())
+
+    def test_sharded_import_matches_serial(self):
+        self.reset_ids()
+        out = StringIO()
+        call_command("import_stats", self.directory, bulk=True, chunk_size=2, stdout=out)
+        self.assertEqual(out.getvalue().count("Import complete."), 1)
+        serial = import_state()
+
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                self.reset_ids()
+                out = StringIO()
+                call_command(
+                    "import_stats", self.directory,
+                    workers=workers, chunk_size=2, stdout=out,
+                )
+                self.assertIn("into 2 season shards", out.getvalue())
+                self.assertIn("Wrote 6 stats rows in 2 shards", out.getvalue())
+                self.assertEqual(import_state(), serial)
+                self.assertEqual(diff_career_totals(), [])
+
+    def test_pool_writes_every_shard(self):
+        # SQLite has one writer, so run the pool branch with an executor
+        # that calls each shard inline
+        class InlineExecutor:
+            def __init__(self, max_workers, initializer):
+                initializer()
+                pools.append(max_workers)
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc_info):
+                return False
+
+            def submit(self, fn, *args):
+                future = Future()
+                future.set_result(fn(*args))
+                return future
+
+        self.reset_ids()
+        call_command("import_stats", self.directory, bulk=True, stdout=StringIO())
+        serial = import_state()
+
+        self.reset_ids()
+        pools = []
+        out = StringIO()
+        with mock.patch.object(connection, "vendor", "postgresql"), mock.patch(
+            "football.management.commands.import_stats.ProcessPoolExecutor", InlineExecutor
+        ):
+            call_command("import_stats", self.directory, workers=3, stdout=out)
+        self.assertEqual(pools, [3])
+        self.assertNotIn("SQLite allows one writer", out.getvalue())
+        self.assertIn("Wrote 6 stats rows in 2 shards", out.getvalue())
+        self.assertEqual(import_state(), serial)
+        self.assertEqual(diff_career_totals(), [])
+
+
+class ExportStatsTests(TestCase):
+    def export(self, suffix, **options):
+        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as f:
+            pass
+        self.addCleanup(os.unlink, f.name)
+        call_command("export_stats", f.name, chunk_size=2, stdout=StringIO(), **options)
+        return f.name
+
+    def read(self, path):
+        with (gzip.open if path.endswith(".gz") else open)(path, "rb") as f:
+            return f.read()
+
+    def test_round_trip_into_another_database(self):
+        arsenal, _, _, s2 = seed_quiz_data()
+        # A squad player without a stats row
+        PersonClubSeason.objects.create(
+            person=Person.objects.create(first_name="Ethan", last_name="Nwaneri"),
+            club=arsenal, season=s2, role="player",
+        )
+        exported = self.export(".csv.gz", new_ids=True)
+        self.assertIn(b"ref:7,Ethan,Nwaneri,2024/25,Arsenal,player,,,\r\n", self.read(exported))
+
+        for bulk in (False, True):
+            with self.subTest(bulk=bulk):
+                Person.objects.all().delete()
+                Club.objects.all().delete()
+                Season.objects.all().delete()
+                # Ids the target already has don't matter
+                Person.objects.create(first_name="Already", last_name="There")
+                call_command("import_stats", exported, bulk=bulk, stdout=StringIO())
+
+                self.assertEqual(Person.objects.count(), 8)
+                self.assertEqual(PersonClubSeason.objects.count(), 9)
+                self.assertEqual(StatsPersonClubSeason.objects.count(), 6)
+                reexported = self.export(".csv.gz", new_ids=True)
+                self.assertEqual(self.read(reexported), self.read(exported))
+
+    def test_reimport_with_ids_changes_nothing(self):
+        seed_quiz_data()
+        rebuild_career_totals()
+        before = import_state()
+
+        exported = self.export(".csv")
+        self.assertTrue(self.read(exported).startswith(
+            b"person_id,first_name,last_name,season_label,club_name,role,appearances,goals,assists"
+        ))
+        call_command("import_stats", exported, stdout=StringIO())
+        self.assertEqual(import_state(), before)
+
+
+class GenerateDatasetTests(TestCase):
+    OPTIONS = {"seasons": 3, "clubs": 2, "squad_size": 4}
+
+    def generate(self, **options):
+        with tempfile.NamedTemporaryFile(suffix=".csv", delete=False) as f:
+            pass
+        self.addCleanup(os.unlink, f.name)
+        call_command("generate_dataset", f.name, stdout=StringIO(), **{**self.OPTIONS, **options})
+        with open(f.name, encoding="utf-8") as f:
+            return f.name, f.read()
+
+    def test_row_counts_and_seed_determinism(self):
+        path, content = self.generate(seed=7)
+        lines = content.splitlines()
+        self.assertEqual(lines[0], "person_id,first_name,last_name,season_label,club_name,role,appearances,goals,assists")
+        # One manager plus a full squad per club and season
+        self.assertEqual(len(lines) - 1, 3 * 2 * (4 + 1))
+        self.assertEqual(sum(line.endswith(",manager,0,0,0") for line in lines), 3 * 2)
+
+        self.assertEqual(self.generate(seed=7)[1], content)
+        self.assertNotEqual(self.generate(seed=8)[1], content)
+
+    def test_import_stats_accepts_output(self):
+        path, content = self.generate(seed=3)
+        rows = list(csv.DictReader(StringIO(content)))
+
+        out = StringIO()
+        call_command("import_stats", path, stdout=out)
+        self.assertIn("Import complete.", out.getvalue())
+
+        self.assertEqual(PersonClubSeason.objects.count(), len(rows))
+        self.assertEqual(
+            StatsPersonClubSeason.objects.count(), sum(row["role"] == "player" for row in rows)
+        )
+        self.assertEqual(Person.objects.count(), len({row["person_id"] for row in rows}))
+        for row in rows:
+            self.assertTrue(PersonClubSeason.objects.filter(
+                person__first_name=row["first_name"],
+                person__last_name=row["last_name"],
+                club__name=row["club_name"],
+                season__label=row["season_label"],
+                role=row["role"],
+            ).exists())
+        self.assertEqual(
+            PersonClubSeason.objects.filter(role="manager").count(),
+            sum(row["role"] == "manager" for row in rows),
+        )
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHES,
+    QUIZ_WARM_WORKERS=1,
+)
+class WarmQuizzesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.arsenal, cls.chelsea, cls.s1, cls.s2 = seed_quiz_data()
+        rebuild_career_totals()
+        rebuild_leaderboards()
+
+    def setUp(self):
+        bump_data_version()
+        reset_cache_stats()
+
+    def test_every_valid_quiz_is_cached(self):
+        out = StringIO()
+        call_command("warm_quizzes", workers=1, stdout=out)
+        # 2 clubs x 4 + 2 seasons x 4 + 3 overall (no overall managers)
+        self.assertIn("Warmed 19 of 19 quizzes (100.0%)", out.getvalue())
+        self.assertIn("19 generated, 0 already cached, 0 lost to culling, 0 failed", out.getvalue())
+
+        local_cache.clear()
+        with self.assertNumQueries(0):
+            quiz = get_quiz({"mode": "club", "category": "goals", "club_id": self.arsenal.id})
+            get_quiz({"mode": "overall", "category": "assists", "limit": 10})
+        self.assertEqual(quiz["answers"][0]["last_name"], "Saka")
+        self.assertEqual(get_cache_stats()["misses"], 0)
+
+        out = StringIO()
+        call_command("warm_quizzes", workers=1, stdout=out)
+        self.assertIn("0 generated, 19 already cached", out.getvalue())
+
+    def test_import_can_warm_afterwards(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as f:
+            f.write(CareerTotalImportTests.HEADER + ",Declan,Rice,2023/24,Arsenal,player,38,7,8\n")
+        self.addCleanup(os.unlink, f.name)
+
+        out = StringIO()
+        call_command("import_stats", f.name, warm=True, stdout=out)
+        self.assertIn("Warmed 19 of 19 quizzes", out.getvalue())
+
+    def test_warmed_quizzes_outlive_the_request_timeout(self):
+        config = {"mode": "club", "category": "goals", "club_id": self.arsenal.id}
+        get_quiz(config)
+        call_command("warm_quizzes", workers=1, stdout=StringIO())
+
+        local_cache.clear()
+        later = time.time() + 2 * settings.QUIZ_CACHE_TIMEOUT
+        with mock.patch("time.time", return_value=later), self.assertNumQueries(0):
+            get_quiz(config)
+            get_quiz({"mode": "season", "category": "managers", "season_id": self.s1.id})
+
+    @override_settings(
+        CACHES={
+            **LOCMEM_CACHES,
+            "quizzes": {**LOCMEM_CACHES["quizzes"], "OPTIONS": {"MAX_ENTRIES": 10}},
+        },
+        QUIZ_CACHE_MAX_ENTRIES=10,
+    )
+    def test_reports_quizzes_the_cache_cannot_hold(self):
+        out, err = StringIO(), StringIO()
+        call_command("warm_quizzes", workers=1, stdout=out, stderr=err)
+        self.assertIn("19 quizzes don't fit in QUIZ_CACHE_MAX_ENTRIES=10", err.getvalue())
+        self.assertRegex(out.getvalue(), r"19 generated, 0 already cached, [1-9]\d* lost to culling")
+        self.assertNotIn("Warmed 19 of 19", out.getvalue())
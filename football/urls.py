@@ -1,9 +1,43 @@
+from django.conf import settings
 from django.urls import path
-from .views import health_check, generate_quiz_view, list_clubs, list_seasons
+from .views import (
+    health_check,
+    connections_report,
+    generate_quiz_view,
+    generate_quiz_batch_view,
+    list_clubs,
+    list_seasons,
+    metrics_view,
+    profile_report_view,
+    quiz_guess_view,
+    quiz_reveal_view,
+    quiz_page_view,
+    quiz_view,
+    readiness_check,
+)
+
+if getattr(settings, "API_ASYNC_VIEWS", False):
+    from .async_views import (
+        health_check,
+        generate_quiz_view,
+        generate_quiz_batch_view,
+        list_clubs,
+        list_seasons,
+        quiz_view,
+    )
 
 urlpatterns = [
     path("health/", health_check, name="health-check"),
+    path("health/ready/", readiness_check, name="health-ready"),
+    path("health/connections/", connections_report, name="health-connections"),
+    path("metrics/", metrics_view, name="metrics"),
     path("quizzes/generate/", generate_quiz_view, name="quiz-generate"),
+    path("quizzes/generate-batch/", generate_quiz_batch_view, name="quiz-generate-batch"),
+    path("quizzes/<uuid:quiz_id>/guess/", quiz_guess_view, name="quiz-guess"),
+    path("quizzes/<uuid:quiz_id>/reveal/", quiz_reveal_view, name="quiz-reveal"),
+    path("quizzes/<str:mode>/<str:category>/", quiz_view, name="quiz"),
+    path("quizzes/<str:mode>/<str:category>/page/", quiz_page_view, name="quiz-page"),
+    path("profiles/<uuid:report_id>/", profile_report_view, name="profile-report"),
     path("clubs/", list_clubs, name='list_clubs'),
     path("seasons/", list_seasons, name='list_seasons'),
 ]
\ No newline at end of file
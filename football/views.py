@@ -1,20 +1,82 @@
-from rest_framework.decorators import api_view
+from datetime import datetime, timezone
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.http import (
+    HttpResponse,
+    HttpResponseForbidden,
+    HttpResponsePermanentRedirect,
+    StreamingHttpResponse,
+)
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
-from .services.quiz_engine import generate_quiz
+from .services.quiz_cache import (
+    get_data_last_modified,
+    get_data_version,
+    get_quiz,
+    get_quizzes,
+)
+from .services.quiz_engine import ANSWER_CATEGORIES, STAT_CATEGORIES
+from .services.quiz_pages import quiz_page
+from .services.quiz_stream import QuizStream
+from .services.quiz_sessions import create_session, playable_quiz, reveal_session, submit_guess
+from .services.db_health import check_database, ping_database
+from .services.metrics import registry
+from .services.profiling import get_report
 from .models import Club, Season
-from .serializers import ClubSerializer, SeasonSerializer
+from .renderers import wants_columns
+
+def data_etag(request, *args, **kwargs):
+    if request.method not in ("GET", "HEAD"):
+        return None
+    return f'"{request.resolver_match.url_name}-{get_data_version()}"'
+
+def data_last_modified(request, *args, **kwargs):
+    if request.method not in ("GET", "HEAD"):
+        return None
+    return datetime.fromtimestamp(get_data_last_modified(), tz=timezone.utc)
+
+def revalidate(request):
+    return {"no_cache": True}
+
+def conditional_on_data(view=None, cache_control=revalidate):
+    """
+    ETag/Last-Modified from the global data version (bumped by import_stats
+    and admin edits). A client that already has the current version gets a
+    304 without the view running.
+
+    cache_control(request) gives the Cache-Control directives for GET/HEAD,
+    304s included; by default responses must be revalidated before reuse.
+    """
+    def decorator(view):
+        conditional_view = condition(etag_func=data_etag, last_modified_func=data_last_modified)(view)
+
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if request.method in ("GET", "HEAD") and response.status_code in (200, 304):
+                patch_cache_control(response, **cache_control(request))
+            return response
+
+        return wrapped
+
+    return decorator(view) if view is not None else decorator
 
+@conditional_on_data
 @api_view(['GET'])
 def list_clubs(request):
-    clubs = Club.objects.order_by('name')
-    serializer = ClubSerializer(clubs, many=True)
-    return Response(serializer.data)
+    # Plain dicts straight from the query: no model instances or serializer
+    return Response(list(Club.objects.order_by('name').values('id', 'name')))
 
+@conditional_on_data
 @api_view(['GET'])
 def list_seasons(request):
-    seasons = Season.objects.order_by("label")
-    serializer = SeasonSerializer(seasons, many=True)
-    return Response(serializer.data)
+    return Response(list(Season.objects.order_by("label").values("id", "label")))
 
 @api_view(["GET"])
 def health_check(request):
@@ -24,11 +86,61 @@ def health_check(request):
     """
     return Response({"status": "ok"})
 
-@api_view(["POST"])
+@api_view(["GET"])
+def readiness_check(request):
+    """
+    Readiness probe: 200 only if every configured database answers a
+    SELECT 1, else 503. Connection details are in connections_report.
+    """
+    ready = all(ping_database(alias) for alias in settings.DATABASES)
+    return Response(
+        {"status": "ok" if ready else "unavailable"},
+        status=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+
+def may_read_metrics(request):
+    user = getattr(request, "user", None)
+    if user is not None and user.is_staff:
+        return True
+    return request.META.get("REMOTE_ADDR") in getattr(settings, "METRICS_ALLOWED_IPS", ())
+
+@api_view(["GET"])
+def connections_report(request):
+    """
+    Per database: the round-trip latency, the persistent connection
+    settings and connection usage, for this process and (on PostgreSQL)
+    across all workers: in use, idle and waiting.
+    Staff and METRICS_ALLOWED_IPS only, like metrics_view.
+    """
+    if not may_read_metrics(request):
+        return Response(
+            {"error": "Connection usage is not public."},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+    return Response({"databases": [check_database(alias) for alias in settings.DATABASES]})
+
+def metrics_view(request):
+    """
+    Per-process request, SQL and quiz-stage metrics in Prometheus text format.
+    Staff and METRICS_ALLOWED_IPS only: the numbers map out every endpoint.
+    """
+    if not may_read_metrics(request):
+        return HttpResponseForbidden("Metrics are not public.", content_type="text/plain")
+    return HttpResponse(
+        registry.render(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+@conditional_on_data
+@api_view(["GET", "POST"])
 def generate_quiz_view(request):
     """
-    Stub endpoint to generate a quiz based on POSTed config.
-    Currently uses dummy data from services.quiz_engine.generate_quiz.
+    Generate a quiz based on POSTed config.
+    Results come from services.quiz_cache.get_quiz, which only runs
+    services.quiz_engine.generate_quiz on a cache miss. A POSTed quiz is
+    played: the response carries a quiz_id for quizzes/<quiz_id>/guess/
+    and the answer_count, but not the answers themselves.
+
     Expected JSON body (example):
     {
        "mode": "club",
@@ -36,7 +148,260 @@ def generate_quiz_view(request):
        "category": "goals",
        "limit": 10
     }
+
+    GET with the same fields as query parameters supports conditional
+    requests and doesn't open a guess session; quizzes/<mode>/<category>/
+    is the canonical, publicly cacheable form. Large GET quizzes (see
+    wants_stream) are streamed straight from the database instead.
+    """
+    if request.method == "GET":
+        try:
+            config = quiz_query_config(request.query_params)
+        except ValueError:
+            return Response(
+                {"error": "Ids and limit must be integers."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if wants_stream(request.query_params, config):
+            try:
+                stream = QuizStream(config)
+            except ValueError:
+                return Response(
+                    {"error": "Ids and limit must be integers."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            return StreamingHttpResponse(iter(stream), content_type="application/json")
+        return Response(get_quiz(config))
+
+    if not isinstance(request.data, dict):
+        return Response(
+            {"error": "Quiz config must be an object."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    try:
+        config = quiz_body_config(request.data)
+    except (TypeError, ValueError):
+        return Response(
+            {"error": "Ids and limit must be integers."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    quiz = get_quiz(config)
+    if "error" not in quiz:
+        quiz = playable_quiz(quiz, create_session(quiz))
+    return Response(quiz)
+
+def wants_stream(params, config):
+    """
+    Stream a GET quiz when asked to (stream=1) or when the limit of its
+    config (from quiz_query_config) is at least QUIZ_STREAM_MIN_LIMIT.
+    Streamed quizzes skip the quiz cache and are never held in memory
+    whole; "max_answers" comes after "answers". They always use the row
+    shape (shape=columns is ignored).
+    """
+    if params.get("stream") == "1":
+        return True
+    return config["limit"] >= getattr(settings, "QUIZ_STREAM_MIN_LIMIT", 1000)
+
+QUIZ_MODES = ("club", "season", "overall")
+MAX_QUIZ_LIMIT = 100
+
+def public_quiz_cache(request):
+    return {
+        "public": True,
+        "max_age": getattr(settings, "QUIZ_HTTP_MAX_AGE", 60),
+        "s_maxage": getattr(settings, "QUIZ_HTTP_SHARED_MAX_AGE", 300),
+    }
+
+def canonical_quiz_query(mode, params):
+    """
+    The only query string quizzes/<mode>/<category>/ is served under:
+    just the id the mode uses, and limit clamped to 1..MAX_QUIZ_LIMIT.
+    Raises ValueError for missing or malformed parameters.
+    """
+    limit = min(max(int(params.get("limit") or 10), 1), MAX_QUIZ_LIMIT)
+    query = {}
+    if mode == "club":
+        query["club_id"] = int(params["club_id"])
+    elif mode == "season":
+        query["season_id"] = int(params["season_id"])
+    query["limit"] = limit
+    return query
+
+def quiz_query_config(params):
+    """
+    Quiz config from GET quizzes/generate/ query parameters, checked like
+    canonical_quiz_query: ids must be integers and limit is at least 1.
+    There is no upper bound, as large quizzes are streamed (wants_stream).
+    Raises ValueError for malformed parameters.
+    """
+    config = {key: params[key] for key in ("mode", "category") if params.get(key)}
+    config["limit"] = max(int(params.get("limit") or 10), 1)
+    for key in ("club_id", "season_id"):
+        if params.get(key):
+            config[key] = int(params[key])
+    return config
+
+def quiz_body_config(data):
+    """
+    Quiz config from a POSTed quizzes/generate/ body, checked like
+    quiz_query_config but with limit clamped to MAX_QUIZ_LIMIT: a played
+    quiz's answers are stored in its session, and each limit is cached
+    apart. Raises TypeError or ValueError for malformed values.
+    """
+    config = quiz_query_config(data)
+    config["limit"] = min(config["limit"], MAX_QUIZ_LIMIT)
+    return config
+
+def canonical_query_string(request, query):
+    # The response shape is part of the URL, so each shape is cached apart
+    if wants_columns(request):
+        query = {**query, "shape": "columns"}
+    return urlencode(query)
+
+@conditional_on_data(cache_control=public_quiz_cache)
+@api_view(["GET"])
+def quiz_view(request, mode, category):
+    """
+    Canonical GET form of quiz generation, e.g.
+    /api/quizzes/club/goals/?club_id=1&limit=10
+
+    Equivalent requests are redirected to one URL so a CDN or proxy keeps
+    a single copy of each quiz. Responses are public for
+    QUIZ_HTTP_SHARED_MAX_AGE seconds and carry an ETag of the data
+    version, so after an import a shared cache serves the old quiz for at
+    most that long and then revalidates. No guess session is opened.
+    """
+    if mode not in QUIZ_MODES or category not in ANSWER_CATEGORIES:
+        return Response({"error": "Unknown quiz mode or category."}, status=status.HTTP_404_NOT_FOUND)
+    if mode == "overall" and category == "managers":
+        return Response(
+            {"error": "Managers category is not available in overall mode."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        query = canonical_quiz_query(mode, request.query_params)
+    except KeyError as exc:
+        return Response({"error": f"{exc.args[0]} is required."}, status=status.HTTP_400_BAD_REQUEST)
+    except ValueError:
+        return Response({"error": "Ids and limit must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+
+    canonical = canonical_query_string(request, query)
+    if request.GET.urlencode() != canonical:
+        return HttpResponsePermanentRedirect(f"{request.path}?{canonical}")
+
+    return Response(get_quiz({"mode": mode, "category": category, **query}))
+
+@conditional_on_data
+@api_view(["GET"])
+def quiz_page_view(request, mode, category):
+    """
+    One page of a long goals/assists/appearances quiz, e.g.
+    /api/quizzes/overall/goals/page/?limit=50
+    /api/quizzes/overall/goals/page/?limit=50&cursor=<next_cursor>
+
+    Answers, ranks and max_answers are those of the full quiz; "next_cursor"
+    is null on the last page. Every page is a keyset read, so deep pages
+    cost the same as the first.
+    """
+    if mode not in QUIZ_MODES or category not in STAT_CATEGORIES:
+        return Response({"error": "Unknown quiz mode or category."}, status=status.HTTP_404_NOT_FOUND)
+
+    try:
+        query = canonical_quiz_query(mode, request.query_params)
+    except KeyError as exc:
+        return Response({"error": f"{exc.args[0]} is required."}, status=status.HTTP_400_BAD_REQUEST)
+    except ValueError:
+        return Response({"error": "Ids and limit must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        page = quiz_page(
+            {"mode": mode, "category": category, **query},
+            request.query_params.get("cursor") or None,
+        )
+    except ValueError as exc:
+        return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(page)
+
+MAX_BATCH_SIZE = 20
+
+@api_view(["POST"])
+def generate_quiz_batch_view(request):
+    """
+    Generate several quizzes in one request.
+    Expected JSON body (example):
+    {
+       "quizzes": [
+          {"mode": "club", "club_id": 1, "category": "goals", "limit": 10},
+          {"mode": "club", "club_id": 1, "category": "assists", "limit": 10}
+       ]
+    }
+    Returns {"results": [...]} in request order, each with a quiz_id for
+    guessing and an answer_count (no answers, as for generate). Items that
+    can't be generated carry an "error" key instead of failing the whole
+    batch.
+    """
+    data = request.data
+    configs = data.get("quizzes") if isinstance(data, dict) else data
+
+    if not isinstance(configs, list):
+        return Response(
+            {"error": 'Expected a list of quiz configs under "quizzes".'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if len(configs) > MAX_BATCH_SIZE:
+        return Response(
+            {"error": f"At most {MAX_BATCH_SIZE} quizzes per batch."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    results = [
+        quiz if "error" in quiz else playable_quiz(quiz, create_session(quiz))
+        for quiz in get_quizzes(configs)
+    ]
+    return Response({"results": results})
+
+@api_view(["POST"])
+def quiz_guess_view(request, quiz_id):
+    """
+    Check a guess against a quiz session created by quiz generation.
+    Expected JSON body: {"guess": "Saka"}
+    Returns the matched answer (if any) and the running score.
+    """
+    guess = request.data.get("guess", "") if isinstance(request.data, dict) else ""
+    result = submit_guess(str(quiz_id), str(guess))
+    if result is None:
+        return Response(
+            {"error": "Quiz not found or expired."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    return Response(result)
+
+@api_view(["POST"])
+def quiz_reveal_view(request, quiz_id):
+    """
+    End a quiz session: returns every answer (in position order) and the
+    found_positions, and closes the session to further guesses.
+    """
+    result = reveal_session(str(quiz_id))
+    if result is None:
+        return Response(
+            {"error": "Quiz not found or expired."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    return Response(result)
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def profile_report_view(request, report_id):
+    """
+    Staff-only: a profiling report captured by ProfilingMiddleware.
     """
-    config = request.data or {}
-    quiz = generate_quiz(config)
-    return Response(quiz)
\ No newline at end of file
+    report = get_report(str(report_id))
+    if report is None:
+        return Response(
+            {"error": "Profile report not found or expired."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    return Response(report)
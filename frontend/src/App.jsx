@@ -62,7 +62,8 @@ const App = () => {
       {/* Show quiz when we have quizResult */}
       {quizResult && (
         <QuizRunner
-          answers={quizResult.answers}
+          quizId={quizResult.quiz_id}
+          answerCount={quizResult.answer_count ?? 0}
           category={category}
           onBackToSetup={handleBackToSetup}
         />
@@ -36,4 +36,43 @@ export const generateQuiz = async (config) => {
         console.error("Error generating quiz:", error)
         throw error
     }
-}
\ No newline at end of file
+}
+
+export const submitGuess = async (quizId, guess) => {
+    try {
+        const response = await fetch(`${BACKEND_URL}/api/quizzes/${quizId}/guess/`, {
+            method: 'POST',
+            headers: {
+                "Content-Type": "application/json",
+            },
+            body: JSON.stringify({ guess }),
+        })
+        if (!response.ok) {
+            throw new Error(`Server returned ${response.status}`)
+        }
+        const data = await response.json()
+        return data
+    } catch (error) {
+        console.error("Error submitting guess:", error)
+        throw error
+    }
+}
+
+export const revealQuiz = async (quizId) => {
+    try {
+        const response = await fetch(`${BACKEND_URL}/api/quizzes/${quizId}/reveal/`, {
+            method: 'POST',
+            headers: {
+                "Content-Type": "application/json",
+            },
+        })
+        if (!response.ok) {
+            throw new Error(`Server returned ${response.status}`)
+        }
+        const data = await response.json()
+        return data
+    } catch (error) {
+        console.error("Error revealing quiz:", error)
+        throw error
+    }
+}
@@ -1,49 +1,59 @@
 import { useState } from 'react'
+import { revealQuiz, submitGuess } from '../api'
 
-const QuizRunner = ({ answers, category, onBackToSetup }) => {
+// The answers stay on the server: each one arrives with the guess that
+// found it, and the rest when the quiz is ended (revealQuiz).
+const QuizRunner = ({ quizId, answerCount, category, onBackToSetup }) => {
   const [typedAnswer, setTypedAnswer] = useState("")
-  const [foundIds, setFoundIds] = useState([])
+  // Answers found so far, by position
+  const [foundAnswers, setFoundAnswers] = useState({})
+  // Every answer, once the quiz has been ended and revealed
+  const [revealedAnswers, setRevealedAnswers] = useState(null)
   const [isEnded, setIsEnded] = useState(false)
 
   const normalise = (str) => str.trim().toLowerCase()
 
-  const score = foundIds.length
-  const total = answers.length
+  const score = Object.keys(foundAnswers).length
+  const total = answerCount
 
   // True if the player has found every answer
-  const isComplete = total > 0 && foundIds.length === total
+  const isComplete = total > 0 && score === total
 
-  const handleGuess = () => {
-    if (isEnded) return  // ignore guesses once quiz is ended (by user or complete)
+  const handleGuess = async () => {
+    if (isEnded || !quizId) return  // ignore guesses once quiz is ended (by user or complete)
 
     const guess = normalise(typedAnswer)
     setTypedAnswer("")
 
     if (!guess) return
 
-    const match = answers.find((a) => {
-      if (foundIds.includes(a.id)) return false
-      const fullName = normalise(a.name)
-      const lastName = a.last_name ? normalise(a.last_name) : ''
-      return guess === fullName || guess === lastName
-    })
-
-    if (match) {
-      setFoundIds((prev) => {
-        const next = [...prev, match.id]
-        // If we've just found the final answer, end the quiz automatically
-        if (next.length === total) {
-          setIsEnded(true)
-        }
-        return next
-      })
+    let result
+    try {
+      result = await submitGuess(quizId, guess)
+    } catch (err) {
+      return
+    }
+
+    if (result.correct) {
+      setFoundAnswers((prev) => ({ ...prev, [result.position]: result.answer }))
+      // If we've just found the final answer, end the quiz automatically
+      if (result.complete) {
+        setIsEnded(true)
+      }
     }
   }
 
   const isManagerQuiz = category === 'managers'
 
-  const handleEndQuiz = () => {
+  const handleEndQuiz = async () => {
     setIsEnded(true)
+    if (!quizId) return
+    try {
+      const result = await revealQuiz(quizId)
+      setRevealedAnswers(result.answers)
+    } catch (err) {
+      // Keep showing what was found
+    }
   }
 
   return (
@@ -94,8 +104,9 @@ const QuizRunner = ({ answers, category, onBackToSetup }) => {
           </tr>
         </thead>
         <tbody>
-          {answers.map((ans) => {
-            const isFound = foundIds.includes(ans.id)
+          {Array.from({ length: total }, (_, position) => {
+            const isFound = position in foundAnswers
+            const ans = foundAnswers[position] ?? revealedAnswers?.[position] ?? {}
 
             // Build the "total" text (goals/assists/appearances)
             let totalText = ""
@@ -126,7 +137,7 @@ const QuizRunner = ({ answers, category, onBackToSetup }) => {
             }
 
             return (
-              <tr key={ans.id}>
+              <tr key={position}>
                 <td>
                   <span
                     style={{